@@ -0,0 +1,28 @@
+from typing import Any, Callable, Coroutine
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from services.admission import get_admission_limiter
+
+# NOTE: Admission happens in the route rather than in a middleware, since the router has already matched the
+#       route by then, and before the dependencies are resolved, so a shed request never takes a thread, a
+#       session or a pooled connection
+
+
+class AdmissionRoute(APIRoute):
+    """Route that admits requests through its route's limiter, shedding them with a 503 when it is saturated."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+        route = self.path_format
+
+        async def admission_route_handler(request: Request) -> Response:
+            limiter = get_admission_limiter(request.method, route)
+            await limiter.acquire()
+            # NOTE: A streamed body is sent after the handler returns, so its turn ends at the first byte
+            try:
+                return await route_handler(request)
+            finally:
+                limiter.release()
+
+        return admission_route_handler
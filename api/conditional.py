@@ -0,0 +1,17 @@
+from typing import Dict
+from fastapi import Response, status
+
+# NOTE: Responses depend on the caller's cookies, so shared caches must not store them and browsers must revalidate
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Get the validator headers of a response to a conditional GET."""
+    return {"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+
+
+def not_modified_response(etag: str) -> Response:
+    """Build the bodiless 304 response to a conditional GET whose ETag still matches."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag)
+    )
@@ -1,15 +1,37 @@
-from typing import Annotated
-from fastapi import Depends, Request
+from typing import Annotated, Optional
+from fastapi import Depends, Header, Request
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from database.user import UserDatabase
 from database.syllabus import SyllabusDatabase
+from database.result import ResultDatabase
+from database.analytics import AnalyticsDatabase
+from database.progress import ProgressDatabase
 from services.user import UserService
 from services.auth import AuthService
 from services.syllabus import SyllabusService
-from models import User
-from config.database import get_db_session
-from config.auth import ACCESS_TOKEN_COOKIE_NAME
+from services.result import ResultService
+from services.analytics import AnalyticsService
+from services.progress import ProgressService
+from services.admin import AdminService
+from schemas.auth import AuthenticatedPrincipal
+from config.database import (
+    DATABASE_ASYNC,
+    get_async_db_read_session,
+    get_async_db_session,
+    get_db_read_session,
+    get_db_session,
+    run_in_session,
+)
+from config.auth import ACCESS_TOKEN_COOKIE_NAME, AUTH_STATELESS
+
+# NOTE: FastAPI caches dependencies per request by callable, so every consumer must resolve the same session factory.
+#       Read sessions resolve the primary's session too, and share it whenever they read from the primary.
+get_request_db_session = get_async_db_session if DATABASE_ASYNC else get_db_session
+get_request_db_read_session = (
+    get_async_db_read_session if DATABASE_ASYNC else get_db_read_session
+)
 
 
 # Dependency factories
@@ -44,11 +66,77 @@ def get_syllabus_service(
     return SyllabusService(db=db)
 
 
-def get_authenticated_user(
+def get_result_db() -> ResultDatabase:
+    """Dependency factory for result database."""
+    return ResultDatabase()
+
+
+def get_result_service(
+    db: Annotated[ResultDatabase, Depends(get_result_db)],
+) -> ResultService:
+    """Dependency factory for result service."""
+    return ResultService(db=db)
+
+
+def get_analytics_db() -> AnalyticsDatabase:
+    """Dependency factory for analytics database."""
+    return AnalyticsDatabase()
+
+
+def get_analytics_service(
+    db: Annotated[AnalyticsDatabase, Depends(get_analytics_db)],
+) -> AnalyticsService:
+    """Dependency factory for analytics service."""
+    return AnalyticsService(db=db)
+
+
+def get_progress_db() -> ProgressDatabase:
+    """Dependency factory for progress database."""
+    return ProgressDatabase()
+
+
+def get_progress_service(
+    db: Annotated[ProgressDatabase, Depends(get_progress_db)],
+) -> ProgressService:
+    """Dependency factory for progress service."""
+    return ProgressService(db=db)
+
+
+def get_admin_service() -> AdminService:
+    """Dependency factory for admin service."""
+    return AdminService()
+
+
+async def get_authenticated_principal(
     request: Request,
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
-    db_session: Annotated[Session, Depends(get_db_session)],
-) -> User:
-    """Dependency that verifies JWT token from HTTP-only cookie and returns the current authenticated user."""
+    db_session: Annotated[Session | AsyncSession, Depends(get_request_db_read_session)],
+) -> AuthenticatedPrincipal:
+    """Dependency that verifies JWT token from HTTP-only cookie and returns the caller's identity and role."""
     token = request.cookies.get(ACCESS_TOKEN_COOKIE_NAME)
-    return auth_service.verify_authentication(db_session, token)
+
+    # NOTE: In stateless mode the token claims are trusted as-is, so no database connection is checked out
+    if AUTH_STATELESS:
+        return auth_service.verify_principal(token)
+
+    user = await run_in_session(db_session, auth_service.verify_authentication, token)
+
+    return AuthenticatedPrincipal.model_validate(user, from_attributes=True)
+
+
+async def get_admin_principal(
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    authenticated_principal: Annotated[
+        AuthenticatedPrincipal, Depends(get_authenticated_principal)
+    ],
+) -> AuthenticatedPrincipal:
+    """Dependency that returns the authenticated principal if they are an admin."""
+    return auth_service.verify_admin(authenticated_principal)
+
+
+def verify_metrics_scraper(
+    admin_service: Annotated[AdminService, Depends(get_admin_service)],
+    authorization: Annotated[Optional[str], Header()] = None,
+) -> None:
+    """Dependency that requires the metrics token as a bearer token, when one is configured."""
+    admin_service.verify_metrics_scraper(authorization)
@@ -0,0 +1,136 @@
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Coroutine, Optional
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+)
+from config.environment import DATABASE_SLOW_QUERY_MS
+
+logger = logging.getLogger("app.sql")
+
+
+@dataclass
+class QueryStats:
+    """SQL statements issued while handling a single request."""
+
+    count: int = 0
+    duration_seconds: float = 0.0
+
+
+# NOTE: The context is copied into threadpool workers and SQLAlchemy's async greenlets, so mutations are seen here
+request_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = perf_counter() - conn.info["query_started_at"].pop()
+
+    query_stats = request_query_stats.get()
+    if query_stats is not None:
+        query_stats.count += 1
+        query_stats.duration_seconds += duration
+
+    if DATABASE_SLOW_QUERY_MS > 0 and duration * 1000 >= DATABASE_SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s", duration * 1000, statement)
+
+
+def _handle_error(exception_context: Any):
+    # NOTE: after_cursor_execute doesn't run for failed statements, so drop their start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def instrument_engine(engine: Engine):
+    """Count statements and accumulate their duration for the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware that reports database and application time in a Server-Timing header."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        query_stats = QueryStats()
+        token = request_query_stats.set(query_stats)
+        started_at = perf_counter()
+
+        async def send_with_server_timing(message: Message):
+            if message["type"] == "http.response.start":
+                app_duration_ms = (perf_counter() - started_at) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f"db;dur={query_stats.duration_seconds * 1000:.2f}, "
+                    f'db-count;desc="{query_stats.count}", '
+                    f"app;dur={app_duration_ms:.2f}",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            request_query_stats.reset(token)
+
+
+class MetricsRoute(APIRoute):
+    """Route that records its latency, in-flight requests and response statuses, labelled by its templated path."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+        # NOTE: The templated path keeps the label cardinality bounded by the number of routes, not of resources
+        route = self.path_format
+
+        async def metrics_route_handler(request: Request) -> Response:
+            labels = (request.method, route)
+            in_flight = http_requests_in_flight.labels(*labels)
+            in_flight.inc()
+
+            status_code = 500
+            started_at = perf_counter()
+            try:
+                response = await route_handler(request)
+                status_code = response.status_code
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                status_code = 422
+                raise
+            finally:
+                # NOTE: Streamed bodies are sent after the handler returns, so their duration is to the first byte
+                http_request_duration_seconds.labels(*labels).observe(
+                    perf_counter() - started_at
+                )
+                http_requests_total.labels(*labels, str(status_code)).inc()
+                in_flight.dec()
+
+            return response
+
+        return metrics_route_handler
@@ -0,0 +1,77 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from math import ceil
+from time import time
+from typing import Any, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.database import READ_PRIMARY_COOKIE_NAME
+from config.environment import (
+    COOKIE_SAME_SITE,
+    COOKIE_SECURE,
+    DATABASE_READ_YOUR_WRITES_SECONDS,
+)
+
+# NOTE: Read sessions go to a replica that applies the primary's writes with some lag, so a caller who just wrote
+#       could read their own write back as missing. Responses to requests that committed on the primary carry a
+#       cookie that keeps the caller's reads on the primary for a short window, which also holds across workers.
+
+
+@dataclass
+class PrimaryWrites:
+    """Whether the request being handled committed a transaction on the primary."""
+
+    committed: bool = False
+
+
+# NOTE: The context is copied into threadpool workers and SQLAlchemy's async greenlets, so mutations are seen here
+request_primary_writes: ContextVar[Optional[PrimaryWrites]] = ContextVar(
+    "request_primary_writes", default=None
+)
+
+
+def _commit(conn: Any):
+    primary_writes = request_primary_writes.get()
+    if primary_writes is not None:
+        primary_writes.committed = True
+
+
+def track_primary_writes(engine: Engine):
+    """Record the commits made on the primary for the current request."""
+    # NOTE: Sessions roll back transactions they close without committing, so only writes reach this event
+    event.listen(engine, "commit", _commit)
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware that keeps the reads of a caller who just wrote on the primary, through a short-lived cookie."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        primary_writes = PrimaryWrites()
+        token = request_primary_writes.set(primary_writes)
+
+        async def send_with_read_primary_cookie(message: Message):
+            if message["type"] == "http.response.start" and primary_writes.committed:
+                cookie = (
+                    f"{READ_PRIMARY_COOKIE_NAME}={time() + DATABASE_READ_YOUR_WRITES_SECONDS:.3f}; "
+                    f"Max-Age={ceil(DATABASE_READ_YOUR_WRITES_SECONDS)}; Path=/; HttpOnly; "
+                    f"SameSite={COOKIE_SAME_SITE}"
+                )
+                if COOKIE_SECURE:
+                    cookie += "; Secure"
+                MutableHeaders(scope=message).append("Set-Cookie", cookie)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_read_primary_cookie)
+        finally:
+            request_primary_writes.reset(token)
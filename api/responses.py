@@ -0,0 +1,42 @@
+from typing import Any, Mapping, Optional
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+from starlette.background import BackgroundTask
+
+# NOTE: FastAPI serializes a route's return value to a dict in JSON mode and then encodes that dict again with the
+#       json module. Routes that return this response with their response model skip both steps: the model's
+#       compiled serializer writes the bytes directly. Validation is not repeated either way, since the models
+#       wrap table instances that were validated when built.
+
+
+class PydanticJSONResponse(JSONResponse):
+    """JSON response rendered to bytes by pydantic-core, straight from a response model when given one."""
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+        exclude_none: bool = False,
+    ):
+        """Initialize the response, excluding None fields of a response model when asked to."""
+        self.exclude_none = exclude_none
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        """Render a response model with its own serializer and anything else by inference."""
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(
+                content, exclude_none=self.exclude_none
+            )
+
+        return to_json(content)
+
+
+class PrometheusTextResponse(PlainTextResponse):
+    """Metrics in the Prometheus text exposition format."""
+
+    media_type = "text/plain; version=0.0.4"
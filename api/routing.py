@@ -0,0 +1,6 @@
+from .admission import AdmissionRoute
+from .instrumentation import MetricsRoute
+
+
+class AppRoute(MetricsRoute, AdmissionRoute):
+    """Route class of the API routers, which records metrics around admission so that shed requests count as 503s."""
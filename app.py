@@ -1,24 +1,50 @@
-from config.environment import CORS_ORIGINS, ENVIRONMENT, PORT, RELOAD
+from config.environment import CORS_ORIGINS, PORT, RELOAD
 
 from contextlib import asynccontextmanager
-from dotenv import load_dotenv
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
-
-# NOTE: Load environment variables before importing modules that use them
-if ENVIRONMENT == "development":
-    load_dotenv(".env.local")
-
 from fastapi import FastAPI
 from routes import api_router
-from config.database import create_db_and_tables
+from routes.metrics import router as metrics_router
+from config.database import (
+    DATABASE_REPLICA_URL,
+    async_engine,
+    async_read_engine,
+    create_db_and_tables,
+    dispose_engines,
+    engine,
+    read_engine,
+    warm_up_db_pool,
+)
+from api.instrumentation import ServerTimingMiddleware, instrument_engine
+from api.replica import ReadYourWritesMiddleware, track_primary_writes
+from api.responses import PydanticJSONResponse
+from services.admission import configure_threadpool
+from services.password import password_hash_pool
+from services.warmup import warm_up_queries
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """Lifespan event handler for startup and shutdown."""
+    configure_threadpool()
     create_db_and_tables()
+    await warm_up_db_pool()
+    await warm_up_queries()
     yield
+    password_hash_pool.shutdown()
+    await dispose_engines()
+
+
+instrument_engine(engine)
+track_primary_writes(engine)
+if DATABASE_REPLICA_URL:
+    instrument_engine(read_engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+    track_primary_writes(async_engine.sync_engine)
+    if DATABASE_REPLICA_URL and async_read_engine is not None:
+        instrument_engine(async_read_engine.sync_engine)
 
 
 app = FastAPI(
@@ -26,8 +52,11 @@ app = FastAPI(
     description="Backend API for portfolio and CS class management",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=PydanticJSONResponse,
 )
 
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS,
@@ -36,6 +65,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.include_router(api_router, prefix="/api")
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -44,6 +74,7 @@ def index():
     return {"message": "Portfolio Backend API", "version": "1.0.0"}
 
 
+# NOTE: A single process for development, production runs several workers with "python -m scripts.serve"
 if __name__ == "__main__":
     uvicorn.run("app:app", host="0.0.0.0", port=PORT, reload=RELOAD)
     # NOTE: When reload=True, the application instance must be assigned as a string in the format "<module>:<app>"
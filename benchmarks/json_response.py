@@ -0,0 +1,112 @@
+"""Microbenchmark of rendering the syllabus list response through FastAPI's default path vs PydanticJSONResponse.
+
+Usage:
+    python -m benchmarks.json_response --items 1000 --rounds 50
+
+The default path is what FastAPI does with a route's returned model: validate it against the response model,
+serialize it to a dict in JSON mode, then encode that dict with the json module. The default class path is the
+same with PydanticJSONResponse as the response class, which routes that return models get. The direct path is
+what the read routes do by returning PydanticJSONResponse with the model, serializing it straight to bytes.
+"""
+
+import os
+import asyncio
+import argparse
+import json
+from datetime import date, datetime, timedelta, timezone
+from time import perf_counter
+from typing import Awaitable, Callable
+from uuid import uuid4
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+# NOTE: Set placeholders before importing modules that read them, no database connection is made
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/benchmark")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from models import Syllabus
+from schemas.syllabus import SyllabusesGetResponse
+from custom_types.enums import SubjectCode, SyllabusLevel
+from api.responses import PydanticJSONResponse
+
+RESPONSE_FIELD = create_model_field(
+    name="Response", type_=SyllabusesGetResponse, mode="serialization"
+)
+
+
+async def render_default(response: SyllabusesGetResponse) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=response)
+
+    return JSONResponse(content).body
+
+
+async def render_default_class(response: SyllabusesGetResponse) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=response)
+
+    return PydanticJSONResponse(content).body
+
+
+async def render_direct(response: SyllabusesGetResponse) -> bytes:
+    return PydanticJSONResponse(response).body
+
+
+async def run(
+    render: Callable[[SyllabusesGetResponse], Awaitable[bytes]],
+    response: SyllabusesGetResponse,
+    rounds: int,
+) -> float:
+    """Render the response for the given number of rounds and return milliseconds per render."""
+    started_at = perf_counter()
+    for _ in range(rounds):
+        await render(response)
+
+    return (perf_counter() - started_at) * 1000 / rounds
+
+
+async def benchmark(items: int, rounds: int) -> None:
+    now = datetime.now(timezone.utc)
+    syllabuses = [
+        Syllabus(
+            id=uuid4(),
+            name=f"Syllabus {index}",
+            description="A syllabus description of a typical length for the list.",
+            code=SubjectCode.EDEXCEL_IGCSE_CS,
+            level=SyllabusLevel.IGCSE,
+            examination_date=date.today() + timedelta(days=index),
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(items)
+    ]
+    response = SyllabusesGetResponse(syllabuses=syllabuses, next_cursor=None)
+
+    bodies = [
+        await render(response)
+        for render in (render_default, render_default_class, render_direct)
+    ]
+    assert all(json.loads(body) == json.loads(bodies[0]) for body in bodies)
+
+    default = await run(render_default, response, rounds)
+    default_class = await run(render_default_class, response, rounds)
+    direct = await run(render_direct, response, rounds)
+
+    print(f"{items} items, {len(bodies[0]):,} bytes")
+    print(f"default:       {default:8.2f} ms/response")
+    print(
+        f"default class: {default_class:8.2f} ms/response ({default / default_class:.2f}x)"
+    )
+    print(f"direct:        {direct:8.2f} ms/response ({default / direct:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.items, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,688 @@
+"""Load test of the auth, user and syllabus routes against a seeded synthetic dataset, with a regression gate.
+
+Usage:
+    python -m benchmarks.load --scale 1 --concurrency 8 --requests 200 --output load.json
+    python -m benchmarks.load --transport http --baseline load.json --threshold 0.25
+
+Every run seeds its own users, syllabuses, lessons, files, tests and results into DATABASE_URL, then drives one
+endpoint at a time with concurrent clients, each logged in as a different student, and deletes the dataset at
+the end. The asgi transport calls the app in-process, the http transport runs it under uvicorn in a subprocess
+and goes through real sockets. Postgres is required, the database layer relies on COPY, unnest and ON CONFLICT.
+
+Throughput, p50, p95 and p99 per endpoint are printed and written to --output as JSON. With --baseline, the run
+exits with status 1 when an endpoint's latency at --metric grew by more than --threshold, or when an endpoint
+that had no errors in the baseline now has some.
+"""
+
+import os
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from itertools import count
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+import httpx
+from sqlmodel import Session, insert
+
+from app import app
+from models import User, Syllabus, Lesson, File, Test, Result, UserSyllabus
+from database.progress import ProgressDatabase
+from database.syllabus import SyllabusDatabase
+from database.user import UserDatabase
+from services.password import PasswordService
+from custom_types.enums import FileType, SubjectCode, SyllabusLevel, UserType
+from config.database import engine, unit_of_work
+
+SEED_PASSWORD = "load-test-password"
+
+# NOTE: Rows per unit of --scale, every student is enrolled in ENROLMENTS_PER_STUDENT syllabuses and has a
+#       result for each of their tests
+STUDENTS_PER_SCALE = 200
+SYLLABUSES_PER_SCALE = 20
+LESSONS_PER_SYLLABUS = 12
+FILES_PER_LESSON = 4
+TESTS_PER_SYLLABUS = 6
+ENROLMENTS_PER_STUDENT = 3
+
+# NOTE: Registered users and created syllabuses that each batch request updates
+BATCH_SIZE = 10
+
+SERVER_STARTUP_TIMEOUT = 30  # seconds
+
+
+@dataclass
+class SeededUser:
+    id: UUID
+    email: str
+    syllabus_ids: List[UUID]
+
+
+@dataclass
+class Dataset:
+    run_id: str
+    students: List[SeededUser]
+    admin: SeededUser
+    syllabus_ids: List[UUID]
+
+
+@dataclass
+class VirtualClient:
+    """A client logged in as one user, with a second cookie jar for requests that must not replace its tokens."""
+
+    user: SeededUser
+    session: httpx.AsyncClient
+    anonymous: httpx.AsyncClient
+
+
+@dataclass
+class RunState:
+    dataset: Dataset
+    registered_user_ids: List[UUID] = field(default_factory=list)
+    created_syllabus_ids: List[UUID] = field(default_factory=list)
+
+
+@dataclass
+class Endpoint:
+    name: str
+    send: Callable[[VirtualClient, int], Awaitable[httpx.Response]]
+    # NOTE: Runs unmeasured before every request, for requests that use up the client's state
+    prepare: Optional[Callable[[VirtualClient, int], Awaitable[Any]]] = None
+    admin: bool = False
+
+
+def seed(db_session: Session, scale: int, password_hash: str) -> Dataset:
+    """Insert a synthetic dataset tagged with a run ID and build its progress summaries."""
+    run_id = uuid4().hex[:8]
+    today = date.today()
+
+    syllabuses = [
+        {
+            "id": uuid4(),
+            "name": f"Load {run_id} syllabus {index}",
+            "description": "A synthetic syllabus seeded for load testing.",
+            "code": SubjectCode.EDEXCEL_IGCSE_CS,
+            "level": SyllabusLevel.IGCSE,
+            "examination_date": today + timedelta(days=180 + index),
+        }
+        for index in range(SYLLABUSES_PER_SCALE * scale)
+    ]
+    lessons = [
+        {
+            "id": uuid4(),
+            "title": f"Lesson {index}",
+            "description": "A synthetic lesson.",
+            "conducted_at": today - timedelta(days=index),
+            "syllabus_id": syllabus["id"],
+        }
+        for syllabus in syllabuses
+        for index in range(LESSONS_PER_SYLLABUS)
+    ]
+    files = [
+        {
+            "id": uuid4(),
+            "title": f"File {index}",
+            "description": "A synthetic file.",
+            "filename": f"file-{index}.pdf",
+            "gdrive_url": "https://drive.google.com/file",
+            "completed": index % 2 == 0,
+            "type": FileType.NOTE,
+            "lesson_id": lesson["id"],
+        }
+        for lesson in lessons
+        for index in range(FILES_PER_LESSON)
+    ]
+    tests = [
+        {
+            "id": uuid4(),
+            "title": f"Test {index}",
+            "description": "A synthetic test.",
+            "total_marks": 100,
+            "duration": 60,
+            "conducted_at": today - timedelta(days=index),
+            "syllabus_id": syllabus["id"],
+        }
+        for syllabus in syllabuses
+        for index in range(TESTS_PER_SYLLABUS)
+    ]
+    users = [
+        {
+            "id": uuid4(),
+            "first_name": "Load",
+            "last_name": f"Student {index}",
+            "email": f"load-{run_id}-{index}@example.com",
+            "password": password_hash,
+            "type": UserType.STUDENT,
+        }
+        for index in range(STUDENTS_PER_SCALE * scale)
+    ]
+    admin = {
+        "id": uuid4(),
+        "first_name": "Load",
+        "last_name": "Admin",
+        "email": f"load-{run_id}-admin@example.com",
+        "password": password_hash,
+        "type": UserType.ADMIN,
+    }
+
+    tests_by_syllabus: Dict[UUID, List[UUID]] = {}
+    for test in tests:
+        tests_by_syllabus.setdefault(test["syllabus_id"], []).append(test["id"])
+
+    students: List[SeededUser] = []
+    user_syllabuses: List[Dict[str, Any]] = []
+    results: List[Dict[str, Any]] = []
+    for index, user in enumerate(users):
+        syllabus_ids = [
+            syllabuses[(index + offset) % len(syllabuses)]["id"]
+            for offset in range(min(ENROLMENTS_PER_STUDENT, len(syllabuses)))
+        ]
+        students.append(SeededUser(user["id"], user["email"], syllabus_ids))
+        for syllabus_id in syllabus_ids:
+            user_syllabus_id = uuid4()
+            user_syllabuses.append(
+                {
+                    "id": user_syllabus_id,
+                    "user_id": user["id"],
+                    "syllabus_id": syllabus_id,
+                }
+            )
+            results.extend(
+                {
+                    "id": uuid4(),
+                    "score": random.randint(0, 100),
+                    "test_id": test_id,
+                    "user_syllabus_id": user_syllabus_id,
+                }
+                for test_id in tests_by_syllabus[syllabus_id]
+            )
+
+    # NOTE: Bulk inserts skip the mapper events, so the progress summaries are rebuilt afterwards
+    for model, rows in (
+        (User, users + [admin]),
+        (Syllabus, syllabuses),
+        (Lesson, lessons),
+        (File, files),
+        (Test, tests),
+        (UserSyllabus, user_syllabuses),
+        (Result, results),
+    ):
+        db_session.execute(insert(model), rows)
+    db_session.commit()
+    ProgressDatabase().rebuild_progress(db_session)
+
+    return Dataset(
+        run_id=run_id,
+        students=students,
+        admin=SeededUser(admin["id"], admin["email"], []),
+        syllabus_ids=[syllabus["id"] for syllabus in syllabuses],
+    )
+
+
+def delete_dataset(db_session: Session, state: RunState) -> None:
+    """Delete the seeded dataset along with the users and syllabuses the run created."""
+    user_ids = [student.id for student in state.dataset.students]
+    user_ids += [state.dataset.admin.id] + state.registered_user_ids
+    syllabus_ids = state.dataset.syllabus_ids + state.created_syllabus_ids
+
+    with unit_of_work(db_session):
+        UserDatabase().delete_users(db_session, user_ids)
+        SyllabusDatabase().delete_syllabuses(db_session, syllabus_ids)
+
+
+def build_endpoints(state: RunState) -> List[Endpoint]:
+    """Build the requests for every auth, user and syllabus route, in the order they run."""
+    run_id = state.dataset.run_id
+
+    async def login(client: VirtualClient, http: httpx.AsyncClient) -> httpx.Response:
+        return await http.post(
+            "/api/auth/login",
+            json={"email": client.user.email, "password": SEED_PASSWORD},
+        )
+
+    async def register(client: VirtualClient, index: int) -> httpx.Response:
+        response = await client.anonymous.post(
+            "/api/auth/register",
+            json={
+                "first_name": "Load",
+                "last_name": f"Registered {index}",
+                "email": f"load-{run_id}-registered-{index}@example.com",
+                "password": SEED_PASSWORD,
+                "type": UserType.STUDENT,
+            },
+        )
+        if response.is_success:
+            state.registered_user_ids.append(UUID(response.json()["user"]["id"]))
+
+        return response
+
+    async def create_syllabus(client: VirtualClient, index: int) -> httpx.Response:
+        response = await client.session.post(
+            "/api/syllabus/",
+            json={
+                "name": f"Load {run_id} created {index}",
+                "description": "A syllabus created during load testing.",
+                "code": SubjectCode.EDEXCEL_IGCSE_CS,
+                "level": SyllabusLevel.IGCSE,
+                "examination_date": (date.today() + timedelta(days=365)).isoformat(),
+            },
+        )
+        if response.is_success:
+            state.created_syllabus_ids.append(UUID(response.json()["syllabus"]["id"]))
+
+        return response
+
+    def enrolled_syllabus_id(client: VirtualClient, index: int) -> UUID:
+        return client.user.syllabus_ids[index % len(client.user.syllabus_ids)]
+
+    def seeded_syllabus_id(index: int) -> UUID:
+        return state.dataset.syllabus_ids[index % len(state.dataset.syllabus_ids)]
+
+    def registered_user_id(index: int) -> UUID:
+        return state.registered_user_ids[index % len(state.registered_user_ids)]
+
+    def created_syllabus_id(index: int) -> UUID:
+        return state.created_syllabus_ids[index % len(state.created_syllabus_ids)]
+
+    # NOTE: Updates target the users and syllabuses created by the run, since changing a user's claims revokes
+    #       their access tokens and the seeded ones are logged in. Deletes consume them, one per request.
+    return [
+        Endpoint("POST /api/auth/register", register),
+        Endpoint(
+            "POST /api/auth/login", lambda client, _: login(client, client.anonymous)
+        ),
+        Endpoint(
+            "GET /api/auth/verify",
+            lambda client, _: client.session.get("/api/auth/verify"),
+        ),
+        Endpoint(
+            "POST /api/auth/refresh",
+            lambda client, _: client.session.post("/api/auth/refresh"),
+        ),
+        Endpoint(
+            "GET /api/users/{user_id}",
+            lambda client, _: client.session.get(f"/api/users/{client.user.id}"),
+        ),
+        Endpoint(
+            "PATCH /api/users/{user_id}",
+            lambda client, index: client.session.patch(
+                f"/api/users/{registered_user_id(index)}",
+                json={"last_name": f"Updated {index}"},
+            ),
+        ),
+        Endpoint(
+            "POST /api/users/batch",
+            lambda client, index: client.session.post(
+                "/api/users/batch",
+                json={
+                    "updates": [
+                        {
+                            "id": str(registered_user_id(index + offset)),
+                            "last_name": f"Batch {index}",
+                        }
+                        for offset in range(BATCH_SIZE)
+                    ]
+                },
+            ),
+            admin=True,
+        ),
+        Endpoint("POST /api/syllabus/", create_syllabus),
+        Endpoint(
+            "GET /api/syllabus/all",
+            lambda client, _: client.session.get("/api/syllabus/all"),
+        ),
+        Endpoint(
+            "GET /api/syllabus/{syllabus_id}",
+            lambda client, index: client.session.get(
+                f"/api/syllabus/{enrolled_syllabus_id(client, index)}"
+            ),
+        ),
+        Endpoint(
+            "GET /api/syllabus/{syllabus_id}/detail",
+            lambda client, index: client.session.get(
+                f"/api/syllabus/{enrolled_syllabus_id(client, index)}/detail"
+            ),
+        ),
+        Endpoint(
+            "GET /api/syllabus/{syllabus_id}/progress",
+            lambda client, index: client.session.get(
+                f"/api/syllabus/{enrolled_syllabus_id(client, index)}/progress"
+            ),
+        ),
+        Endpoint(
+            "GET /api/syllabus/{syllabus_id}/export",
+            lambda client, index: client.session.get(
+                f"/api/syllabus/{seeded_syllabus_id(index)}/export"
+            ),
+            admin=True,
+        ),
+        Endpoint(
+            "PATCH /api/syllabus/{syllabus_id}",
+            lambda client, index: client.session.patch(
+                f"/api/syllabus/{created_syllabus_id(index)}",
+                json={"description": f"Updated {index}"},
+            ),
+        ),
+        Endpoint(
+            "POST /api/syllabus/batch",
+            lambda client, index: client.session.post(
+                "/api/syllabus/batch",
+                json={
+                    "updates": [
+                        {
+                            "id": str(created_syllabus_id(index + offset)),
+                            "description": f"Batch {index}",
+                        }
+                        for offset in range(BATCH_SIZE)
+                    ]
+                },
+            ),
+            admin=True,
+        ),
+        Endpoint(
+            "DELETE /api/syllabus/{syllabus_id}",
+            lambda client, _: client.session.delete(
+                f"/api/syllabus/{state.created_syllabus_ids.pop()}"
+            ),
+        ),
+        Endpoint(
+            "DELETE /api/users/{user_id}",
+            lambda client, _: client.session.delete(
+                f"/api/users/{state.registered_user_ids.pop()}"
+            ),
+        ),
+        Endpoint(
+            "POST /api/auth/logout",
+            lambda client, _: client.anonymous.post("/api/auth/logout"),
+            prepare=lambda client, _: login(client, client.anonymous),
+        ),
+    ]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Get the nearest-rank percentile of sorted values."""
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+
+    return sorted_values[index]
+
+
+async def run_endpoint(
+    endpoint: Endpoint, clients: List[VirtualClient], requests: int
+) -> Dict[str, Any]:
+    """Send the endpoint's requests from every client concurrently and summarize their latencies."""
+    latencies: List[float] = []
+    busy_seconds: List[float] = []
+    errors = 0
+    indexes = count()
+
+    async def drive(client: VirtualClient) -> None:
+        nonlocal errors
+        busy = 0.0
+        while (index := next(indexes)) < requests:
+            if endpoint.prepare:
+                await endpoint.prepare(client, index)
+
+            started_at = perf_counter()
+            response = await endpoint.send(client, index)
+            latency = perf_counter() - started_at
+            latencies.append(latency)
+            busy += latency
+            if response.is_error:
+                errors += 1
+        busy_seconds.append(busy)
+
+    await asyncio.gather(*(drive(client) for client in clients))
+
+    # NOTE: Throughput is taken over the time clients spent waiting on measured requests, so that unmeasured
+    #       preparation doesn't count against it
+    latencies.sort()
+    average_busy_seconds = sum(busy_seconds) / len(busy_seconds)
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": (
+            len(latencies) / average_busy_seconds if average_busy_seconds else 0.0
+        ),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def create_clients(
+    make_client: Callable[[], httpx.AsyncClient], users: List[SeededUser]
+) -> List[VirtualClient]:
+    """Create a client per user and log each one in."""
+    clients = [VirtualClient(user, make_client(), make_client()) for user in users]
+    for client in clients:
+        response = await client.session.post(
+            "/api/auth/login",
+            json={"email": client.user.email, "password": SEED_PASSWORD},
+        )
+        response.raise_for_status()
+
+    return clients
+
+
+async def run_suite(
+    make_client: Callable[[], httpx.AsyncClient],
+    state: RunState,
+    concurrency: int,
+    requests: int,
+) -> Dict[str, Dict[str, Any]]:
+    """Run every endpoint in turn and return their summaries keyed by endpoint."""
+    students = [
+        state.dataset.students[index % len(state.dataset.students)]
+        for index in range(concurrency)
+    ]
+    clients = await create_clients(make_client, students)
+    admin_clients = await create_clients(
+        make_client, [state.dataset.admin] * concurrency
+    )
+
+    summaries: Dict[str, Dict[str, Any]] = {}
+    try:
+        for endpoint in build_endpoints(state):
+            summaries[endpoint.name] = await run_endpoint(
+                endpoint, admin_clients if endpoint.admin else clients, requests
+            )
+            print(format_summary(endpoint.name, summaries[endpoint.name]), flush=True)
+    finally:
+        for client in clients + admin_clients:
+            await client.session.aclose()
+            await client.anonymous.aclose()
+
+    return summaries
+
+
+async def run_asgi(
+    state: RunState, concurrency: int, requests: int
+) -> Dict[str, Dict[str, Any]]:
+    """Run the suite against the app in-process, inside its lifespan."""
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        return await run_suite(
+            lambda: httpx.AsyncClient(transport=transport, base_url="http://localhost"),
+            state,
+            concurrency,
+            requests,
+        )
+
+
+def find_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def serving_over_http(command: List[str], port: int) -> AsyncIterator[str]:
+    """Run a server command in a subprocess and yield its base URL once it serves, stopping it on exit."""
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(command, env=os.environ.copy())
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            deadline = perf_counter() + SERVER_STARTUP_TIMEOUT
+            while True:
+                try:
+                    (await probe.get("/")).raise_for_status()
+                    break
+                except httpx.TransportError:
+                    if perf_counter() > deadline or server.poll() is not None:
+                        raise RuntimeError(
+                            f"{command[2]} did not start serving in time"
+                        )
+                    await asyncio.sleep(0.1)
+
+        yield base_url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run_http(
+    state: RunState, concurrency: int, requests: int
+) -> Dict[str, Dict[str, Any]]:
+    """Run the suite over real sockets against the app served by uvicorn in a subprocess."""
+    port = find_free_port()
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+    async with serving_over_http(command, port) as base_url:
+        return await run_suite(
+            lambda: httpx.AsyncClient(base_url=base_url), state, concurrency, requests
+        )
+
+
+def format_summary(name: str, summary: Dict[str, Any]) -> str:
+    return (
+        f"{name:42} {summary['throughput']:9.1f} req/s  p50 {summary['p50_ms']:8.2f} ms  "
+        f"p95 {summary['p95_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms  errors {summary['errors']}"
+    )
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    metric: str,
+    threshold: float,
+    min_delta_ms: float,
+) -> List[str]:
+    """Describe every endpoint whose latency regressed beyond the threshold or that started failing."""
+    regressions: List[str] = []
+    for name, before in baseline["endpoints"].items():
+        after = current["endpoints"].get(name)
+        if after is None:
+            continue
+
+        before_ms, after_ms = before[f"{metric}_ms"], after[f"{metric}_ms"]
+        if (
+            after_ms > before_ms * (1 + threshold)
+            and after_ms - before_ms > min_delta_ms
+        ):
+            regressions.append(
+                f"{name}: {metric} {before_ms:.2f} ms -> {after_ms:.2f} ms "
+                f"(+{(after_ms / before_ms - 1) * 100:.0f}%)"
+            )
+
+        if after["errors"] and not before["errors"]:
+            regressions.append(
+                f"{name}: {after['errors']} errors, none in the baseline"
+            )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--requests", type=int, default=200, help="requests per endpoint"
+    )
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare the report with this JSON file")
+    parser.add_argument("--metric", choices=("p50", "p95", "p99"), default="p95")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="fraction the metric may grow by before it counts as a regression",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=1.0,
+        help="growth below this is treated as noise whatever the threshold",
+    )
+    args = parser.parse_args()
+
+    # NOTE: Every seeded user shares one hash, hashing one per user would dominate seeding
+    password_hash = asyncio.run(PasswordService.hash_password(SEED_PASSWORD))
+    with Session(engine) as db_session:
+        state = RunState(seed(db_session, args.scale, password_hash))
+
+    run = run_asgi if args.transport == "asgi" else run_http
+    try:
+        endpoints = asyncio.run(run(state, args.concurrency, args.requests))
+    finally:
+        with Session(engine) as db_session:
+            delete_dataset(db_session, state)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "transport": args.transport,
+        "scale": args.scale,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "endpoints": endpoints,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        # NOTE: Latencies are only comparable between runs of the same shape
+        for setting in ("transport", "scale", "concurrency"):
+            if baseline[setting] != report[setting]:
+                raise SystemExit(
+                    f"Baseline {setting} is {baseline[setting]}, this run's is {report[setting]}"
+                )
+        regressions = compare_reports(
+            baseline, report, args.metric, args.threshold, args.min_delta_ms
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+        print(
+            f"No {args.metric} regressions beyond {args.threshold:.0%} of {args.baseline}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Benchmark of tail latency under overload with and without admission control.
+
+Usage:
+    python -m benchmarks.overload --rate 600 --threads 8 --work-ms 20 --duration 5
+
+A sync route that holds a worker thread for --work-ms is served with the default route class and with
+AdmissionRoute, over ASGI in-process. Requests arrive at --rate per second for --duration seconds whether or not
+earlier ones have finished, as they do from many independent clients. With --threads threads the route serves
+threads * 1000 / work-ms requests per second, so the default rate is half again what it can serve. Without
+admission every request waits in the threadpool's queue and latency grows with the backlog for as long as the
+overload lasts. With it, requests beyond the route's limit and queue are shed with a 503 at once, and the
+admitted ones wait no longer than the queue timeout.
+"""
+
+import os
+import asyncio
+import argparse
+from time import perf_counter, sleep
+from typing import Dict, List, Type
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from starlette.types import Message
+
+# NOTE: Set placeholders before importing modules that read them, no database connection is made
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/benchmark")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from api.admission import AdmissionRoute
+from services.admission import AdmissionLimiter, admission_limiters
+from benchmarks.load import percentile
+
+
+def build_app(route_class: Type[APIRoute], work_ms: float) -> FastAPI:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/work", status_code=200)
+    def work():
+        sleep(work_ms / 1000)
+
+        return {}
+
+    app = FastAPI()
+    app.include_router(router)
+
+    return app
+
+
+async def call(app: FastAPI) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/work",
+        "raw_path": b"/work",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    status_codes: List[int] = []
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            status_codes.append(message["status"])
+
+    await app(scope, receive, send)
+
+    return status_codes[0]
+
+
+async def run(app: FastAPI, rate: float, duration: float) -> Dict[int, List[float]]:
+    """Send requests at the rate until the duration ends and return their latencies by status code."""
+    latencies: Dict[int, List[float]] = {}
+
+    async def timed_call():
+        started_at = perf_counter()
+        status_code = await call(app)
+        latencies.setdefault(status_code, []).append(
+            (perf_counter() - started_at) * 1000
+        )
+
+    requests = []
+    started_at = perf_counter()
+    for index in range(int(rate * duration)):
+        # NOTE: Sleeping even when behind schedule lets the requests already sent make progress
+        await asyncio.sleep(max(started_at + index / rate - perf_counter(), 0))
+        requests.append(asyncio.create_task(timed_call()))
+    await asyncio.gather(*requests)
+
+    return latencies
+
+
+def report(label: str, latencies: Dict[int, List[float]], duration: float) -> None:
+    print(f"{label}:")
+    for status_code, values in sorted(latencies.items()):
+        values.sort()
+        print(
+            f"  {status_code}: {len(values) / duration:8.1f} req/s  "
+            f"p50 {percentile(values, 0.5):8.1f} ms  "
+            f"p99 {percentile(values, 0.99):8.1f} ms  "
+            f"max {values[-1]:8.1f} ms"
+        )
+
+
+async def benchmark(
+    rate: float,
+    threads: int,
+    work_ms: float,
+    duration: float,
+    limit: int,
+    queue_size: int,
+    queue_timeout: float,
+) -> None:
+    current_default_thread_limiter().total_tokens = threads
+    admission_limiters[("GET", "/work")] = AdmissionLimiter(
+        method="GET",
+        route="/work",
+        limit=limit,
+        queue_size=queue_size,
+        queue_timeout=queue_timeout,
+        retry_after=1,
+    )
+
+    print(
+        f"{rate:g} requests/s, {threads} threads, {work_ms:g} ms of work per request, "
+        f"admission limit {limit}, queue {queue_size}, queue timeout {queue_timeout:g} s"
+    )
+    report(
+        "default route",
+        await run(build_app(APIRoute, work_ms), rate, duration),
+        duration,
+    )
+    report(
+        "admission route",
+        await run(build_app(AdmissionRoute, work_ms), rate, duration),
+        duration,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=600)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--work-ms", type=float, default=20)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=0.25)
+    args = parser.parse_args()
+
+    asyncio.run(
+        benchmark(
+            args.rate,
+            args.threads,
+            args.work_ms,
+            args.duration,
+            args.limit,
+            args.queue_size,
+            args.queue_timeout,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark of read throughput as the production server runs more worker processes.
+
+Usage:
+    python -m benchmarks.scaling --workers 1 2 4 --concurrency 32 --requests 400
+
+The synthetic dataset of benchmarks.load is seeded into DATABASE_URL, then for each worker count the app is served
+by scripts.serve in a subprocess and the read routes are driven over real sockets by concurrent clients, each
+logged in as a different student. A single worker runs route code on one core, so throughput should grow with
+workers until the cores, Postgres or the client run out. Speedup is against the first worker count.
+
+The clients share this process's event loop and compete with the workers for the same cores, so on a host with
+few cores the client saturates first, run the server on a separate host to measure past that.
+"""
+
+import os
+import argparse
+import asyncio
+import sys
+from time import perf_counter
+from typing import Any, Dict, List
+import httpx
+from sqlmodel import Session
+
+from benchmarks.load import (
+    RunState,
+    build_endpoints,
+    create_clients,
+    delete_dataset,
+    find_free_port,
+    format_summary,
+    run_endpoint,
+    seed,
+    serving_over_http,
+    SEED_PASSWORD,
+)
+from services.password import PasswordService
+from config.database import engine
+
+READ_ENDPOINTS = (
+    "GET /api/auth/verify",
+    "GET /api/users/{user_id}",
+    "GET /api/syllabus/all",
+    "GET /api/syllabus/{syllabus_id}",
+    "GET /api/syllabus/{syllabus_id}/detail",
+    "GET /api/syllabus/{syllabus_id}/progress",
+)
+
+
+async def run_workers(
+    state: RunState, workers: int, concurrency: int, requests: int
+) -> Dict[str, Any]:
+    """Serve the app with the workers and return the throughput over every read route and the worst p99."""
+    port = find_free_port()
+    command = [
+        sys.executable,
+        "-m",
+        "scripts.serve",
+        "--workers",
+        str(workers),
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+    async with serving_over_http(command, port) as base_url:
+        students = [
+            state.dataset.students[index % len(state.dataset.students)]
+            for index in range(concurrency)
+        ]
+        # NOTE: Connections are kept alive, so a client sticks to the worker that accepted it
+        clients = await create_clients(
+            lambda: httpx.AsyncClient(base_url=base_url), students
+        )
+        try:
+            total_requests, total_seconds, worst_p99_ms = 0, 0.0, 0.0
+            for endpoint in build_endpoints(state):
+                if endpoint.name not in READ_ENDPOINTS:
+                    continue
+
+                started_at = perf_counter()
+                summary = await run_endpoint(endpoint, clients, requests)
+                total_seconds += perf_counter() - started_at
+                total_requests += summary["requests"]
+                worst_p99_ms = max(worst_p99_ms, summary["p99_ms"])
+                print(f"  {format_summary(endpoint.name, summary)}", flush=True)
+        finally:
+            for client in clients:
+                await client.session.aclose()
+                await client.anonymous.aclose()
+
+    return {"throughput": total_requests / total_seconds, "p99_ms": worst_p99_ms}
+
+
+async def benchmark(
+    state: RunState, worker_counts: List[int], concurrency: int, requests: int
+) -> None:
+    results: Dict[int, Dict[str, Any]] = {}
+    for workers in worker_counts:
+        print(f"{workers} workers:", flush=True)
+        results[workers] = await run_workers(state, workers, concurrency, requests)
+
+    print(
+        f"{os.cpu_count()} cores, {concurrency} clients, {requests} requests per route"
+    )
+    baseline = results[worker_counts[0]]["throughput"]
+    for workers, result in results.items():
+        print(
+            f"  {workers:3} workers: {result['throughput']:9.1f} req/s  "
+            f"speedup {result['throughput'] / baseline:5.2f}x  worst p99 {result['p99_ms']:8.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts"
+    )
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400, help="requests per route")
+    args = parser.parse_args()
+
+    password_hash = asyncio.run(PasswordService.hash_password(SEED_PASSWORD))
+    with Session(engine) as db_session:
+        state = RunState(seed(db_session, args.scale, password_hash))
+
+    try:
+        asyncio.run(benchmark(state, args.workers, args.concurrency, args.requests))
+    finally:
+        with Session(engine) as db_session:
+            delete_dataset(db_session, state)
+
+
+if __name__ == "__main__":
+    main()
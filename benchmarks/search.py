@@ -0,0 +1,217 @@
+"""Benchmark of search latency over a million searchable rows, for students enrolled in few and in many syllabuses.
+
+Usage:
+    python -m benchmarks.search --rows 1000000 --enrolments 5 500 --searches 50
+
+Syllabuses, lessons, files and tests are inserted into DATABASE_URL in the proportions of benchmarks.load's
+dataset, with INSERT ... SELECT so that a million rows take a minute rather than an hour. Their text is drawn from
+a fixed vocabulary, skewed so that some words occur in a large share of the rows and others in very few. For every
+--enrolments count a student is enrolled in that many syllabuses and each query is run --searches times through
+SyllabusService, the way the route runs it, then p50 and p99 are printed. Misspelt queries only match with
+SEARCH_TRIGRAM. The dataset is deleted at the end.
+"""
+
+import argparse
+from time import perf_counter
+from typing import List
+from uuid import UUID, uuid4
+from sqlalchemy import text
+from sqlmodel import Session, insert
+
+from models import User, Syllabus, UserSyllabus
+from database.syllabus import SyllabusDatabase
+from database.user import UserDatabase
+from services.syllabus import SyllabusService
+from custom_types.enums import SubjectCode, SyllabusLevel, UserType
+from config.database import create_db_and_tables, engine, unit_of_work
+from config.environment import SEARCH_TRIGRAM
+from benchmarks.load import (
+    FILES_PER_LESSON,
+    LESSONS_PER_SYLLABUS,
+    TESTS_PER_SYLLABUS,
+    percentile,
+)
+
+# NOTE: Drawn with a skew towards the start, so the first words are common and the last ones rare
+VOCABULARY = (
+    "introduction revision practice notes algorithms data structures programming "
+    "networks databases security binary logic arrays sorting searching recursion "
+    "hardware software compression encryption protocols iteration variables functions "
+    "testing validation boolean flowcharts pseudocode queues stacks graphs trees hashing "
+    "dijkstra bubble merge insertion quicksort subroutines parameters interrupts registers "
+    "pipelining virtualisation normalisation transactions concurrency spreadsheets robotics"
+).split()
+WORDS_PER_TITLE = 3
+WORDS_PER_DESCRIPTION = 12
+ROWS_PER_SYLLABUS = (
+    1 + LESSONS_PER_SYLLABUS * (1 + FILES_PER_LESSON) + TESTS_PER_SYLLABUS
+)
+
+QUERIES = (
+    "algorithms",
+    "data structures",
+    "sort",
+    "quicks",
+    "pipelining",
+    "normalisatoin",
+)
+
+
+def random_words(count: int) -> str:
+    """SQL for a string of words drawn at random from the vocabulary for every row."""
+    return " || ' ' || ".join(
+        ["(:vocabulary)[1 + floor(power(random(), 3) * :vocabulary_size)::int]"] * count
+    )
+
+
+def seed(db_session: Session, rows: int) -> List[UUID]:
+    """Insert about the number of searchable rows and return the syllabus IDs."""
+    syllabus_ids = [uuid4() for _ in range(max(rows // ROWS_PER_SYLLABUS, 1))]
+    db_session.execute(
+        insert(Syllabus),
+        [
+            {
+                "id": syllabus_id,
+                "name": f"Search benchmark {index}",
+                "description": "A synthetic syllabus seeded for search benchmarking.",
+                "code": SubjectCode.EDEXCEL_IGCSE_CS,
+                "level": SyllabusLevel.IGCSE,
+                "examination_date": "2030-01-01",
+            }
+            for index, syllabus_id in enumerate(syllabus_ids)
+        ],
+    )
+
+    parameters = {
+        "syllabus_ids": syllabus_ids,
+        "vocabulary": list(VOCABULARY),
+        "vocabulary_size": len(VOCABULARY),
+    }
+    # NOTE: Syllabus text is drawn too, so that syllabuses match like the rows under them
+    db_session.execute(
+        text(
+            f"UPDATE syllabus SET name = {random_words(WORDS_PER_TITLE)}, "
+            f"description = {random_words(WORDS_PER_DESCRIPTION)} "
+            "WHERE id = ANY(:syllabus_ids)"
+        ),
+        parameters,
+    )
+    db_session.execute(
+        text(
+            "INSERT INTO lesson (id, title, description, conducted_at, syllabus_id) "
+            f"SELECT gen_random_uuid(), {random_words(WORDS_PER_TITLE)}, "
+            f"{random_words(WORDS_PER_DESCRIPTION)}, current_date, syllabus.id "
+            "FROM syllabus, generate_series(1, :lessons) "
+            "WHERE syllabus.id = ANY(:syllabus_ids)"
+        ),
+        {**parameters, "lessons": LESSONS_PER_SYLLABUS},
+    )
+    db_session.execute(
+        text(
+            "INSERT INTO file (id, title, description, filename, gdrive_url, completed, type, lesson_id) "
+            f"SELECT gen_random_uuid(), {random_words(WORDS_PER_TITLE)}, '', "
+            "'notes-' || generate_series || '.pdf', 'https://drive.google.com/file', false, 'NOTE', lesson.id "
+            "FROM lesson, generate_series(1, :files) "
+            "WHERE lesson.syllabus_id = ANY(:syllabus_ids)"
+        ),
+        {**parameters, "files": FILES_PER_LESSON},
+    )
+    db_session.execute(
+        text(
+            "INSERT INTO test (id, title, description, total_marks, duration, conducted_at, syllabus_id) "
+            f"SELECT gen_random_uuid(), {random_words(WORDS_PER_TITLE)}, '', 100, 60, current_date, syllabus.id "
+            "FROM syllabus, generate_series(1, :tests) "
+            "WHERE syllabus.id = ANY(:syllabus_ids)"
+        ),
+        {**parameters, "tests": TESTS_PER_SYLLABUS},
+    )
+    db_session.commit()
+    db_session.execute(text("ANALYZE syllabus, lesson, file, test"))
+
+    return syllabus_ids
+
+
+def create_student(db_session: Session, syllabus_ids: List[UUID]) -> UUID:
+    """Create a student enrolled in the syllabuses."""
+    user_id = uuid4()
+    db_session.execute(
+        insert(User),
+        [
+            {
+                "id": user_id,
+                "first_name": "Search",
+                "last_name": "Student",
+                "email": f"search-{user_id}@example.com",
+                "password": "unused",
+                "type": UserType.STUDENT,
+            }
+        ],
+    )
+    db_session.execute(
+        insert(UserSyllabus),
+        [
+            {"id": uuid4(), "user_id": user_id, "syllabus_id": syllabus_id}
+            for syllabus_id in syllabus_ids
+        ],
+    )
+    db_session.commit()
+    db_session.execute(text("ANALYZE user_syllabus"))
+
+    return user_id
+
+
+def benchmark(db_session: Session, user_id: UUID, searches: int, limit: int) -> None:
+    syllabus_service = SyllabusService(SyllabusDatabase())
+    for query in QUERIES:
+        latencies: List[float] = []
+        for _ in range(searches):
+            started_at = perf_counter()
+            results, _ = syllabus_service.search_syllabus_content(
+                db_session, user_id, query, limit
+            )
+            latencies.append((perf_counter() - started_at) * 1000)
+            db_session.rollback()
+
+        latencies.sort()
+        print(
+            f"  {query!r:18} {len(results):3} results  "
+            f"p50 {percentile(latencies, 0.5):8.2f} ms  p99 {percentile(latencies, 0.99):8.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--enrolments", type=int, nargs="+", default=[5, 500])
+    parser.add_argument("--searches", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    user_ids: List[UUID] = []
+    started_at = perf_counter()
+    with Session(engine) as db_session:
+        syllabus_ids = seed(db_session, args.rows)
+    print(
+        f"Seeded {len(syllabus_ids) * ROWS_PER_SYLLABUS:,} rows in {perf_counter() - started_at:.1f} s, "
+        f"trigram matching {'on' if SEARCH_TRIGRAM else 'off'}"
+    )
+
+    try:
+        for enrolments in args.enrolments:
+            with Session(engine) as db_session:
+                user_id = create_student(db_session, syllabus_ids[:enrolments])
+                user_ids.append(user_id)
+                print(
+                    f"{enrolments} syllabuses, {enrolments * ROWS_PER_SYLLABUS:,} rows in scope:"
+                )
+                benchmark(db_session, user_id, args.searches, args.limit)
+    finally:
+        with Session(engine) as db_session:
+            with unit_of_work(db_session):
+                UserDatabase().delete_users(db_session, user_ids)
+                SyllabusDatabase().delete_syllabuses(db_session, syllabus_ids)
+
+
+if __name__ == "__main__":
+    main()
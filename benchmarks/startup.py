@@ -0,0 +1,84 @@
+"""Profile of the startup path: importing the app, then the lifespan's schema check and pool warmup.
+
+Usage:
+    python -m benchmarks.startup --top 20
+
+Imports are profiled with -X importtime in a fresh interpreter, since the modules this process has already
+imported would be missing from the profile. The schema check and the whole lifespan startup, which also warms up
+the pool, then run here against DATABASE_URL the way they do before the first request is served.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+from time import perf_counter
+from typing import List, NamedTuple
+
+from app import app
+from config.database import create_db_and_tables
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+
+
+def profile_imports(module: str = "app") -> List[ImportTime]:
+    """Import a module in a fresh interpreter and return the time spent importing each module it pulled in."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    import_times: List[ImportTime] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        import_times.append(
+            ImportTime(
+                name.strip(), int(self_us) / 1_000_000, int(cumulative_us) / 1_000_000
+            )
+        )
+
+    return import_times
+
+
+async def time_lifespan_startup() -> float:
+    """Run the app's lifespan startup and return how long it took in seconds."""
+    started_at = perf_counter()
+    async with app.router.lifespan_context(app):
+        return perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    import_times = profile_imports()
+    app_import = next(
+        import_time for import_time in import_times if import_time.module == "app"
+    )
+    print(f"import app: {app_import.cumulative_seconds * 1000:8.1f} ms")
+    print(f"slowest {args.top} modules by self time:")
+    slowest = sorted(import_times, key=lambda import_time: -import_time.self_seconds)
+    for import_time in slowest[: args.top]:
+        print(f"  {import_time.self_seconds * 1000:8.1f} ms  {import_time.module}")
+
+    # NOTE: Creates the schema on the first run, so that the timings below are those of a current schema
+    create_db_and_tables()
+
+    started_at = perf_counter()
+    create_db_and_tables()
+    print(f"schema check:     {(perf_counter() - started_at) * 1000:8.1f} ms")
+    print(f"lifespan startup: {asyncio.run(time_lifespan_startup()) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
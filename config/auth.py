@@ -4,6 +4,9 @@ import os
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
+# NOTE: "true" authenticates requests from the access token claims alone, without loading the user from the database
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() == "true"
+
 # Cookie name configuration
 ACCESS_TOKEN_COOKIE_NAME = "access_token"
 REFRESH_TOKEN_COOKIE_NAME = "refresh_token"
@@ -11,3 +14,31 @@ REFRESH_TOKEN_COOKIE_NAME = "refresh_token"
 # Cookie max age configuration
 COOKIE_MAX_AGE_ACCESS = int(os.getenv("COOKIE_MAX_AGE_ACCESS", 900))  # 15 minutes
 COOKIE_MAX_AGE_REFRESH = int(os.getenv("COOKIE_MAX_AGE_REFRESH", 604800))  # 7 days
+
+# Authenticated user cache configuration
+# NOTE: Set the TTL to 0 to disable the cache and always reload the user from the database
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", 30))  # 30 seconds
+AUTH_USER_CACHE_MAX_SIZE = int(os.getenv("AUTH_USER_CACHE_MAX_SIZE", 10000))
+
+# Argon2 cost configuration
+# NOTE: Calibrate these for the host with "python -m scripts.calibrate_argon2", hashes made with other costs are upgraded on login
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 3))
+PASSWORD_ARGON2_MEMORY_COST = int(
+    os.getenv("PASSWORD_ARGON2_MEMORY_COST", 65536)
+)  # 64 MiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 4))
+
+# Verified token cache configuration
+# NOTE: Entries expire with their token, set the size to 0 to decode and validate every token
+JWT_VERIFY_CACHE_MAX_SIZE = int(os.getenv("JWT_VERIFY_CACHE_MAX_SIZE", 10000))
+
+# Password hashing pool configuration
+# NOTE: Totals for the host, "python -m scripts.serve" splits them between its worker processes
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+)
+# NOTE: Hash/verify jobs beyond this many (running + waiting) are rejected with 503
+PASSWORD_HASH_QUEUE_SIZE = int(
+    os.getenv("PASSWORD_HASH_QUEUE_SIZE", PASSWORD_HASH_WORKERS * 8)
+)
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))  # seconds
@@ -1,29 +1,447 @@
 import os
-from typing import Generator
+import logging
+from contextlib import contextmanager
+from hashlib import sha256
+from threading import Lock
+from time import perf_counter, time
+from itertools import islice
+from typing import (
+    Annotated,
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    TypeVar,
+)
+from fastapi import Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import (
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    delete,
+    exc,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import DATABASE_EXTENSIONS
+
+from .environment import (
+    ENVIRONMENT,
+    DATABASE_ECHO,
+    DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_POOL_WARMUP,
+)
+
+T = TypeVar("T")
 
-from .environment import ENVIRONMENT
+logger = logging.getLogger("app.schema")
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
-    connect_args={
-        "sslmode": "require" if ENVIRONMENT == "production" else "allow",
-    },
+# NOTE: "true" serves requests through an AsyncEngine (psycopg 3), "false" keeps the psycopg2 threadpool path
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() == "true"
+
+# NOTE: Optional streaming replica of DATABASE_URL with its own pool, read-only routes are served from it when set
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+# NOTE: Set on responses to requests that committed a write, holds the time until which the caller reads the primary
+READ_PRIMARY_COOKIE_NAME = "read_primary_until"
+
+DATABASE_CONNECT_ARGS = {
+    "sslmode": "require" if ENVIRONMENT == "production" else "allow",
+}
+
+
+class CheckoutTimingMixin:
+    """Pool mixin that records how long each connection checkout waits."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkout_count = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+        self._checkout_lock = Lock()
+
+    def connect(self) -> PoolProxiedConnection:
+        started_at = perf_counter()
+        try:
+            connection = super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            with self._checkout_lock:
+                self.checkout_timeouts += 1
+            raise
+
+        wait = perf_counter() - started_at
+        with self._checkout_lock:
+            self.checkout_count += 1
+            self.checkout_wait_seconds_total += wait
+            self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, wait)
+
+        return connection
+
+
+class TimedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+DATABASE_POOL_ARGS: Dict[str, Any] = {
+    "pool_size": DATABASE_POOL_SIZE,
+    "max_overflow": DATABASE_MAX_OVERFLOW,
+    "pool_timeout": DATABASE_POOL_TIMEOUT,
+    "pool_recycle": DATABASE_POOL_RECYCLE,
+    "pool_pre_ping": DATABASE_POOL_PRE_PING,
+}
+
+
+def _create_engine(url: str) -> Engine:
+    return create_engine(
+        url,
+        echo=DATABASE_ECHO,
+        connect_args=DATABASE_CONNECT_ARGS,
+        poolclass=TimedQueuePool,
+        **DATABASE_POOL_ARGS,
+    )
+
+
+def _create_async_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        make_url(url).set(drivername="postgresql+psycopg"),
+        echo=DATABASE_ECHO,
+        connect_args=DATABASE_CONNECT_ARGS,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **DATABASE_POOL_ARGS,
+    )
+
+
+engine = _create_engine(DATABASE_URL)
+# NOTE: The primary itself when there is no replica, so read sessions never need to check for one
+read_engine = _create_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
+
+async_engine: AsyncEngine | None = None
+async_read_engine: AsyncEngine | None = None
+if DATABASE_ASYNC:
+    async_engine = _create_async_engine(DATABASE_URL)
+    async_read_engine = (
+        _create_async_engine(DATABASE_REPLICA_URL)
+        if DATABASE_REPLICA_URL
+        else async_engine
+    )
+
+
+# NOTE: Kept out of SQLModel.metadata so that the fingerprint only covers the application's tables
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("fingerprint", String, primary_key=True),
+    Column(
+        "applied_at", DateTime(timezone=True), server_default=func.now(), nullable=False
+    ),
 )
 
 
+def get_schema_fingerprint() -> str:
+    """Fingerprint the DDL of the models' extensions, tables and indexes, so that any change to the schema changes it."""
+    statements = [extension.statement for extension in DATABASE_EXTENSIONS]
+    for table in SQLModel.metadata.sorted_tables:
+        statements.append(CreateTable(table).compile(dialect=engine.dialect))
+        for index in sorted(table.indexes, key=lambda index: str(index.name)):
+            statements.append(CreateIndex(index).compile(dialect=engine.dialect))
+
+    return sha256("\n".join(map(str, statements)).encode()).hexdigest()
+
+
+def get_schema_migrations(connection: Connection) -> List[str]:
+    """Get the DDL that brings existing tables up to their models: the columns and indexes missing from them."""
+    inspector = inspect(connection)
+    statements = []
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        table_name = engine.dialect.identifier_preparer.format_table(table)
+        existing_columns = {
+            column["name"] for column in inspector.get_columns(table.name)
+        }
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                statements.append(f"ALTER TABLE {table_name} ADD COLUMN {column_ddl}")
+
+        existing_indexes = {
+            index["name"] for index in inspector.get_indexes(table.name)
+        }
+        for index in sorted(table.indexes, key=lambda index: str(index.name)):
+            if index.name not in existing_indexes:
+                statements.append(
+                    str(CreateIndex(index).compile(dialect=engine.dialect))
+                )
+
+    return statements
+
+
+def _store_schema_fingerprint(connection: Connection, fingerprint: str) -> None:
+    schema_version.create(connection, checkfirst=True)
+    connection.execute(delete(schema_version))
+    connection.execute(insert(schema_version).values(fingerprint=fingerprint))
+
+
 def create_db_and_tables():
-    """Create database tables."""
+    """Create the database tables missing from the database, unless the schema is already current."""
+    fingerprint = get_schema_fingerprint()
+
+    # NOTE: create_all issues catalog queries for every table, so a boot against a schema that was already
+    #       created from the same models is answered by this single query instead
+    with engine.connect() as connection:
+        try:
+            statement = select(schema_version.c.fingerprint).where(
+                schema_version.c.fingerprint == fingerprint
+            )
+            if connection.execute(statement).first():
+                return
+        except exc.ProgrammingError:
+            # NOTE: The first boot against a database, before schema_version exists
+            pass
+
+    SQLModel.metadata.create_all(engine)
+
+    # NOTE: create_all skips tables that already exist. Altering them can lock large tables for as long as it
+    #       takes to rewrite or index them, so a boot never does and leaves the schema unrecorded until
+    #       "python -m scripts.migrate_schema" has brought them up to date.
+    with engine.begin() as connection:
+        migrations = get_schema_migrations(connection)
+        if migrations:
+            logger.warning(
+                "%d schema migrations are pending, run python -m scripts.migrate_schema",
+                len(migrations),
+            )
+
+            return
+
+        _store_schema_fingerprint(connection, fingerprint)
+
+
+def migrate_db_schema() -> List[str]:
+    """Add the columns and indexes missing from existing tables, record the schema as current and return the DDL run."""
     SQLModel.metadata.create_all(engine)
 
+    with engine.begin() as connection:
+        migrations = get_schema_migrations(connection)
+        for migration in migrations:
+            connection.execute(text(migration))
+        _store_schema_fingerprint(connection, get_schema_fingerprint())
+
+    return migrations
+
+
+async def warm_up_db_pool():
+    """Open pooled connections up front so that the first requests after a deploy don't pay for them."""
+    warmup_count = min(DATABASE_POOL_WARMUP, DATABASE_POOL_SIZE)
+
+    if async_engine is not None:
+        for warmed_async_engine in {async_engine, async_read_engine}:
+            assert warmed_async_engine is not None
+            async_connections = [
+                await warmed_async_engine.connect() for _ in range(warmup_count)
+            ]
+            for async_connection in async_connections:
+                await async_connection.close()
+
+        return
+
+    def open_connections(warmed_engine: Engine) -> None:
+        connections = [warmed_engine.connect() for _ in range(warmup_count)]
+        for connection in connections:
+            connection.close()
+
+    # NOTE: Connecting blocks, so the sync pools are filled from the threadpool rather than the event loop
+    for warmed_engine in {engine, read_engine}:
+        await run_in_threadpool(open_connections, warmed_engine)
+
+
+async def dispose_engines():
+    """Close every pooled connection, so that a stopping worker leaves none open on the database."""
+    if async_engine is not None:
+        for disposed_async_engine in {async_engine, async_read_engine}:
+            assert disposed_async_engine is not None
+            await disposed_async_engine.dispose()
+
+    for disposed_engine in {engine, read_engine}:
+        disposed_engine.dispose()
+
+
+def get_db_pool_stats(replica: bool = False) -> Dict[str, float]:
+    """Get the state and checkout wait times of the pool serving requests, or of the one serving reads from the replica."""
+    if async_engine is not None and async_read_engine is not None:
+        pool = (async_read_engine if replica else async_engine).pool
+    else:
+        pool = (read_engine if replica else engine).pool
+    assert isinstance(pool, CheckoutTimingMixin) and isinstance(pool, QueuePool)
+
+    return {
+        "size": pool.size(),
+        "max_overflow": DATABASE_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkout_count": pool.checkout_count,
+        "checkout_timeouts": pool.checkout_timeouts,
+        "checkout_wait_seconds_avg": (
+            pool.checkout_wait_seconds_total / pool.checkout_count
+            if pool.checkout_count
+            else 0.0
+        ),
+        "checkout_wait_seconds_max": pool.checkout_wait_seconds_max,
+    }
+
 
 def get_db_session() -> Generator[Session, None, None]:
     """Dependency factory for database sessions."""
-    with Session(engine) as db_session:
+    # NOTE: Written objects are hydrated by RETURNING during the flush, so expiring them on commit would only
+    #       force a reload of the values that were just fetched
+    with Session(engine, expire_on_commit=False) as db_session:
+        yield db_session
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Check whether the caller wrote so recently that the replica may not have applied the write yet."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE_NAME, 0)) > time()
+    except ValueError:
+        return False
+
+
+def get_db_read_session(
+    request: Request, db_session: Annotated[Session, Depends(get_db_session)]
+) -> Generator[Session, None, None]:
+    """Dependency factory for database sessions that only read, from the replica unless the caller wrote recently."""
+    # NOTE: Reads from the primary share the request's session, which FastAPI creates once per request, so that a
+    #       request never holds two primary connections. The session only connects once it is used.
+    if read_engine is engine or reads_from_primary(request):
         yield db_session
+
+        return
+
+    with Session(read_engine, expire_on_commit=False) as read_db_session:
+        yield read_db_session
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency factory for async database sessions."""
+    if async_engine is None:
+        raise RuntimeError("DATABASE_ASYNC must be enabled to use async sessions")
+
+    # NOTE: Objects are returned to the event loop after commit, where expired attributes cannot be lazy loaded
+    async with AsyncSession(async_engine, expire_on_commit=False) as db_session:
+        yield db_session
+
+
+async def get_async_db_read_session(
+    request: Request,
+    db_session: Annotated[AsyncSession, Depends(get_async_db_session)],
+) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency factory for async database sessions that only read, from the replica unless the caller wrote recently."""
+    if async_read_engine is async_engine or reads_from_primary(request):
+        yield db_session
+
+        return
+
+    async with AsyncSession(
+        async_read_engine, expire_on_commit=False
+    ) as read_db_session:
+        yield read_db_session
+
+
+async def run_in_session(
+    db_session: Session | AsyncSession,
+    operation: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Run a database-layer operation against either session type without blocking the event loop.
+
+    Async sessions run the operation on the AsyncEngine's connection through SQLAlchemy's greenlet bridge,
+    so no worker thread is held while waiting on Postgres. Sync sessions fall back to the threadpool.
+    """
+    if isinstance(db_session, AsyncSession):
+        return await db_session.run_sync(operation, *args, **kwargs)
+
+    return await run_in_threadpool(operation, db_session, *args, **kwargs)
+
+
+@contextmanager
+def unit_of_work(db_session: Session) -> Iterator[Session]:
+    """Group the writes made in the block into one transaction, flushed and committed together on exit.
+
+    Nothing is written until the block ends, so a failure part way through leaves no partial writes behind.
+    """
+    try:
+        yield db_session
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+
+
+async def release_session_connection(db_session: Session | AsyncSession) -> None:
+    """End the session's transaction and return its connection to the pool ahead of a wait that needs no database.
+
+    Instances loaded so far stay readable as detached objects, and the session begins a new transaction on its
+    next query.
+    """
+    await run_in_session(db_session, Session.close)
+
+
+async def stream_in_session(
+    db_session: Session | AsyncSession,
+    operation: Callable[..., Iterable[T]],
+    *args: Any,
+    batch_size: int = 1000,
+) -> AsyncGenerator[List[T], None]:
+    """Drive a database-layer generator in batches against either session type without blocking the event loop.
+
+    Each batch is pulled in a single greenlet switch or threadpool call, so server-side cursors stay open
+    between batches while only one batch is held in memory.
+    """
+    # NOTE: Creating the generator runs none of its code, every step happens inside run_in_session
+    sync_session = (
+        db_session.sync_session if isinstance(db_session, AsyncSession) else db_session
+    )
+    iterator = iter(operation(sync_session, *args))
+
+    while True:
+        batch = await run_in_session(
+            db_session, lambda _: list(islice(iterator, batch_size))
+        )
+        if not batch:
+            break
+
+        yield batch
@@ -1,8 +1,12 @@
 import os
-from typing import Literal, cast
+from typing import Dict, Literal, Tuple, cast
+from dotenv import load_dotenv
 
 # General configuration
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+# NOTE: Loaded before any other setting is read, every setting below and in the other config modules is read on import
+if ENVIRONMENT == "development":
+    load_dotenv(".env.local")
 PORT = int(os.getenv("PORT", 8000))
 CORS_ORIGINS = [
     origin.strip()
@@ -10,6 +14,13 @@ CORS_ORIGINS = [
 ]
 RELOAD = ENVIRONMENT == "development"
 
+# Production server configuration
+# NOTE: Worker processes forked by "python -m scripts.serve". Each has its own event loop, threadpool and pools, so
+#       the database sees up to WORKERS * (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW) connections.
+WORKERS = int(os.getenv("WORKERS", os.cpu_count() or 1))
+# NOTE: How long a stopping worker may spend finishing in-flight requests before they are cancelled
+WORKER_SHUTDOWN_TIMEOUT = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT", 30))  # seconds
+
 # Cookie security configuration
 COOKIE_HTTP_ONLY = True
 # NOTE: "True" in production, "False" in development
@@ -28,3 +39,72 @@ if cookie_same_site not in ["lax", "strict", "none"]:
         f"COOKIE_SAME_SITE must be either lax, strict, or none, got {cookie_same_site}"
     )
 COOKIE_SAME_SITE = cast(Literal["lax", "strict", "none"], cookie_same_site)
+
+# Database instrumentation configuration
+# NOTE: Logs every SQL statement synchronously, only enable it while debugging
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() == "true"
+# NOTE: Statements slower than this are logged with their duration, set to 0 to disable
+DATABASE_SLOW_QUERY_MS = float(os.getenv("DATABASE_SLOW_QUERY_MS", 200))
+
+# Database connection pool configuration
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 5))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", 30))  # seconds
+# NOTE: -1 never recycles, set below the server / proxy idle timeout otherwise
+DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", -1))  # seconds
+DATABASE_POOL_PRE_PING = os.getenv("DATABASE_POOL_PRE_PING", "false").lower() == "true"
+# NOTE: Number of connections opened during startup, before the first request is served
+DATABASE_POOL_WARMUP = int(os.getenv("DATABASE_POOL_WARMUP", DATABASE_POOL_SIZE))
+
+# Read replica configuration
+# NOTE: After a write, the writer's reads stay on the primary for this long, set it above the worst replication lag
+DATABASE_READ_YOUR_WRITES_SECONDS = float(
+    os.getenv("DATABASE_READ_YOUR_WRITES_SECONDS", 5)
+)
+
+# Analytics cache configuration
+# NOTE: Entries are also invalidated when results are imported, the TTL bounds staleness across workers
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", 300))  # 5 minutes
+ANALYTICS_CACHE_MAX_SIZE = int(os.getenv("ANALYTICS_CACHE_MAX_SIZE", 1000))
+
+# Batch mutation configuration
+# NOTE: Bounds how many rows a single batch request can lock in its transaction
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 100))
+
+# Search configuration
+# NOTE: Typo-tolerant matching of titles with pg_trgm, which needs the extension to be installed on the server.
+#       Turning it off drops the trigram indexes from the schema, and search matches whole words and prefixes only.
+SEARCH_TRIGRAM = os.getenv("SEARCH_TRIGRAM", "true").lower() == "true"
+
+# Admission control configuration
+# NOTE: Worker threads shared by sync sessions and sync dependencies, AnyIO's default is 40
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 40))
+# NOTE: Requests a route handles at once and requests it holds waiting for a turn, beyond which it sheds load
+ADMISSION_ROUTE_LIMIT = int(os.getenv("ADMISSION_ROUTE_LIMIT", THREADPOOL_SIZE))
+ADMISSION_ROUTE_QUEUE_SIZE = int(
+    os.getenv("ADMISSION_ROUTE_QUEUE_SIZE", ADMISSION_ROUTE_LIMIT * 2)
+)
+# NOTE: Per-route overrides as "METHOD /path=limit:queue_size", comma separated. The auth routes spend their time
+#       in the password hash pool, so they get less of the threadpool and the database than the reads.
+ADMISSION_ROUTE_LIMITS: Dict[Tuple[str, str], Tuple[int, int]] = {}
+for route_override in os.getenv(
+    "ADMISSION_ROUTE_LIMITS", "POST /api/auth/login=8:16,POST /api/auth/register=4:8"
+).split(","):
+    if not route_override.strip():
+        continue
+    route, _, limits = route_override.strip().partition("=")
+    method, _, path = route.partition(" ")
+    limit, _, queue_size = limits.partition(":")
+    if not (method and path and limit.isdigit() and queue_size.isdigit()):
+        raise ValueError(
+            f"ADMISSION_ROUTE_LIMITS entries must look like METHOD /path=limit:queue_size, got {route_override}"
+        )
+    ADMISSION_ROUTE_LIMITS[(method.upper(), path)] = (int(limit), int(queue_size))
+# NOTE: Queued requests that aren't admitted in time are shed, so a queue never outlives the clients' patience
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 2))  # seconds
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 1))  # seconds
+
+# Metrics configuration
+# NOTE: When set, scrapes of /metrics must send it as a bearer token, otherwise the endpoint is left open for
+#       scrapers on the private network
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
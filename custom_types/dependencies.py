@@ -1,23 +1,45 @@
 from typing import Annotated
 from fastapi import Depends
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from models import User
+from schemas.auth import AuthenticatedPrincipal
 from services.user import UserService
 from services.auth import AuthService
 from services.syllabus import SyllabusService
-from config.database import get_db_session
+from services.result import ResultService
+from services.analytics import AnalyticsService
+from services.progress import ProgressService
+from services.admin import AdminService
 from api.dependencies import (
+    get_request_db_session,
+    get_request_db_read_session,
     get_user_service,
     get_auth_service,
     get_syllabus_service,
-    get_authenticated_user,
+    get_result_service,
+    get_analytics_service,
+    get_progress_service,
+    get_admin_service,
+    get_authenticated_principal,
+    get_admin_principal,
+    verify_metrics_scraper,
 )
 
-
 # Type aliases for dependencies
 UserServiceDep = Annotated[UserService, Depends(get_user_service)]
 AuthServiceDep = Annotated[AuthService, Depends(get_auth_service)]
 SyllabusServiceDep = Annotated[SyllabusService, Depends(get_syllabus_service)]
-DBSessionDep = Annotated[Session, Depends(get_db_session)]
-AuthenticatedUserDep = Annotated[User, Depends(get_authenticated_user)]
+ResultServiceDep = Annotated[ResultService, Depends(get_result_service)]
+AnalyticsServiceDep = Annotated[AnalyticsService, Depends(get_analytics_service)]
+ProgressServiceDep = Annotated[ProgressService, Depends(get_progress_service)]
+DBSessionDep = Annotated[Session | AsyncSession, Depends(get_request_db_session)]
+DBReadSessionDep = Annotated[
+    Session | AsyncSession, Depends(get_request_db_read_session)
+]
+AuthenticatedPrincipalDep = Annotated[
+    AuthenticatedPrincipal, Depends(get_authenticated_principal)
+]
+AdminServiceDep = Annotated[AdminService, Depends(get_admin_service)]
+AdminPrincipalDep = Annotated[AuthenticatedPrincipal, Depends(get_admin_principal)]
+MetricsScraperDep = Annotated[None, Depends(verify_metrics_scraper)]
@@ -33,3 +33,32 @@ class FileType(str, Enum):
 class TokenType(str, Enum):
     ACCESS = "access"
     REFRESH = "refresh"
+
+
+class SyllabusInclude(str, Enum):
+    LESSONS = "lessons"
+    FILES = "files"
+    TESTS = "tests"
+
+
+class SearchResultType(str, Enum):
+    SYLLABUS = "syllabus"
+    LESSON = "lesson"
+    FILE = "file"
+    TEST = "test"
+
+
+class BatchItemStatus(str, Enum):
+    UPDATED = "updated"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+    REJECTED = "rejected"
+
+
+class AuthEvent(str, Enum):
+    LOGIN_SUCCESS = "login_success"
+    LOGIN_FAILURE = "login_failure"
+    TOKEN_EXPIRED = "token_expired"
+    TOKEN_INVALID = "token_invalid"
+    TOKEN_REVOKED = "token_revoked"
+    REFRESH = "refresh"
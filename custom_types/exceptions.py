@@ -65,3 +65,54 @@ class SyllabusNotFoundError(HTTPException):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=detail,
         )
+
+
+class ServiceOverloadedError(HTTPException):
+    def __init__(
+        self, detail: str = "Service temporarily overloaded", retry_after: int = 1
+    ):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class AdminRequiredError(HTTPException):
+    def __init__(self, detail: str = "Admin access required"):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail,
+        )
+
+
+class InvalidCursorError(HTTPException):
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
+
+
+class InvalidCSVError(HTTPException):
+    def __init__(self, detail: str = "Invalid CSV upload"):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
+
+
+class TestNotFoundError(HTTPException):
+    def __init__(self, detail: str = "Test not found"):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail,
+        )
+
+
+class ProgressNotFoundError(HTTPException):
+    def __init__(self, detail: str = "Progress not found"):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail,
+        )
@@ -0,0 +1,88 @@
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import RowMapping
+from sqlmodel import Session, desc, func, select
+
+from models import UserSyllabus, Syllabus, Test, Result
+
+
+class AnalyticsDatabase:
+    """Database layer for score analytics, aggregated by Postgres rather than over ORM objects."""
+
+    def get_test_total_marks(self, db_session: Session, test_id: UUID) -> Optional[int]:
+        """Get the total marks of a test by ID."""
+        statement = select(Test.total_marks).where(Test.id == test_id)
+
+        return db_session.exec(statement).first()
+
+    def get_score_summary(self, db_session: Session, test_id: UUID) -> RowMapping:
+        """Get the count, mean, spread and percentiles of a test's scores in a single scan."""
+        statement = select(
+            func.count(Result.id).label("count"),
+            func.avg(Result.score).label("mean"),
+            func.percentile_cont(0.5).within_group(Result.score).label("median"),
+            func.stddev_pop(Result.score).label("standard_deviation"),
+            func.min(Result.score).label("minimum"),
+            func.max(Result.score).label("maximum"),
+            func.percentile_cont(0.25)
+            .within_group(Result.score)
+            .label("percentile_25"),
+            func.percentile_cont(0.75)
+            .within_group(Result.score)
+            .label("percentile_75"),
+            func.percentile_cont(0.9).within_group(Result.score).label("percentile_90"),
+        ).where(Result.test_id == test_id)
+
+        return db_session.execute(statement).mappings().one()
+
+    def get_score_histogram(
+        self, db_session: Session, test_id: UUID, total_marks: int, bins: int
+    ) -> List[Tuple[int, int]]:
+        """Get (bin number, count) pairs of a test's scores over equal-width bins from 0 to total_marks."""
+        # NOTE: width_bucket puts a full score in bin bins + 1, so it is folded into the last bin
+        bin_number = func.least(
+            func.width_bucket(Result.score, 0, total_marks, bins), bins
+        ).label("bin_number")
+        statement = (
+            select(bin_number, func.count(Result.id))
+            .where(Result.test_id == test_id)
+            .group_by(bin_number)
+        )
+
+        return [(number, count) for number, count in db_session.exec(statement)]
+
+    def syllabus_exists(self, db_session: Session, syllabus_id: UUID) -> bool:
+        """Check whether a syllabus exists."""
+        statement = select(Syllabus.id).where(Syllabus.id == syllabus_id)
+
+        return db_session.exec(statement).first() is not None
+
+    def get_student_ranks(
+        self, db_session: Session, syllabus_id: UUID
+    ) -> List[RowMapping]:
+        """Get each student's average percentage across a syllabus' tests and their percentile rank in the cohort."""
+        percentage = Result.score * 100.0 / Test.total_marks
+        student_averages = (
+            select(
+                UserSyllabus.user_id,
+                func.count(Result.id).label("tests_taken"),
+                func.avg(percentage).label("average_percentage"),
+            )
+            .join(Test, Test.id == Result.test_id)
+            .join(UserSyllabus, UserSyllabus.id == Result.user_syllabus_id)
+            .where(Test.syllabus_id == syllabus_id, Test.total_marks > 0)
+            .group_by(UserSyllabus.user_id)
+            .subquery()
+        )
+        percentile_rank = (
+            func.percent_rank().over(order_by=student_averages.c.average_percentage)
+            * 100
+        ).label("percentile_rank")
+        statement = select(
+            student_averages.c.user_id,
+            student_averages.c.tests_taken,
+            student_averages.c.average_percentage,
+            percentile_rank,
+        ).order_by(desc(percentile_rank), student_averages.c.user_id)
+
+        return list(db_session.execute(statement).mappings())
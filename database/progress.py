@@ -0,0 +1,378 @@
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import Connection, Float, Integer, Uuid, bindparam, cast, delete, event
+from sqlalchemy import insert, inspect, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Mapper
+from sqlmodel import Session, col, func, select
+
+from models import UserSyllabus, UserSyllabusProgress, Lesson, File, Test, Result
+
+# NOTE: Summaries are kept in step with ORM writes by the mapper events below, which run inside the same flush
+#       and transaction as the write itself. Bulk writes that bypass the ORM (e.g. COPY) call
+#       add_result_progress explicitly.
+
+PROGRESS_COLUMNS = [
+    "user_syllabus_id",
+    "lessons_covered",
+    "files_completed",
+    "tests_taken",
+    "percentage_total",
+]
+
+
+def _result_percentage(score: Any, total_marks: Any) -> Any:
+    """SQL expression for a score as a percentage of its test's total marks, 0 for tests out of 0."""
+    return func.coalesce(
+        cast(score, Float) * 100 / func.nullif(total_marks, 0),
+        0,
+    )
+
+
+def _progress_select(user_syllabus_id: Optional[UUID] = None):
+    """Select the progress of every user syllabus, or of a single one, computed from scratch."""
+    # NOTE: Aggregated once per syllabus / user syllabus and joined, rather than correlated per row
+    lessons = select(Lesson.syllabus_id, func.count(Lesson.id).label("count")).group_by(
+        Lesson.syllabus_id
+    )
+    files = (
+        select(Lesson.syllabus_id, func.count(File.id).label("count"))
+        .join(Lesson, Lesson.id == File.lesson_id)
+        .where(col(File.completed))
+        .group_by(Lesson.syllabus_id)
+    )
+    results = (
+        select(
+            Result.user_syllabus_id,
+            func.count(Result.id).label("count"),
+            func.sum(_result_percentage(Result.score, Test.total_marks)).label(
+                "percentage_total"
+            ),
+        )
+        .join(Test, Test.id == Result.test_id)
+        .group_by(Result.user_syllabus_id)
+    )
+    if user_syllabus_id is not None:
+        syllabus_id = (
+            select(UserSyllabus.syllabus_id)
+            .where(UserSyllabus.id == user_syllabus_id)
+            .scalar_subquery()
+        )
+        lessons = lessons.where(Lesson.syllabus_id == syllabus_id)
+        files = files.where(Lesson.syllabus_id == syllabus_id)
+        results = results.where(Result.user_syllabus_id == user_syllabus_id)
+
+    lessons_subquery = lessons.subquery()
+    files_subquery = files.subquery()
+    results_subquery = results.subquery()
+    statement = (
+        select(
+            UserSyllabus.id.label("user_syllabus_id"),
+            func.coalesce(lessons_subquery.c.count, 0).label("lessons_covered"),
+            func.coalesce(files_subquery.c.count, 0).label("files_completed"),
+            func.coalesce(results_subquery.c.count, 0).label("tests_taken"),
+            func.coalesce(results_subquery.c.percentage_total, 0).label(
+                "percentage_total"
+            ),
+        )
+        .outerjoin(
+            lessons_subquery,
+            lessons_subquery.c.syllabus_id == UserSyllabus.syllabus_id,
+        )
+        .outerjoin(
+            files_subquery, files_subquery.c.syllabus_id == UserSyllabus.syllabus_id
+        )
+        .outerjoin(
+            results_subquery,
+            results_subquery.c.user_syllabus_id == UserSyllabus.id,
+        )
+    )
+    if user_syllabus_id is not None:
+        statement = statement.where(UserSyllabus.id == user_syllabus_id)
+
+    return statement
+
+
+def _syllabus_progress_update(syllabus_id: Any, **deltas: Any):
+    """UPDATE adding the given deltas to the progress of every user syllabus in a syllabus."""
+    return (
+        update(UserSyllabusProgress)
+        .where(
+            col(UserSyllabusProgress.user_syllabus_id).in_(
+                select(UserSyllabus.id).where(UserSyllabus.syllabus_id == syllabus_id)
+            )
+        )
+        .values(
+            updated_at=func.now(),
+            **{
+                column: getattr(UserSyllabusProgress, column) + delta
+                for column, delta in deltas.items()
+            },
+        )
+    )
+
+
+def add_result_progress(connection: Connection, deltas: List[Dict[str, Any]]) -> None:
+    """Add results to progress summaries, from dicts of user_syllabus_id, tests_taken and percentage_total deltas."""
+    if not deltas:
+        return
+
+    # NOTE: A single UPDATE ... FROM unnest() of the deltas as arrays, since an executemany costs one statement
+    #       per user syllabus
+    delta_rows = (
+        func.unnest(
+            bindparam(
+                "delta_user_syllabus_ids",
+                [delta["user_syllabus_id"] for delta in deltas],
+                type_=ARRAY(Uuid),
+            ),
+            bindparam(
+                "delta_tests",
+                [delta["tests_taken"] for delta in deltas],
+                type_=ARRAY(Integer),
+            ),
+            bindparam(
+                "delta_percentages",
+                [delta["percentage_total"] for delta in deltas],
+                type_=ARRAY(Float),
+            ),
+        )
+        .table_valued("user_syllabus_id", "tests_taken", "percentage_total")
+        .render_derived(name="delta", with_types=False)
+    )
+    statement = (
+        update(UserSyllabusProgress)
+        .where(UserSyllabusProgress.user_syllabus_id == delta_rows.c.user_syllabus_id)
+        .values(
+            tests_taken=UserSyllabusProgress.tests_taken + delta_rows.c.tests_taken,
+            percentage_total=UserSyllabusProgress.percentage_total
+            + delta_rows.c.percentage_total,
+            updated_at=func.now(),
+        )
+    )
+    connection.execute(statement)
+
+
+def _has_changes(target: Any, *attributes: str) -> bool:
+    state = inspect(target)
+
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+
+# NOTE: Updates and deletes subtract the stored row rather than the attribute history, since the previous
+#       values of an expired instance are never loaded
+
+
+@event.listens_for(UserSyllabus, "after_insert")
+def _create_progress(mapper: Mapper, connection: Connection, target: UserSyllabus):
+    connection.execute(
+        insert(UserSyllabusProgress).from_select(
+            PROGRESS_COLUMNS, _progress_select(target.id)
+        )
+    )
+
+
+@event.listens_for(Lesson, "after_insert")
+def _add_lesson_progress(mapper: Mapper, connection: Connection, target: Lesson):
+    connection.execute(_syllabus_progress_update(target.syllabus_id, lessons_covered=1))
+
+
+@event.listens_for(Lesson, "before_delete")
+def _remove_lesson_progress(mapper: Mapper, connection: Connection, target: Lesson):
+    syllabus_id = select(Lesson.syllabus_id).where(Lesson.id == target.id)
+    connection.execute(
+        _syllabus_progress_update(syllabus_id.scalar_subquery(), lessons_covered=-1)
+    )
+
+
+def _file_syllabus_id(lesson_id: UUID):
+    return select(Lesson.syllabus_id).where(Lesson.id == lesson_id).scalar_subquery()
+
+
+def _remove_stored_file_progress(connection: Connection, file_id: UUID) -> None:
+    statement = select(File.lesson_id).where(File.id == file_id, col(File.completed))
+    lesson_id = connection.execute(statement).scalar_one_or_none()
+    if lesson_id is not None:
+        connection.execute(
+            _syllabus_progress_update(_file_syllabus_id(lesson_id), files_completed=-1)
+        )
+
+
+@event.listens_for(File, "after_insert")
+def _add_file_progress(mapper: Mapper, connection: Connection, target: File):
+    if target.completed:
+        connection.execute(
+            _syllabus_progress_update(
+                _file_syllabus_id(target.lesson_id), files_completed=1
+            )
+        )
+
+
+@event.listens_for(File, "before_update")
+def _remove_updated_file_progress(mapper: Mapper, connection: Connection, target: File):
+    if _has_changes(target, "completed", "lesson_id"):
+        _remove_stored_file_progress(connection, target.id)
+
+
+@event.listens_for(File, "after_update")
+def _add_updated_file_progress(mapper: Mapper, connection: Connection, target: File):
+    if _has_changes(target, "completed", "lesson_id"):
+        _add_file_progress(mapper, connection, target)
+
+
+@event.listens_for(File, "before_delete")
+def _remove_file_progress(mapper: Mapper, connection: Connection, target: File):
+    # NOTE: Files are deleted before their lesson when it cascades, so the lesson can still be looked up
+    _remove_stored_file_progress(connection, target.id)
+
+
+def _result_percentage_value(
+    connection: Connection, score: int, test_id: UUID
+) -> float:
+    statement = select(_result_percentage(score, Test.total_marks)).where(
+        Test.id == test_id
+    )
+
+    return connection.execute(statement).scalar_one()
+
+
+def _remove_stored_result_progress(connection: Connection, result_id: UUID) -> None:
+    statement = (
+        select(
+            Result.user_syllabus_id,
+            _result_percentage(Result.score, Test.total_marks),
+        )
+        .join(Test, Test.id == Result.test_id)
+        .where(Result.id == result_id)
+    )
+    stored_result = connection.execute(statement).one_or_none()
+    if stored_result is None:
+        return
+
+    user_syllabus_id, percentage = stored_result
+    add_result_progress(
+        connection,
+        [
+            {
+                "user_syllabus_id": user_syllabus_id,
+                "tests_taken": -1,
+                "percentage_total": -percentage,
+            }
+        ],
+    )
+
+
+@event.listens_for(Result, "after_insert")
+def _add_result_progress(mapper: Mapper, connection: Connection, target: Result):
+    add_result_progress(
+        connection,
+        [
+            {
+                "user_syllabus_id": target.user_syllabus_id,
+                "tests_taken": 1,
+                "percentage_total": _result_percentage_value(
+                    connection, target.score, target.test_id
+                ),
+            }
+        ],
+    )
+
+
+@event.listens_for(Result, "before_update")
+def _remove_updated_result_progress(
+    mapper: Mapper, connection: Connection, target: Result
+):
+    if _has_changes(target, "score", "test_id", "user_syllabus_id"):
+        _remove_stored_result_progress(connection, target.id)
+
+
+@event.listens_for(Result, "after_update")
+def _add_updated_result_progress(
+    mapper: Mapper, connection: Connection, target: Result
+):
+    if _has_changes(target, "score", "test_id", "user_syllabus_id"):
+        _add_result_progress(mapper, connection, target)
+
+
+@event.listens_for(Result, "before_delete")
+def _remove_result_progress(mapper: Mapper, connection: Connection, target: Result):
+    _remove_stored_result_progress(connection, target.id)
+
+
+class ProgressDatabase:
+    """Database layer for student progress summaries."""
+
+    def get_progress_by_user_and_syllabus(
+        self, db_session: Session, user_id: UUID, syllabus_id: UUID
+    ) -> Optional[UserSyllabusProgress]:
+        """Get a user's progress in a syllabus through the enrolment's unique index and the summary's primary key."""
+        statement = (
+            select(UserSyllabusProgress)
+            .join(
+                UserSyllabus,
+                UserSyllabus.id == UserSyllabusProgress.user_syllabus_id,
+            )
+            .where(
+                UserSyllabus.user_id == user_id,
+                UserSyllabus.syllabus_id == syllabus_id,
+            )
+        )
+
+        return db_session.exec(statement).first()
+
+    def create_progress_by_user_and_syllabus(
+        self, db_session: Session, user_id: UUID, syllabus_id: UUID
+    ) -> Optional[UserSyllabusProgress]:
+        """Compute and store the progress of an enrolment that has no summary yet, if the user is enrolled."""
+        statement = select(UserSyllabus.id).where(
+            UserSyllabus.user_id == user_id,
+            UserSyllabus.syllabus_id == syllabus_id,
+        )
+        user_syllabus_id = db_session.exec(statement).first()
+        if user_syllabus_id is None:
+            return None
+
+        # NOTE: A concurrent request may have stored it first
+        db_session.execute(
+            pg_insert(UserSyllabusProgress)
+            .from_select(PROGRESS_COLUMNS, _progress_select(user_syllabus_id))
+            .on_conflict_do_nothing()
+        )
+        db_session.commit()
+
+        return db_session.get(UserSyllabusProgress, user_syllabus_id)
+
+    def rebuild_progress(self, db_session: Session) -> int:
+        """Recompute every progress summary from scratch in a single transaction."""
+        db_session.execute(delete(UserSyllabusProgress))
+        result = db_session.execute(
+            insert(UserSyllabusProgress).from_select(
+                PROGRESS_COLUMNS, _progress_select()
+            )
+        )
+        db_session.commit()
+
+        return result.rowcount
+
+    def get_computed_progress(self, db_session: Session) -> Dict[UUID, Any]:
+        """Get every user syllabus' progress computed from scratch, keyed by user syllabus ID."""
+        return {
+            row["user_syllabus_id"]: row
+            for row in db_session.execute(_progress_select()).mappings()
+        }
+
+    def get_stored_progress(self, db_session: Session) -> Dict[UUID, Any]:
+        """Get every stored progress summary, keyed by user syllabus ID."""
+        statement = select(
+            UserSyllabusProgress.user_syllabus_id,
+            UserSyllabusProgress.lessons_covered,
+            UserSyllabusProgress.files_completed,
+            UserSyllabusProgress.tests_taken,
+            UserSyllabusProgress.percentage_total,
+        )
+
+        return {
+            row["user_syllabus_id"]: row
+            for row in db_session.execute(statement).mappings()
+        }
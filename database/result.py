@@ -0,0 +1,96 @@
+import io
+import psycopg
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from uuid import UUID
+from sqlalchemy.util import await_only
+from sqlmodel import Session, col, select
+
+from models import UserSyllabus, Test, Result
+
+from .progress import add_result_progress
+
+RESULT_COPY_STATEMENT = "COPY result (id, score, test_id, user_syllabus_id) FROM STDIN"
+
+
+class ResultDatabase:
+    """Database layer for result operations."""
+
+    def get_tests_by_ids(
+        self, db_session: Session, test_ids: Iterable[UUID]
+    ) -> Dict[UUID, Tuple[UUID, int]]:
+        """Get the (syllabus ID, total marks) of each existing test by ID."""
+        statement = select(Test.id, Test.syllabus_id, Test.total_marks).where(
+            col(Test.id).in_(test_ids)
+        )
+
+        return {
+            test_id: (syllabus_id, total_marks)
+            for test_id, syllabus_id, total_marks in db_session.exec(statement)
+        }
+
+    def get_user_syllabuses_by_ids(
+        self, db_session: Session, user_syllabus_ids: Iterable[UUID]
+    ) -> Dict[UUID, UUID]:
+        """Get the syllabus ID of each existing user syllabus by ID."""
+        statement = select(UserSyllabus.id, UserSyllabus.syllabus_id).where(
+            col(UserSyllabus.id).in_(user_syllabus_ids)
+        )
+
+        return {
+            user_syllabus_id: syllabus_id
+            for user_syllabus_id, syllabus_id in db_session.exec(statement)
+        }
+
+    def get_result_keys_by_user_syllabus_ids(
+        self, db_session: Session, user_syllabus_ids: Iterable[UUID]
+    ) -> Set[Tuple[UUID, UUID]]:
+        """Get the (test ID, user syllabus ID) pair of every existing result of the given user syllabuses."""
+        statement = select(Result.test_id, Result.user_syllabus_id).where(
+            col(Result.user_syllabus_id).in_(user_syllabus_ids)
+        )
+
+        return {
+            (test_id, user_syllabus_id)
+            for test_id, user_syllabus_id in db_session.exec(statement)
+        }
+
+    def create_results(
+        self,
+        db_session: Session,
+        results: List[Tuple[UUID, int, UUID, UUID]],
+    ) -> None:
+        """Insert (id, score, test_id, user_syllabus_id) rows with COPY, without committing."""
+        # NOTE: COPY runs on the session's own connection so that the rows are part of its transaction.
+        #       It bypasses SQLAlchemy's cursor events, so it isn't counted in the Server-Timing header.
+        driver_connection = db_session.connection().connection.driver_connection
+
+        # NOTE: Async sessions run this through the greenlet bridge, where await_only drives psycopg's async copy
+        if isinstance(driver_connection, psycopg.AsyncConnection):
+            await_only(self._copy_results_async(driver_connection, results))
+
+            return
+
+        rows = io.StringIO(
+            "".join("\t".join(map(str, result)) + "\n" for result in results)
+        )
+        with driver_connection.cursor() as cursor:
+            cursor.copy_expert(RESULT_COPY_STATEMENT, rows)
+
+    @staticmethod
+    async def _copy_results_async(
+        driver_connection: psycopg.AsyncConnection,
+        results: List[Tuple[UUID, int, UUID, UUID]],
+    ) -> None:
+        """Stream rows into COPY over an async psycopg connection."""
+        async with driver_connection.cursor() as cursor:
+            async with cursor.copy(RESULT_COPY_STATEMENT) as copy:
+                for result in results:
+                    await copy.write_row(result)
+
+    def commit_results(
+        self, db_session: Session, progress_deltas: List[Dict[str, Any]]
+    ) -> None:
+        """Add the results inserted in the current transaction to the progress summaries and commit them."""
+        # NOTE: COPY bypasses the ORM's progress events, so the summaries are updated here in the same transaction
+        add_result_progress(db_session.connection(), progress_deltas)
+        db_session.commit()
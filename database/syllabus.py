@@ -1,9 +1,55 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
-from sqlmodel import Session, select, desc
+from sqlalchemy import (
+    Column,
+    Float,
+    RowMapping,
+    String,
+    cast,
+    literal,
+    null,
+    or_,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, SQLModel, delete, func, select, desc, update
 
-from models import UserSyllabus, Syllabus
+from models import (
+    SEARCH_CONFIG,
+    UserSyllabus,
+    Syllabus,
+    Lesson,
+    File,
+    Test,
+    Result,
+)
 from schemas.syllabus import SyllabusCreateRequest, SyllabusUpdateRequest
+from custom_types.enums import SearchResultType
+from config.environment import SEARCH_TRIGRAM
+
+# NOTE: Rows fetched per round trip from a server-side cursor when streaming
+STREAM_YIELD_PER = 1000
+
+# NOTE: Control characters around the matched words of highlights, which can't occur in the highlighted text,
+#       so that the service can escape the text and then mark the matches
+SEARCH_HIGHLIGHT_START = "\x02"
+SEARCH_HIGHLIGHT_STOP = "\x03"
+SEARCH_TITLE_HEADLINE_OPTIONS = f"StartSel={SEARCH_HIGHLIGHT_START}, StopSel={SEARCH_HIGHLIGHT_STOP}, HighlightAll=true"
+SEARCH_SNIPPET_HEADLINE_OPTIONS = (
+    f"StartSel={SEARCH_HIGHLIGHT_START}, StopSel={SEARCH_HIGHLIGHT_STOP}, "
+    'MaxWords=24, MinWords=8, MaxFragments=2, FragmentDelimiter=" ... "'
+)
+
+
+def _stored_columns(model: type[SQLModel]) -> List[Column]:
+    """Get a table's columns, leaving out the ones Postgres generates from the others."""
+    return [
+        column
+        for column in model.__table__.columns  # type: ignore[attr-defined]
+        if column.computed is None
+    ]
 
 
 class SyllabusDatabase:
@@ -15,8 +61,7 @@ class SyllabusDatabase:
         """Create a new syllabus in the database."""
         syllabus = Syllabus(**syllabus_data.model_dump())
         db_session.add(syllabus)
-        db_session.commit()
-        db_session.refresh(syllabus)
+
         return syllabus
 
     def create_user_syllabus(
@@ -25,8 +70,7 @@ class SyllabusDatabase:
         """Create a new user syllabus in the database."""
         user_syllabus = UserSyllabus(user_id=user_id, syllabus_id=syllabus_id)
         db_session.add(user_syllabus)
-        db_session.commit()
-        db_session.refresh(user_syllabus)
+
         return user_syllabus
 
     def get_syllabus_by_id(
@@ -36,15 +80,223 @@ class SyllabusDatabase:
         statement = select(Syllabus).where(Syllabus.id == syllabus_id)
         return db_session.exec(statement).first()
 
-    def get_all_syllabuses_by_user_id(
-        self, db_session: Session, user_id: UUID
+    def get_syllabus_updated_at(
+        self, db_session: Session, syllabus_id: UUID
+    ) -> Optional[datetime]:
+        """Get when a syllabus was last updated, without loading it."""
+        statement = select(Syllabus.updated_at).where(Syllabus.id == syllabus_id)
+
+        return db_session.exec(statement).first()
+
+    def get_syllabus_detail_by_id(
+        self,
+        db_session: Session,
+        syllabus_id: UUID,
+        include_lessons: bool,
+        include_files: bool,
+        include_tests: bool,
+    ) -> Optional[Syllabus]:
+        """Get a syllabus by ID with the requested branches eager loaded, one query per branch."""
+        statement = select(Syllabus).where(Syllabus.id == syllabus_id)
+        if include_files:
+            statement = statement.options(
+                selectinload(Syllabus.lessons).selectinload(Lesson.files)  # type: ignore[arg-type]
+            )
+        elif include_lessons:
+            statement = statement.options(selectinload(Syllabus.lessons))  # type: ignore[arg-type]
+        if include_tests:
+            statement = statement.options(selectinload(Syllabus.tests))  # type: ignore[arg-type]
+
+        return db_session.exec(statement).first()
+
+    def get_syllabuses_page_by_user_id(
+        self,
+        db_session: Session,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None,
     ) -> List[Syllabus]:
-        """Get all syllabuses for a user, sorted by the latest created first."""
+        """Get a page of syllabuses for a user, sorted by the latest created first, after an optional (created_at, id) key."""
         statement = (
-            select(Syllabus).join(UserSyllabus).where(UserSyllabus.user_id == user_id)
-        ).order_by(desc(Syllabus.created_at))
+            select(Syllabus)
+            .join(UserSyllabus)
+            .where(UserSyllabus.user_id == user_id)
+            .order_by(desc(Syllabus.created_at), desc(Syllabus.id))
+            .limit(limit)
+        )
+        if after:
+            statement = statement.where(
+                tuple_(Syllabus.created_at, Syllabus.id) < tuple_(*after)
+            )
+
         return list(db_session.exec(statement).all())
 
+    def get_syllabuses_version_by_user_id(
+        self, db_session: Session, user_id: UUID
+    ) -> Tuple[Optional[datetime], int]:
+        """Get the latest updated_at and the number of a user's syllabuses, which change whenever any page does."""
+        statement = (
+            select(func.max(Syllabus.updated_at), func.count(Syllabus.id))
+            .join(UserSyllabus)
+            .where(UserSyllabus.user_id == user_id)
+        )
+        latest_updated_at, count = db_session.exec(statement).one()
+
+        return latest_updated_at, count
+
+    def stream_syllabus_tree(
+        self, db_session: Session, syllabus_id: UUID
+    ) -> Iterator[Tuple[str, RowMapping]]:
+        """Stream a syllabus with its lessons, files, tests, enrolments and results as (record type, row) pairs."""
+        # NOTE: Plain table rows through server-side cursors, so no ORM objects are built and memory stays flat.
+        #       Files and results are left unordered so that Postgres can stream them without a sort.
+        statements = [
+            (
+                "syllabus",
+                select(*_stored_columns(Syllabus)).where(Syllabus.id == syllabus_id),
+            ),
+            (
+                "lesson",
+                select(*_stored_columns(Lesson))
+                .where(Lesson.syllabus_id == syllabus_id)
+                .order_by(Lesson.conducted_at, Lesson.id),
+            ),
+            (
+                "file",
+                select(*_stored_columns(File))
+                .join(Lesson.__table__)
+                .where(Lesson.syllabus_id == syllabus_id),
+            ),
+            (
+                "test",
+                select(*_stored_columns(Test))
+                .where(Test.syllabus_id == syllabus_id)
+                .order_by(Test.conducted_at, Test.id),
+            ),
+            (
+                "user_syllabus",
+                select(*_stored_columns(UserSyllabus)).where(
+                    UserSyllabus.syllabus_id == syllabus_id
+                ),
+            ),
+            (
+                "result",
+                select(*_stored_columns(Result))
+                .join(UserSyllabus.__table__)
+                .where(UserSyllabus.syllabus_id == syllabus_id),
+            ),
+        ]
+
+        for record_type, statement in statements:
+            rows = db_session.execute(
+                statement.execution_options(yield_per=STREAM_YIELD_PER)
+            ).mappings()
+            for row in rows:
+                yield record_type, row
+
+    def search_syllabus_content(
+        self,
+        db_session: Session,
+        user_id: UUID,
+        tsquery_text: str,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, UUID]] = None,
+    ) -> List[RowMapping]:
+        """Search the syllabuses a user is enrolled in and their lessons, files and tests, best matches first, after an optional (rank, id) key."""
+        tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text)
+        syllabus_ids = select(UserSyllabus.syllabus_id).where(
+            UserSyllabus.user_id == user_id
+        )
+
+        def matches(
+            result_type: SearchResultType,
+            model: type[SQLModel],
+            title: Any,
+            body: Any,
+            syllabus_id: Any,
+        ):
+            table = model.__table__  # type: ignore[attr-defined]
+            search_vector = table.c.search_vector
+            rank = func.ts_rank(search_vector, tsquery)
+            condition = search_vector.bool_op("@@")(tsquery)
+            # NOTE: "title %> query" is the form the trigram index on the title serves, it holds when the query is
+            #       similar enough to a run of words in the title, so that typos and partial words still match
+            if SEARCH_TRIGRAM:
+                rank = rank + func.word_similarity(query, title)
+                condition = or_(condition, title.bool_op("%>")(query))
+
+            return select(
+                literal(result_type.value).label("type"),
+                table.c.id.label("id"),
+                syllabus_id.label("syllabus_id"),
+                title.label("title"),
+                body.label("body"),
+                cast(rank, Float).label("rank"),
+            ).where(condition)
+
+        # NOTE: Every branch is limited to the user's syllabuses through the syllabus_id indexes, so a search
+        #       reads the rows of a few syllabuses however many the tables hold
+        matched = union_all(
+            matches(
+                SearchResultType.SYLLABUS,
+                Syllabus,
+                Syllabus.name,
+                Syllabus.description,
+                Syllabus.id,
+            ).where(Syllabus.id.in_(syllabus_ids)),
+            matches(
+                SearchResultType.LESSON,
+                Lesson,
+                Lesson.title,
+                Lesson.description,
+                Lesson.syllabus_id,
+            ).where(Lesson.syllabus_id.in_(syllabus_ids)),
+            matches(
+                SearchResultType.FILE,
+                File,
+                File.title,
+                File.filename,
+                Lesson.syllabus_id,
+            )
+            .join_from(File, Lesson)
+            .where(Lesson.syllabus_id.in_(syllabus_ids)),
+            matches(
+                SearchResultType.TEST,
+                Test,
+                Test.title,
+                cast(null(), String),
+                Test.syllabus_id,
+            ).where(Test.syllabus_id.in_(syllabus_ids)),
+        ).subquery("matched")
+
+        page_statement = select(matched)
+        if after:
+            page_statement = page_statement.where(
+                tuple_(matched.c.rank, matched.c.id) < tuple_(*after)
+            )
+        page = (
+            page_statement.order_by(desc(matched.c.rank), desc(matched.c.id))
+            .limit(limit)
+            .subquery("page")
+        )
+
+        # NOTE: Highlighting reads and parses the whole text, so it only runs for the rows of the page
+        statement = select(
+            page.c.type,
+            page.c.id,
+            page.c.syllabus_id,
+            page.c.rank,
+            func.ts_headline(
+                SEARCH_CONFIG, page.c.title, tsquery, SEARCH_TITLE_HEADLINE_OPTIONS
+            ).label("title"),
+            func.ts_headline(
+                SEARCH_CONFIG, page.c.body, tsquery, SEARCH_SNIPPET_HEADLINE_OPTIONS
+            ).label("snippet"),
+        ).order_by(desc(page.c.rank), desc(page.c.id))
+
+        return list(db_session.execute(statement).mappings())
+
     def update_syllabus(
         self,
         db_session: Session,
@@ -57,12 +309,76 @@ class SyllabusDatabase:
             setattr(syllabus, key, value)
 
         db_session.add(syllabus)
-        db_session.commit()
-        db_session.refresh(syllabus)
+
         return syllabus
 
+    def update_syllabuses(
+        self, db_session: Session, syllabus_ids: List[UUID], changes: Dict[str, Any]
+    ) -> Set[UUID]:
+        """Apply the same changes to several syllabuses with one UPDATE, returning the IDs that exist."""
+        if not changes:
+            statement = select(Syllabus.id).where(Syllabus.id.in_(syllabus_ids))
+
+            return set(db_session.exec(statement))
+
+        statement = (
+            update(Syllabus)
+            .where(Syllabus.id.in_(syllabus_ids))
+            .values(**changes)
+            .returning(Syllabus.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        return set(db_session.execute(statement).scalars())
+
+    def delete_syllabuses(
+        self, db_session: Session, syllabus_ids: List[UUID]
+    ) -> Tuple[Set[UUID], Set[UUID]]:
+        """Delete several syllabuses and everything under them, one DELETE per table, returning the deleted syllabus and test IDs."""
+        # NOTE: Bulk deletes skip the ORM cascades, so the rows under the syllabuses are deleted explicitly, leaves
+        #       first. Progress summaries go with their enrolments through the database's ON DELETE CASCADE.
+        user_syllabus_ids = select(UserSyllabus.id).where(
+            UserSyllabus.syllabus_id.in_(syllabus_ids)
+        )
+        test_ids = select(Test.id).where(Test.syllabus_id.in_(syllabus_ids))
+        lesson_ids = select(Lesson.id).where(Lesson.syllabus_id.in_(syllabus_ids))
+        statements = [
+            # NOTE: Two statements rather than an OR, so that each is served by its own index
+            delete(Result).where(Result.user_syllabus_id.in_(user_syllabus_ids)),
+            delete(Result).where(Result.test_id.in_(test_ids)),
+            delete(UserSyllabus).where(UserSyllabus.syllabus_id.in_(syllabus_ids)),
+            delete(File).where(File.lesson_id.in_(lesson_ids)),
+            delete(Lesson).where(Lesson.syllabus_id.in_(syllabus_ids)),
+        ]
+        for statement in statements:
+            db_session.execute(statement.execution_options(synchronize_session=False))
+
+        tests_statement = (
+            delete(Test)
+            .where(Test.syllabus_id.in_(syllabus_ids))
+            .returning(Test.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_test_ids = set(db_session.execute(tests_statement).scalars())
+        syllabuses_statement = (
+            delete(Syllabus)
+            .where(Syllabus.id.in_(syllabus_ids))
+            .returning(Syllabus.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_syllabus_ids = set(db_session.execute(syllabuses_statement).scalars())
+
+        return deleted_syllabus_ids, deleted_test_ids
+
     def delete_syllabus(self, db_session: Session, syllabus: Syllabus) -> bool:
         """Delete a syllabus from the database."""
+        # NOTE: The many-to-many relationship would delete enrolments as bare link rows, which skips their results
+        #       cascade and fails on the result foreign key, so they are deleted through the ORM first
+        statement = select(UserSyllabus).where(UserSyllabus.syllabus_id == syllabus.id)
+        for user_syllabus in db_session.exec(statement):
+            db_session.delete(user_syllabus)
+        db_session.flush()
+
         db_session.delete(syllabus)
         db_session.commit()
         return True
@@ -1,10 +1,12 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import Session, delete, select, update
 
-from models import User
+from models import User, UserSyllabus, Test, Result
 from schemas.auth import AuthRegisterRequest
 from schemas.user import UserUpdateRequest
+from custom_types.enums import UserType
 
 
 class UserDatabase:
@@ -22,7 +24,7 @@ class UserDatabase:
         )
         db_session.add(user)
         db_session.commit()
-        db_session.refresh(user)
+
         return user
 
     def get_user_by_id(self, db_session: Session, user_id: UUID) -> Optional[User]:
@@ -30,6 +32,14 @@ class UserDatabase:
         statement = select(User).where(User.id == user_id)
         return db_session.exec(statement).first()
 
+    def get_user_updated_at(
+        self, db_session: Session, user_id: UUID
+    ) -> Optional[datetime]:
+        """Get when a user was last updated, without loading them."""
+        statement = select(User.updated_at).where(User.id == user_id)
+
+        return db_session.exec(statement).first()
+
     def get_user_by_email(self, db_session: Session, email: str) -> Optional[User]:
         """Get a user by email."""
         statement = select(User).where(User.email == email)
@@ -44,12 +54,116 @@ class UserDatabase:
             setattr(user, key, value)
 
         db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
+
         return user
 
+    def get_token_claims_by_ids(
+        self, db_session: Session, user_ids: Iterable[UUID]
+    ) -> Dict[UUID, Tuple[str, UserType, str, str]]:
+        """Get the fields that access tokens carry as claims for several users, without loading them."""
+        statement = select(
+            User.id, User.email, User.type, User.first_name, User.last_name
+        ).where(User.id.in_(user_ids))
+
+        return {
+            user_id: tuple(claims) for user_id, *claims in db_session.exec(statement)
+        }
+
+    def get_user_ids_by_emails(
+        self, db_session: Session, emails: Iterable[str]
+    ) -> Dict[str, UUID]:
+        """Get the IDs of the users that hold any of the emails, keyed by email."""
+        statement = select(User.email, User.id).where(User.email.in_(emails))
+
+        return {email: user_id for email, user_id in db_session.exec(statement)}
+
+    def update_users(
+        self, db_session: Session, user_ids: List[UUID], changes: Dict[str, Any]
+    ) -> Set[UUID]:
+        """Apply the same changes to several users with one UPDATE, returning the IDs that exist."""
+        if not changes:
+            statement = select(User.id).where(User.id.in_(user_ids))
+
+            return set(db_session.exec(statement))
+
+        statement = (
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(**changes)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        return set(db_session.execute(statement).scalars())
+
+    def update_user_password(
+        self, db_session: Session, user_id: UUID, hashed_password: str
+    ) -> None:
+        """Update a user's password hash in the database, without loading or attaching the user."""
+        statement = (
+            update(User).where(User.id == user_id).values(password=hashed_password)
+        )
+        db_session.exec(statement)
+        db_session.commit()
+
+    def get_result_tests_by_user_id(
+        self, db_session: Session, user_id: UUID
+    ) -> Dict[UUID, UUID]:
+        """Get the tests a user has results for, mapped to their syllabus IDs."""
+        statement = (
+            select(Test.id, Test.syllabus_id)
+            .distinct()
+            .join(Result, Result.test_id == Test.id)
+            .join(UserSyllabus, UserSyllabus.id == Result.user_syllabus_id)
+            .where(UserSyllabus.user_id == user_id)
+        )
+
+        return {
+            test_id: syllabus_id for test_id, syllabus_id in db_session.exec(statement)
+        }
+
+    def delete_users(
+        self, db_session: Session, user_ids: List[UUID]
+    ) -> Tuple[Set[UUID], Set[UUID], Set[UUID]]:
+        """Delete several users and their enrolments, one DELETE per table, returning the deleted user, test and syllabus IDs."""
+        # NOTE: Bulk deletes skip the ORM cascades, so enrolments and their results are deleted explicitly. Progress
+        #       summaries go with their enrolments through the database's ON DELETE CASCADE.
+        user_syllabus_ids = select(UserSyllabus.id).where(
+            UserSyllabus.user_id.in_(user_ids)
+        )
+        results_statement = (
+            delete(Result)
+            .where(Result.user_syllabus_id.in_(user_syllabus_ids))
+            .returning(Result.test_id)
+            .execution_options(synchronize_session=False)
+        )
+        test_ids = set(db_session.execute(results_statement).scalars())
+        user_syllabuses_statement = (
+            delete(UserSyllabus)
+            .where(UserSyllabus.user_id.in_(user_ids))
+            .returning(UserSyllabus.syllabus_id)
+            .execution_options(synchronize_session=False)
+        )
+        syllabus_ids = set(db_session.execute(user_syllabuses_statement).scalars())
+        users_statement = (
+            delete(User)
+            .where(User.id.in_(user_ids))
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted_user_ids = set(db_session.execute(users_statement).scalars())
+
+        return deleted_user_ids, test_ids, syllabus_ids
+
     def delete_user(self, db_session: Session, user: User) -> bool:
         """Delete a user from the database."""
+        # NOTE: The many-to-many relationship would delete the user's enrolments as bare link rows, which skips their
+        #       results cascade and fails on the result foreign key, so they are deleted through the ORM first
+        statement = select(UserSyllabus).where(UserSyllabus.user_id == user.id)
+        for user_syllabus in db_session.exec(statement):
+            db_session.delete(user_syllabus)
+        db_session.flush()
+
         db_session.delete(user)
         db_session.commit()
         return True
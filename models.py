@@ -1,11 +1,23 @@
 from datetime import datetime, date
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID, uuid4
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import DateTime, func, UniqueConstraint, CheckConstraint
+from sqlalchemy import (
+    DDL,
+    Column,
+    Computed,
+    DateTime,
+    event,
+    func,
+    UniqueConstraint,
+    CheckConstraint,
+    Index,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from pydantic import EmailStr
 
 from custom_types.enums import UserType, SubjectCode, SyllabusLevel, FileType
+from config.environment import SEARCH_TRIGRAM
 
 # NOTE: The following are the established cascade deletes:
 # - Deleting user_syllabus -> deletes associated results
@@ -17,6 +29,10 @@ from custom_types.enums import UserType, SubjectCode, SyllabusLevel, FileType
 # NOTE: If you use sa_column here, created_at/updated_at columns will be instantiated and
 #       then SQLAlchemy will try to set the same column to several tables which is not allowed.
 class TimestampedModel(SQLModel):
+    # NOTE: Fetches the server-generated timestamps with RETURNING on INSERT and UPDATE, so written objects are
+    #       hydrated by the flush itself instead of a refresh() round trip per object
+    __mapper_args__ = {"eager_defaults": True}
+
     created_at: Optional[datetime] = Field(
         default=None,
         sa_type=DateTime(timezone=True),
@@ -42,6 +58,7 @@ class UserSyllabus(TimestampedModel, table=True):
     )
 
     # Constrants
+    # NOTE: The unique constraint's index on (user_id, syllabus_id) also serves the per-user syllabus lookups
     __table_args__ = (
         UniqueConstraint("user_id", "syllabus_id", name="uq_user_syllabus"),
     )
@@ -71,6 +88,10 @@ class User(TimestampedModel, table=True):
 
 
 class Syllabus(TimestampedModel, table=True):
+    # Indexes
+    # NOTE: Keyset pagination orders by (created_at, id), so each page is an index range scan
+    __table_args__ = (Index("ix_syllabus_created_at_id", "created_at", "id"),)
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str = Field(nullable=False)
     description: str = Field(nullable=False)
@@ -97,7 +118,8 @@ class Lesson(TimestampedModel, table=True):
     conducted_at: date = Field(nullable=False, index=True)
 
     # Relationships
-    syllabus_id: UUID = Field(foreign_key="syllabus.id", nullable=False)
+    # NOTE: Indexed since lessons are loaded and searched per syllabus
+    syllabus_id: UUID = Field(foreign_key="syllabus.id", nullable=False, index=True)
     syllabus: "Syllabus" = Relationship(back_populates="lessons")
 
     files: List["File"] = Relationship(back_populates="lesson", cascade_delete=True)
@@ -113,7 +135,8 @@ class File(TimestampedModel, table=True):
     type: FileType = Field(nullable=False)
 
     # Relationships
-    lesson_id: UUID = Field(foreign_key="lesson.id", nullable=False)
+    # NOTE: Indexed since files are loaded and searched per lesson
+    lesson_id: UUID = Field(foreign_key="lesson.id", nullable=False, index=True)
     lesson: "Lesson" = Relationship(back_populates="files")
 
 
@@ -132,7 +155,8 @@ class Test(TimestampedModel, table=True):
     conducted_at: date = Field(nullable=False, index=True)
 
     # Relationships
-    syllabus_id: UUID = Field(foreign_key="syllabus.id", nullable=False)
+    # NOTE: Indexed since tests are loaded and searched per syllabus
+    syllabus_id: UUID = Field(foreign_key="syllabus.id", nullable=False, index=True)
     syllabus: "Syllabus" = Relationship(back_populates="tests")
 
     results: List["Result"] = Relationship(back_populates="test", cascade_delete=True)
@@ -140,7 +164,18 @@ class Test(TimestampedModel, table=True):
 
 class Result(TimestampedModel, table=True):
     # Constrants
-    __table_args__ = (CheckConstraint("score >= 0", name="ck_result_score_positive"),)
+    # NOTE: A student has one result per test, which progress summaries count as tests taken. A unique index
+    #       rather than a constraint, so that it is also created on existing tables. Its leading test_id column
+    #       serves the per-test analytics aggregates.
+    __table_args__ = (
+        CheckConstraint("score >= 0", name="ck_result_score_positive"),
+        Index(
+            "uq_result_test_id_user_syllabus_id",
+            "test_id",
+            "user_syllabus_id",
+            unique=True,
+        ),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     score: int = Field(nullable=False)
@@ -149,5 +184,69 @@ class Result(TimestampedModel, table=True):
     test_id: UUID = Field(foreign_key="test.id", nullable=False)
     test: "Test" = Relationship(back_populates="results")
 
-    user_syllabus_id: UUID = Field(foreign_key="user_syllabus.id", nullable=False)
+    # NOTE: Indexed since progress summaries are maintained and rebuilt per user syllabus
+    user_syllabus_id: UUID = Field(
+        foreign_key="user_syllabus.id", nullable=False, index=True
+    )
     user_syllabus: "UserSyllabus" = Relationship(back_populates="results")
+
+
+class UserSyllabusProgress(TimestampedModel, table=True):
+    __tablename__: str = "user_syllabus_progress"
+
+    # NOTE: A summary maintained incrementally by database/progress.py, so that reading it is a primary key lookup.
+    #       Recompute it from scratch with "python -m scripts.rebuild_progress".
+    user_syllabus_id: UUID = Field(
+        foreign_key="user_syllabus.id", primary_key=True, ondelete="CASCADE"
+    )
+    lessons_covered: int = Field(default=0, nullable=False)
+    files_completed: int = Field(default=0, nullable=False)
+    tests_taken: int = Field(default=0, nullable=False)
+    # NOTE: Sum of the per-test percentages rather than their average, so that results can be added and removed
+    percentage_total: float = Field(default=0, nullable=False)
+
+
+# Full-text search
+# NOTE: Text search configuration that stems both the indexed text and the search terms
+SEARCH_CONFIG = "english"
+# NOTE: The column matched for typo-tolerant search, which is also the weight A text of the search vector
+SEARCH_TITLE_COLUMNS = {Syllabus: "name", Lesson: "title", File: "title", Test: "title"}
+# NOTE: Created before the tables, ahead of the indexes that use their operator classes
+DATABASE_EXTENSIONS = (
+    [DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")] if SEARCH_TRIGRAM else []
+)
+
+
+def _search_vector(*weighted_columns: Tuple[str, str]) -> Column:
+    """A tsvector column generated by Postgres from the weighted text columns on every write."""
+    expression = " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    )
+
+    return Column("search_vector", TSVECTOR, Computed(expression, persisted=True))
+
+
+# NOTE: Added to the tables rather than declared on the models, so that search vectors are never loaded with
+#       the rows or serialized in responses
+for model, search_vector in (
+    (Syllabus, _search_vector(("name", "A"), ("description", "B"))),
+    (Lesson, _search_vector(("title", "A"), ("description", "B"))),
+    (File, _search_vector(("title", "A"), ("filename", "B"))),
+    (Test, _search_vector(("title", "A"))),
+):
+    table = model.__table__  # type: ignore[attr-defined]
+    table.append_column(search_vector)
+    Index(f"ix_{table.name}_search_vector", search_vector, postgresql_using="gin")
+
+    if SEARCH_TRIGRAM:
+        title_column = SEARCH_TITLE_COLUMNS[model]
+        Index(
+            f"ix_{table.name}_{title_column}_trgm",
+            table.c[title_column],
+            postgresql_using="gin",
+            postgresql_ops={title_column: "gin_trgm_ops"},
+        )
+
+for extension in DATABASE_EXTENSIONS:
+    event.listen(SQLModel.metadata, "before_create", extension)
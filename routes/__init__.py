@@ -3,9 +3,15 @@ from fastapi import APIRouter
 from .user import router as user_router
 from .auth import router as auth_router
 from .syllabus import router as syllabus_router
+from .result import router as result_router
+from .analytics import router as analytics_router
+from .admin import router as admin_router
 
 api_router = APIRouter()
 
 api_router.include_router(auth_router)
 api_router.include_router(user_router)
 api_router.include_router(syllabus_router)
+api_router.include_router(result_router)
+api_router.include_router(analytics_router)
+api_router.include_router(admin_router)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, status
+
+from schemas.admin import AdminPoolGetResponse
+from api.routing import AppRoute
+from api.responses import PydanticJSONResponse
+from custom_types.dependencies import AdminPrincipalDep, AdminServiceDep
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=AppRoute)
+
+
+@router.get(
+    "/pool",
+    response_model=AdminPoolGetResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_pool(_: AdminPrincipalDep, admin_service: AdminServiceDep):
+    """Get the database connection pool state."""
+    pool = admin_service.get_db_pool_stats()
+
+    return PydanticJSONResponse(AdminPoolGetResponse(pool=pool))
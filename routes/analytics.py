@@ -0,0 +1,52 @@
+from uuid import UUID
+from fastapi import APIRouter, status
+
+from schemas.analytics import AnalyticsSyllabusGetResponse, AnalyticsTestGetResponse
+from config.database import run_in_session
+from api.routing import AppRoute
+from api.responses import PydanticJSONResponse
+from custom_types.dependencies import (
+    AdminPrincipalDep,
+    AnalyticsServiceDep,
+    DBSessionDep,
+)
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=AppRoute)
+
+
+@router.get(
+    "/tests/{test_id}",
+    response_model=AnalyticsTestGetResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_test_analytics(
+    test_id: UUID,
+    _: AdminPrincipalDep,
+    analytics_service: AnalyticsServiceDep,
+    db_session: DBSessionDep,
+):
+    """Get the score distribution of a test."""
+    analytics = await run_in_session(
+        db_session, analytics_service.get_test_analytics, test_id
+    )
+
+    return PydanticJSONResponse(AnalyticsTestGetResponse(analytics=analytics))
+
+
+@router.get(
+    "/syllabuses/{syllabus_id}",
+    response_model=AnalyticsSyllabusGetResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_syllabus_analytics(
+    syllabus_id: UUID,
+    _: AdminPrincipalDep,
+    analytics_service: AnalyticsServiceDep,
+    db_session: DBSessionDep,
+):
+    """Get the cohort percentile rank of every student in a syllabus."""
+    students = await run_in_session(
+        db_session, analytics_service.get_syllabus_analytics, syllabus_id
+    )
+
+    return PydanticJSONResponse(AnalyticsSyllabusGetResponse(students=students))
@@ -9,8 +9,15 @@ from schemas.auth import (
     AuthVerifyResponse,
     AuthRefreshResponse,
 )
-from custom_types.dependencies import AuthServiceDep, DBSessionDep
+from api.routing import AppRoute
+from api.responses import PydanticJSONResponse
+from custom_types.dependencies import (
+    AuthenticatedPrincipalDep,
+    AuthServiceDep,
+    DBSessionDep,
+)
 from custom_types.enums import TokenType
+from config.database import run_in_session
 from config.auth import (
     ACCESS_TOKEN_COOKIE_NAME,
     REFRESH_TOKEN_COOKIE_NAME,
@@ -19,7 +26,7 @@ from config.auth import (
 )
 from config.environment import COOKIE_HTTP_ONLY, COOKIE_SECURE, COOKIE_SAME_SITE
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=AppRoute)
 
 
 @router.post(
@@ -27,16 +34,18 @@ router = APIRouter(prefix="/auth", tags=["auth"])
     response_model=AuthRegisterResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def register(
+async def register(
     request_data: AuthRegisterRequest,
     auth_service: AuthServiceDep,
     db_session: DBSessionDep,
-    response: Response,
 ):
     """Register a new user and set access and refresh tokens as HTTP-only cookies."""
-    user = auth_service.register(db_session, request_data)
+    user = await auth_service.register(db_session, request_data)
     access_token = auth_service.create_token(user, TokenType.ACCESS)
     refresh_token = auth_service.create_token(user, TokenType.REFRESH)
+    response = PydanticJSONResponse(
+        AuthRegisterResponse(user=user), status_code=status.HTTP_201_CREATED
+    )
 
     # Set HTTP-only cookies
     response.set_cookie(
@@ -58,7 +67,7 @@ def register(
         path="/",
     )
 
-    return AuthRegisterResponse(user=user)
+    return response
 
 
 @router.post(
@@ -66,16 +75,18 @@ def register(
     response_model=AuthLoginResponse,
     status_code=status.HTTP_200_OK,
 )
-def login(
+async def login(
     request_data: AuthLoginRequest,
     auth_service: AuthServiceDep,
     db_session: DBSessionDep,
-    response: Response,
 ):
     """Authenticate a user and set access and refresh tokens as HTTP-only cookies."""
-    user = auth_service.login(db_session, request_data.email, request_data.password)
+    user = await auth_service.login(
+        db_session, request_data.email, request_data.password
+    )
     access_token = auth_service.create_token(user, TokenType.ACCESS)
     refresh_token = auth_service.create_token(user, TokenType.REFRESH)
+    response = PydanticJSONResponse(AuthLoginResponse(user=user))
 
     # Set HTTP-only cookies
     response.set_cookie(
@@ -97,12 +108,16 @@ def login(
         path="/",
     )
 
-    return AuthLoginResponse(user=user)
+    return response
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout(response: Response):
-    """Logout user by clearing HTTP-only cookies."""
+def logout(request: Request, auth_service: AuthServiceDep, response: Response):
+    """Logout user by revoking their tokens and clearing HTTP-only cookies."""
+    auth_service.revoke_tokens(
+        request.cookies.get(ACCESS_TOKEN_COOKIE_NAME),
+        request.cookies.get(REFRESH_TOKEN_COOKIE_NAME),
+    )
 
     # Clear HTTP-only cookies
     response.delete_cookie(
@@ -126,26 +141,14 @@ def logout(response: Response):
     response_model=AuthVerifyResponse,
     status_code=status.HTTP_200_OK,
 )
-def verify(
-    request: Request,
-    auth_service: AuthServiceDep,
-    db_session: DBSessionDep,
-):
+async def verify(authenticated_principal: AuthenticatedPrincipalDep):
     """Verify the current user's authentication status from HTTP-only cookie."""
 
-    token = request.cookies.get(ACCESS_TOKEN_COOKIE_NAME)
-    user = auth_service.verify_authentication(db_session, token)
-
-    return AuthVerifyResponse(
-        authenticated=user is not None,
-        user=user
-        and AuthVerifyUser(
-            id=user.id,
-            email=user.email,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            type=user.type,
-        ),
+    return PydanticJSONResponse(
+        AuthVerifyResponse(
+            authenticated=True,
+            user=AuthVerifyUser(**authenticated_principal.model_dump()),
+        )
     )
 
 
@@ -154,18 +157,18 @@ def verify(
     response_model=AuthRefreshResponse,
     status_code=status.HTTP_200_OK,
 )
-def refresh(
+async def refresh(
     request: Request,
     auth_service: AuthServiceDep,
     db_session: DBSessionDep,
-    response: Response,
 ):
     """Refresh the current user's access token using refresh token from HTTP-only cookie."""
 
     refresh_token = request.cookies.get(REFRESH_TOKEN_COOKIE_NAME)
-    user = auth_service.refresh_token(db_session, refresh_token)
+    user = await run_in_session(db_session, auth_service.refresh_token, refresh_token)
 
     access_token = auth_service.create_token(user, TokenType.ACCESS)
+    response = PydanticJSONResponse(AuthRefreshResponse(user=user))
 
     # Set HTTP-only cookie
     response.set_cookie(
@@ -178,4 +181,4 @@ def refresh(
         path="/",
     )
 
-    return AuthRefreshResponse(user=user)
+    return response
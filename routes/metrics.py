@@ -0,0 +1,19 @@
+from fastapi import APIRouter, status
+
+from api.responses import PrometheusTextResponse
+from custom_types.dependencies import AdminServiceDep, MetricsScraperDep
+
+# NOTE: Served outside /api with the default route class, so that scrapes don't count towards the request metrics
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/metrics",
+    response_class=PrometheusTextResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_metrics(_: MetricsScraperDep, admin_service: AdminServiceDep):
+    """Get this process's metrics in the Prometheus text exposition format."""
+    metrics = admin_service.render_metrics()
+
+    return PrometheusTextResponse(metrics)
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Request, status
+
+from schemas.result import ResultImportResponse
+from api.routing import AppRoute
+from api.responses import PydanticJSONResponse
+from custom_types.dependencies import (
+    AdminPrincipalDep,
+    DBSessionDep,
+    ResultServiceDep,
+)
+
+router = APIRouter(prefix="/results", tags=["result"], route_class=AppRoute)
+
+
+@router.post(
+    "/import",
+    response_model=ResultImportResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_results(
+    request: Request,
+    _: AdminPrincipalDep,
+    result_service: ResultServiceDep,
+    db_session: DBSessionDep,
+):
+    """Import results from a CSV body with test_id, user_syllabus_id and score columns."""
+    imported, errors = await result_service.import_results(db_session, request.stream())
+
+    return PydanticJSONResponse(ResultImportResponse(imported=imported, errors=errors))
@@ -1,21 +1,36 @@
+from typing import Annotated, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Header, Query, status
+from fastapi.responses import StreamingResponse
 
 from schemas.syllabus import (
+    SyllabusBatchRequest,
+    SyllabusBatchResponse,
     SyllabusCreateRequest,
     SyllabusCreateResponse,
     SyllabusGetResponse,
+    SyllabusDetailGetResponse,
+    SyllabusProgressGetResponse,
+    SyllabusSearchGetResponse,
     SyllabusesGetResponse,
     SyllabusUpdateRequest,
     SyllabusUpdateResponse,
 )
+from api.routing import AppRoute
+from api.conditional import etag_headers, not_modified_response
+from api.responses import PydanticJSONResponse
+from config.database import run_in_session, stream_in_session
+from custom_types.enums import SyllabusInclude
 from custom_types.dependencies import (
-    AuthenticatedUserDep,
+    AdminPrincipalDep,
+    AuthenticatedPrincipalDep,
+    DBReadSessionDep,
     DBSessionDep,
+    ProgressServiceDep,
     SyllabusServiceDep,
 )
 
-router = APIRouter(prefix="/syllabus", tags=["syllabus"])
+router = APIRouter(prefix="/syllabus", tags=["syllabus"], route_class=AppRoute)
 
 
 @router.post(
@@ -23,17 +38,44 @@ router = APIRouter(prefix="/syllabus", tags=["syllabus"])
     response_model=SyllabusCreateResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def create_syllabus(
+async def create_syllabus(
     request_data: SyllabusCreateRequest,
-    authenticated_user: AuthenticatedUserDep,
+    authenticated_principal: AuthenticatedPrincipalDep,
     syllabus_service: SyllabusServiceDep,
     db_session: DBSessionDep,
 ):
     """Create a new syllabus."""
-    user_id = authenticated_user.id
-    syllabus = syllabus_service.create_syllabus(db_session, user_id, request_data)
+    user_id = authenticated_principal.id
+    syllabus = await run_in_session(
+        db_session, syllabus_service.create_syllabus, user_id, request_data
+    )
 
-    return SyllabusCreateResponse(syllabus=syllabus)
+    return PydanticJSONResponse(
+        SyllabusCreateResponse(syllabus=syllabus),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=SyllabusBatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def batch_syllabuses(
+    request_data: SyllabusBatchRequest,
+    _: AdminPrincipalDep,
+    syllabus_service: SyllabusServiceDep,
+    db_session: DBSessionDep,
+):
+    """Update and delete several syllabuses in one transaction, reporting the outcome of each item."""
+    results = await run_in_session(
+        db_session,
+        syllabus_service.apply_syllabus_batch,
+        request_data.updates,
+        request_data.deletes,
+    )
+
+    return PydanticJSONResponse(SyllabusBatchResponse(results=results))
 
 
 @router.get(
@@ -41,16 +83,60 @@ def create_syllabus(
     response_model=SyllabusesGetResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_syllabuses(
-    authenticated_user: AuthenticatedUserDep,
+async def get_syllabuses(
+    authenticated_principal: AuthenticatedPrincipalDep,
     syllabus_service: SyllabusServiceDep,
-    db_session: DBSessionDep,
+    db_session: DBReadSessionDep,
+    limit: Annotated[int, Query(ge=1, le=100)] = 50,
+    cursor: Optional[str] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """Get a page of the user's syllabuses, latest created first, or 304 if the client's copy is current."""
+    user_id = authenticated_principal.id
+    syllabuses, next_cursor, etag = await run_in_session(
+        db_session,
+        syllabus_service.get_modified_syllabuses_page_by_user_id,
+        user_id,
+        limit,
+        cursor,
+        if_none_match,
+    )
+    if syllabuses is None:
+        return not_modified_response(etag)
+
+    return PydanticJSONResponse(
+        SyllabusesGetResponse(syllabuses=syllabuses, next_cursor=next_cursor),
+        headers=etag_headers(etag),
+    )
+
+
+@router.get(
+    "/search",
+    response_model=SyllabusSearchGetResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def search_syllabuses(
+    authenticated_principal: AuthenticatedPrincipalDep,
+    syllabus_service: SyllabusServiceDep,
+    db_session: DBReadSessionDep,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 20,
+    cursor: Optional[str] = None,
 ):
-    """Get all syllabuses."""
-    user_id = authenticated_user.id
-    syllabuses = syllabus_service.get_all_syllabuses_by_user_id(db_session, user_id)
+    """Search the user's syllabuses, lessons, files and tests, best matches first, with the matches highlighted."""
+    user_id = authenticated_principal.id
+    results, next_cursor = await run_in_session(
+        db_session,
+        syllabus_service.search_syllabus_content,
+        user_id,
+        q,
+        limit,
+        cursor,
+    )
 
-    return SyllabusesGetResponse(syllabuses=syllabuses)
+    return PydanticJSONResponse(
+        SyllabusSearchGetResponse(results=results, next_cursor=next_cursor)
+    )
 
 
 @router.get(
@@ -58,16 +144,97 @@ def get_syllabuses(
     response_model=SyllabusGetResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_syllabus(
+async def get_syllabus(
+    syllabus_id: UUID,
+    _: AuthenticatedPrincipalDep,
+    syllabus_service: SyllabusServiceDep,
+    db_session: DBReadSessionDep,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """Get a syllabus by ID, or 304 if the client's copy is current."""
+    syllabus, etag = await run_in_session(
+        db_session,
+        syllabus_service.get_modified_syllabus_by_id,
+        syllabus_id,
+        if_none_match,
+    )
+    if syllabus is None:
+        return not_modified_response(etag)
+
+    return PydanticJSONResponse(
+        SyllabusGetResponse(syllabus=syllabus), headers=etag_headers(etag)
+    )
+
+
+@router.get(
+    "/{syllabus_id}/detail",
+    response_model=SyllabusDetailGetResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_200_OK,
+)
+async def get_syllabus_detail(
     syllabus_id: UUID,
-    _: AuthenticatedUserDep,
+    _: AuthenticatedPrincipalDep,
     syllabus_service: SyllabusServiceDep,
+    db_session: DBReadSessionDep,
+    include: Annotated[List[SyllabusInclude], Query()] = list(SyllabusInclude),
+):
+    """Get a syllabus with its lessons, files and tests, limited to the included branches."""
+    syllabus, lessons, tests = await run_in_session(
+        db_session,
+        syllabus_service.get_syllabus_detail_by_id,
+        syllabus_id,
+        set(include),
+    )
+
+    return PydanticJSONResponse(
+        SyllabusDetailGetResponse(syllabus=syllabus, lessons=lessons, tests=tests),
+        exclude_none=True,
+    )
+
+
+@router.get(
+    "/{syllabus_id}/progress",
+    response_model=SyllabusProgressGetResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_syllabus_progress(
+    syllabus_id: UUID,
+    authenticated_principal: AuthenticatedPrincipalDep,
+    progress_service: ProgressServiceDep,
     db_session: DBSessionDep,
 ):
-    """Get a syllabus by ID."""
-    syllabus = syllabus_service.get_syllabus_by_id(db_session, syllabus_id)
+    """Get the user's progress summary in a syllabus."""
+    # NOTE: Stays on the primary, a first read summarizes the enrolment and writes the summary
+    user_id = authenticated_principal.id
+    progress = await run_in_session(
+        db_session, progress_service.get_progress, user_id, syllabus_id
+    )
+
+    return PydanticJSONResponse(SyllabusProgressGetResponse(progress=progress))
+
+
+@router.get(
+    "/{syllabus_id}/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def export_syllabus(
+    syllabus_id: UUID,
+    _: AdminPrincipalDep,
+    syllabus_service: SyllabusServiceDep,
+    db_session: DBReadSessionDep,
+):
+    """Stream a syllabus with its lessons, files, tests and results as NDJSON."""
+    await run_in_session(db_session, syllabus_service.get_syllabus_by_id, syllabus_id)
+    batches = stream_in_session(
+        db_session, syllabus_service.export_syllabus, syllabus_id
+    )
 
-    return SyllabusGetResponse(syllabus=syllabus)
+    return StreamingResponse(
+        ("".join(lines) async for lines in batches),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.patch(
@@ -75,28 +242,30 @@ def get_syllabus(
     response_model=SyllabusUpdateResponse,
     status_code=status.HTTP_200_OK,
 )
-def update_syllabus(
+async def update_syllabus(
     syllabus_id: UUID,
     request_data: SyllabusUpdateRequest,
-    _: AuthenticatedUserDep,
+    _: AuthenticatedPrincipalDep,
     syllabus_service: SyllabusServiceDep,
     db_session: DBSessionDep,
 ):
     """Update a syllabus."""
-    syllabus = syllabus_service.update_syllabus(db_session, syllabus_id, request_data)
+    syllabus = await run_in_session(
+        db_session, syllabus_service.update_syllabus, syllabus_id, request_data
+    )
 
-    return SyllabusUpdateResponse(syllabus=syllabus)
+    return PydanticJSONResponse(SyllabusUpdateResponse(syllabus=syllabus))
 
 
 @router.delete(
     "/{syllabus_id}",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def delete_syllabus(
+async def delete_syllabus(
     syllabus_id: UUID,
-    _: AuthenticatedUserDep,
+    _: AuthenticatedPrincipalDep,
     syllabus_service: SyllabusServiceDep,
     db_session: DBSessionDep,
 ):
     """Delete a syllabus."""
-    syllabus_service.delete_syllabus(db_session, syllabus_id)
+    await run_in_session(db_session, syllabus_service.delete_syllabus, syllabus_id)
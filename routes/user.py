@@ -1,18 +1,49 @@
+from typing import Annotated, Optional
 from uuid import UUID
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Header, status
 
 from schemas.user import (
+    UserBatchRequest,
+    UserBatchResponse,
     UserUpdateRequest,
     UserGetResponse,
     UserUpdateResponse,
 )
+from api.routing import AppRoute
+from api.conditional import etag_headers, not_modified_response
+from api.responses import PydanticJSONResponse
+from config.database import run_in_session
 from custom_types.dependencies import (
-    AuthenticatedUserDep,
+    AdminPrincipalDep,
+    AuthenticatedPrincipalDep,
+    DBReadSessionDep,
     DBSessionDep,
     UserServiceDep,
 )
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=AppRoute)
+
+
+@router.post(
+    "/batch",
+    response_model=UserBatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def batch_users(
+    request_data: UserBatchRequest,
+    _: AdminPrincipalDep,
+    user_service: UserServiceDep,
+    db_session: DBSessionDep,
+):
+    """Update and delete several users in one transaction, reporting the outcome of each item."""
+    results = await run_in_session(
+        db_session,
+        user_service.apply_user_batch,
+        request_data.updates,
+        request_data.deletes,
+    )
+
+    return PydanticJSONResponse(UserBatchResponse(results=results))
 
 
 @router.get(
@@ -20,16 +51,21 @@ router = APIRouter(prefix="/users", tags=["users"])
     response_model=UserGetResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_user(
+async def get_user(
     user_id: UUID,
-    _: AuthenticatedUserDep,
+    _: AuthenticatedPrincipalDep,
     user_service: UserServiceDep,
-    db_session: DBSessionDep,
+    db_session: DBReadSessionDep,
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
-    """Get a user by ID."""
-    user = user_service.get_user_by_id(db_session, user_id)
+    """Get a user by ID, or 304 if the client's copy is current."""
+    user, etag = await run_in_session(
+        db_session, user_service.get_modified_user_by_id, user_id, if_none_match
+    )
+    if user is None:
+        return not_modified_response(etag)
 
-    return UserGetResponse(user=user)
+    return PydanticJSONResponse(UserGetResponse(user=user), headers=etag_headers(etag))
 
 
 @router.patch(
@@ -37,28 +73,30 @@ def get_user(
     response_model=UserUpdateResponse,
     status_code=status.HTTP_200_OK,
 )
-def update_user(
+async def update_user(
     user_id: UUID,
     request_data: UserUpdateRequest,
-    _: AuthenticatedUserDep,
+    _: AuthenticatedPrincipalDep,
     user_service: UserServiceDep,
     db_session: DBSessionDep,
 ):
     """Update a user."""
-    user = user_service.update_user(db_session, user_id, request_data)
+    user = await run_in_session(
+        db_session, user_service.update_user, user_id, request_data
+    )
 
-    return UserUpdateResponse(user=user)
+    return PydanticJSONResponse(UserUpdateResponse(user=user))
 
 
 @router.delete(
     "/{user_id}",
     status_code=status.HTTP_204_NO_CONTENT,
 )
-def delete_user(
+async def delete_user(
     user_id: UUID,
-    _: AuthenticatedUserDep,
+    _: AuthenticatedPrincipalDep,
     user_service: UserServiceDep,
     db_session: DBSessionDep,
 ):
     """Delete a user."""
-    user_service.delete_user(db_session, user_id)
+    await run_in_session(db_session, user_service.delete_user, user_id)
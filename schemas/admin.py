@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class DBPoolStats(BaseModel):
+    size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkout_count: int
+    checkout_timeouts: int
+    checkout_wait_seconds_avg: float
+    checkout_wait_seconds_max: float
+
+
+class AdminPoolGetResponse(BaseModel):
+    pool: DBPoolStats
@@ -0,0 +1,42 @@
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict
+
+
+class HistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class TestAnalytics(BaseModel):
+    # NOTE: Frozen since cached instances are shared across requests
+    model_config = ConfigDict(frozen=True)
+
+    count: int
+    mean: Optional[float]
+    median: Optional[float]
+    standard_deviation: Optional[float]
+    minimum: Optional[int]
+    maximum: Optional[int]
+    percentile_25: Optional[float]
+    percentile_75: Optional[float]
+    percentile_90: Optional[float]
+    histogram: List[HistogramBin]
+
+
+class StudentRank(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    user_id: UUID
+    tests_taken: int
+    average_percentage: float
+    percentile_rank: float
+
+
+class AnalyticsTestGetResponse(BaseModel):
+    analytics: TestAnalytics
+
+
+class AnalyticsSyllabusGetResponse(BaseModel):
+    students: List[StudentRank]
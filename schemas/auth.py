@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from datetime import datetime
 from uuid import UUID
 from typing import Optional
@@ -8,11 +8,29 @@ from models import User
 
 
 class TokenPayload(BaseModel):
+    # NOTE: Frozen since verified payloads are shared between requests through the verified token cache
+    model_config = ConfigDict(frozen=True)
+
     sub: str
     email: EmailStr
     type: UserType
     exp: datetime
     token_type: TokenType
+    # NOTE: Optional so that tokens issued before claims-only verification still decode
+    jti: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    # NOTE: A float UNIX timestamp rather than a datetime, which PyJWT would truncate to whole seconds,
+    #       so that a token issued right after a revocation cutoff is told apart from one issued before it
+    iat: Optional[float] = None
+
+
+class AuthenticatedPrincipal(BaseModel):
+    id: UUID
+    email: EmailStr
+    first_name: str
+    last_name: str
+    type: UserType
 
 
 class AuthLoginRequest(BaseModel):
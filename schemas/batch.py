@@ -0,0 +1,11 @@
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+from custom_types.enums import BatchItemStatus
+
+
+class BatchItemResult(BaseModel):
+    id: UUID
+    status: BatchItemStatus
+    detail: Optional[str] = None
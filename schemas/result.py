@@ -0,0 +1,12 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class ResultImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class ResultImportResponse(BaseModel):
+    imported: int
+    errors: List[ResultImportRowError]
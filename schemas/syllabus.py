@@ -1,10 +1,13 @@
 from datetime import date
-from typing import List
-from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, Field
 
-from custom_types.enums import SubjectCode, SyllabusLevel
+from custom_types.enums import SearchResultType, SubjectCode, SyllabusLevel
+from config.environment import BATCH_MAX_ITEMS
+from schemas.batch import BatchItemResult
 
-from models import Syllabus
+from models import Syllabus, Lesson, File, Test
 
 
 class SyllabusCreateRequest(BaseModel):
@@ -25,6 +28,43 @@ class SyllabusGetResponse(BaseModel):
 
 class SyllabusesGetResponse(BaseModel):
     syllabuses: List[Syllabus]
+    next_cursor: Optional[str]
+
+
+class SyllabusSearchResult(BaseModel):
+    type: SearchResultType
+    id: UUID
+    syllabus_id: UUID
+    # NOTE: HTML-escaped text with the matched words wrapped in <mark> tags
+    title: str
+    snippet: Optional[str]
+
+
+class SyllabusSearchGetResponse(BaseModel):
+    results: List[SyllabusSearchResult]
+    next_cursor: Optional[str]
+
+
+class LessonDetail(BaseModel):
+    lesson: Lesson
+    files: Optional[List[File]] = None
+
+
+class SyllabusDetailGetResponse(BaseModel):
+    syllabus: Syllabus
+    lessons: Optional[List[LessonDetail]] = None
+    tests: Optional[List[Test]] = None
+
+
+class SyllabusProgress(BaseModel):
+    lessons_covered: int
+    files_completed: int
+    tests_taken: int
+    average_percentage: Optional[float]
+
+
+class SyllabusProgressGetResponse(BaseModel):
+    progress: SyllabusProgress
 
 
 class SyllabusUpdateRequest(BaseModel):
@@ -37,3 +77,16 @@ class SyllabusUpdateRequest(BaseModel):
 
 class SyllabusUpdateResponse(BaseModel):
     syllabus: Syllabus
+
+
+class SyllabusBatchUpdate(SyllabusUpdateRequest):
+    id: UUID
+
+
+class SyllabusBatchRequest(BaseModel):
+    updates: List[SyllabusBatchUpdate] = Field(default=[], max_length=BATCH_MAX_ITEMS)
+    deletes: List[UUID] = Field(default=[], max_length=BATCH_MAX_ITEMS)
+
+
+class SyllabusBatchResponse(BaseModel):
+    results: List[BatchItemResult]
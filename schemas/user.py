@@ -1,7 +1,10 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel, EmailStr, Field
 
 from custom_types.enums import UserType
+from config.environment import BATCH_MAX_ITEMS
+from schemas.batch import BatchItemResult
 
 from models import User
 
@@ -19,3 +22,16 @@ class UserGetResponse(BaseModel):
 
 class UserUpdateResponse(BaseModel):
     user: User
+
+
+class UserBatchUpdate(UserUpdateRequest):
+    id: UUID
+
+
+class UserBatchRequest(BaseModel):
+    updates: List[UserBatchUpdate] = Field(default=[], max_length=BATCH_MAX_ITEMS)
+    deletes: List[UUID] = Field(default=[], max_length=BATCH_MAX_ITEMS)
+
+
+class UserBatchResponse(BaseModel):
+    results: List[BatchItemResult]
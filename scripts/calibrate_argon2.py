@@ -0,0 +1,107 @@
+"""Calibrate Argon2 costs against a verify latency budget on this host.
+
+Usage:
+    python -m scripts.calibrate_argon2 --target-ms 250 --output .env.argon2
+
+For every parallelism and memory cost the time cost is raised until the p99 verify time exceeds the target.
+The strongest passing combination (highest memory x time) is written as environment variables for config/auth.py.
+"""
+
+import argparse
+import statistics
+from time import perf_counter
+from typing import List, Optional, Tuple
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+CALIBRATION_PASSWORD = "calibration-password"
+
+
+def measure_verify_p99(
+    time_cost: int, memory_cost: int, parallelism: int, samples: int
+) -> float:
+    """Measure the p99 verify time in milliseconds for one set of costs."""
+    hasher = Argon2Hasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    hashed_password = hasher.hash(CALIBRATION_PASSWORD)
+
+    timings = []
+    for _ in range(samples):
+        started_at = perf_counter()
+        hasher.verify(CALIBRATION_PASSWORD, hashed_password)
+        timings.append((perf_counter() - started_at) * 1000)
+
+    return statistics.quantiles(timings, n=100, method="inclusive")[98]
+
+
+def calibrate(
+    target_ms: float,
+    memory_costs: List[int],
+    parallelisms: List[int],
+    max_time_cost: int,
+    samples: int,
+) -> Optional[Tuple[int, int, int, float]]:
+    """Find the strongest (time_cost, memory_cost, parallelism) whose p99 verify time meets the target."""
+    best: Optional[Tuple[int, int, int, float]] = None
+
+    for parallelism in parallelisms:
+        for memory_cost in memory_costs:
+            for time_cost in range(1, max_time_cost + 1):
+                p99 = measure_verify_p99(time_cost, memory_cost, parallelism, samples)
+                print(
+                    f"t={time_cost:<3} m={memory_cost:<8} p={parallelism:<3} p99={p99:8.2f} ms"
+                )
+                if p99 > target_ms:
+                    break
+
+                if best is None or time_cost * memory_cost > best[0] * best[1]:
+                    best = (time_cost, memory_cost, parallelism, p99)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--target-ms", type=float, default=250, help="p99 verify budget in ms"
+    )
+    parser.add_argument(
+        "--memory-costs",
+        type=int,
+        nargs="+",
+        default=[19456, 32768, 47104, 65536, 131072],
+        help="memory costs to try, in KiB",
+    )
+    parser.add_argument("--parallelisms", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--output", help="file to write the environment variables to")
+    args = parser.parse_args()
+
+    best = calibrate(
+        args.target_ms,
+        args.memory_costs,
+        args.parallelisms,
+        args.max_time_cost,
+        args.samples,
+    )
+    if best is None:
+        raise SystemExit(f"No Argon2 costs meet a p99 of {args.target_ms} ms")
+
+    time_cost, memory_cost, parallelism, p99 = best
+    lines = [
+        f"PASSWORD_ARGON2_TIME_COST={time_cost}",
+        f"PASSWORD_ARGON2_MEMORY_COST={memory_cost}",
+        f"PASSWORD_ARGON2_PARALLELISM={parallelism}",
+    ]
+
+    print(f"\nSelected costs (p99 verify {p99:.2f} ms):")
+    print("\n".join(lines))
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
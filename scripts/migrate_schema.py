@@ -0,0 +1,39 @@
+"""Bring existing tables up to their models by adding the columns and indexes missing from them.
+
+Usage:
+    python -m scripts.migrate_schema --dry-run
+    python -m scripts.migrate_schema
+
+Booting the app only creates missing tables, and leaves the schema unrecorded while existing tables lag behind their
+models. Run this during a deploy, before the new code serves: adding a generated column rewrites its table and
+building an index reads all of it, both holding locks on the table until they finish. The DDL runs in one
+transaction, so a failure leaves the schema as it was. --dry-run only prints the DDL that would run.
+"""
+
+import argparse
+
+from config.database import engine, get_schema_migrations, migrate_db_schema
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the DDL that would run without running it",
+    )
+    args = parser.parse_args()
+
+    if args.dry_run:
+        with engine.connect() as connection:
+            migrations = get_schema_migrations(connection)
+    else:
+        migrations = migrate_db_schema()
+
+    for migration in migrations:
+        print(f"{migration};")
+    print(f"{len(migrations)} migrations {'pending' if args.dry_run else 'applied'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Recompute the student progress summaries from scratch, or verify them against a recomputation.
+
+Usage:
+    python -m scripts.rebuild_progress
+    python -m scripts.rebuild_progress --verify
+
+Enrolments without a summary get one on their first progress read, so a rebuild is only needed to repair drift.
+--verify only reads, and exits with status 1 if any stored summary differs from the recomputed one.
+"""
+
+import argparse
+import math
+from sqlmodel import Session
+
+from config.database import create_db_and_tables, engine
+from database.progress import ProgressDatabase
+
+PROGRESS_COLUMNS = ("lessons_covered", "files_completed", "tests_taken")
+# NOTE: Percentages are summed incrementally in a different order than the recomputation, so allow for rounding
+PERCENTAGE_TOLERANCE = 1e-6
+
+
+def verify(progress_db: ProgressDatabase, db_session: Session) -> int:
+    """Print every summary that differs from its recomputation and return how many do."""
+    stored = progress_db.get_stored_progress(db_session)
+    computed = progress_db.get_computed_progress(db_session)
+
+    mismatches = 0
+    for user_syllabus_id, expected in computed.items():
+        actual = stored.get(user_syllabus_id)
+        if actual is None:
+            print(f"{user_syllabus_id}: missing")
+            mismatches += 1
+            continue
+
+        if any(actual[column] != expected[column] for column in PROGRESS_COLUMNS) or (
+            not math.isclose(
+                actual["percentage_total"],
+                expected["percentage_total"],
+                abs_tol=PERCENTAGE_TOLERANCE,
+            )
+        ):
+            print(
+                f"{user_syllabus_id}: stored {dict(actual)}, expected {dict(expected)}"
+            )
+            mismatches += 1
+
+    print(f"Verified {len(computed)} summaries, {mismatches} mismatched")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="compare the stored summaries with a recomputation without writing",
+    )
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    progress_db = ProgressDatabase()
+
+    with Session(engine) as db_session:
+        if args.verify:
+            raise SystemExit(1 if verify(progress_db, db_session) else 0)
+
+        rebuilt = progress_db.rebuild_progress(db_session)
+        print(f"Rebuilt {rebuilt} summaries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Serve the app in production with several worker processes forked from a parent that has already imported it.
+
+Usage:
+    python -m scripts.serve --workers 4 --host 0.0.0.0 --port 8000
+
+The parent imports the app and brings the schema up to date once, then binds the listening socket and forks the
+workers, which share it and are handed connections by the kernel. Workers start with the modules, routes and
+pydantic validators already built, shared copy-on-write with the parent, and each one runs the app's lifespan,
+which opens its pools and warms up their connections and the hot queries, before it accepts any connection.
+PASSWORD_HASH_WORKERS and PASSWORD_HASH_QUEUE_SIZE are split between the workers, so that their Argon2 process
+pools together don't run more hashes at once than the host has cores for.
+
+Signals to the parent:
+    SIGTERM, SIGINT  Stop: workers stop accepting connections, finish their in-flight requests for up to
+                     WORKER_SHUTDOWN_TIMEOUT seconds and dispose of their pools, then the parent exits.
+    SIGHUP           Reload: a new set of workers is started and the old ones are stopped the same way once the
+                     new ones are serving, so no connection is refused. The new workers are forked from the
+                     parent and run the code it imported, restart the parent to deploy new code.
+
+Workers that exit on their own are replaced. A worker whose lifespan fails to start stops the server, since its
+replacements would fail the same way.
+"""
+
+import os
+import argparse
+import asyncio
+import select
+import signal
+import socket
+import sys
+import traceback
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Set
+import uvicorn
+
+from app import app
+from services.password import password_hash_pool
+from config.database import create_db_and_tables, dispose_engines
+from config.environment import PORT, WORKER_SHUTDOWN_TIMEOUT, WORKERS
+
+HANDLED_SIGNALS = {signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD}
+
+# NOTE: Exit status of a worker whose lifespan failed to start, the one uvicorn.run exits with
+WORKER_STARTUP_FAILURE = 3
+WORKER_STARTUP_TIMEOUT = 60  # seconds
+# NOTE: Time the lifespan's shutdown gets after the in-flight requests, before a stopping worker is killed
+WORKER_DISPOSE_TIMEOUT = 5  # seconds
+LISTEN_BACKLOG = 2048
+
+
+class Arbiter:
+    """Parent process that forks the workers, replaces the ones that exit and stops or reloads them on signals."""
+
+    def __init__(self, sock: socket.socket, worker_count: int, log_level: str):
+        """Initialize the arbiter with no workers started."""
+        self.sock = sock
+        self.worker_count = worker_count
+        self.log_level = log_level
+        self.workers: Set[int] = set()
+        # NOTE: Workers that were asked to stop, with when they are killed if they haven't exited by then
+        self.stopping: Dict[int, float] = {}
+        # NOTE: Read ends of the pipes workers close or write to once they serve, open until they are read
+        self.ready_pipes: Dict[int, int] = {}
+
+    def log(self, message: str) -> None:
+        print(f"[serve {os.getpid()}] {message}", file=sys.stderr, flush=True)
+
+    def spawn(self) -> int:
+        """Fork a worker and return its process ID."""
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                os.close(ready_read)
+                for pipe in self.ready_pipes.values():
+                    os.close(pipe)
+                status = run_worker(self.sock, ready_write, self.log_level)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                # NOTE: The child must never return into the arbiter's loop, where it would supervise as a second parent
+                os._exit(status)
+
+        os.close(ready_write)
+        self.workers.add(pid)
+        self.ready_pipes[pid] = ready_read
+
+        return pid
+
+    def wait_ready(self, pids: Iterable[int]) -> bool:
+        """Wait for the workers to start serving and return whether they all did."""
+        pending = {self.ready_pipes[pid]: pid for pid in pids}
+        ready = True
+        deadline = monotonic() + WORKER_STARTUP_TIMEOUT
+        while pending:
+            readable, _, _ = select.select(
+                list(pending), [], [], max(deadline - monotonic(), 0)
+            )
+            if not readable:
+                self.log(f"Workers {sorted(pending.values())} did not start in time")
+                ready = False
+                break
+
+            for pipe in readable:
+                # NOTE: A worker that fails to start exits and closes the pipe without writing to it
+                if not os.read(pipe, 1):
+                    self.log(f"Worker {pending[pipe]} failed to start")
+                    ready = False
+                del pending[pipe]
+
+        for pid in pids:
+            os.close(self.ready_pipes.pop(pid))
+
+        return ready
+
+    def stop(self, pids: Iterable[int]) -> None:
+        """Ask the workers to finish their in-flight requests and exit."""
+        deadline = monotonic() + WORKER_SHUTDOWN_TIMEOUT + WORKER_DISPOSE_TIMEOUT
+        for pid in pids:
+            self.workers.discard(pid)
+            self.stopping[pid] = deadline
+            os.kill(pid, signal.SIGTERM)
+
+    def reap(self) -> bool:
+        """Collect exited workers and replace the ones that weren't asked to exit. Returns False if one failed to start."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+
+            if pid == 0:
+                break
+
+            if self.stopping.pop(pid, None) is not None or pid not in self.workers:
+                continue
+
+            self.workers.discard(pid)
+            if (
+                os.WIFEXITED(status)
+                and os.WEXITSTATUS(status) == WORKER_STARTUP_FAILURE
+            ):
+                self.log(f"Worker {pid} failed to start")
+
+                return False
+
+            self.log(f"Worker {pid} exited with status {status}, replacing it")
+            pid = self.spawn()
+            # NOTE: Only its exit is watched from here on, a failure to start is caught by its exit status
+            os.close(self.ready_pipes.pop(pid))
+
+        # NOTE: Workers still finishing their requests past the deadline are killed
+        for pid, deadline in self.stopping.items():
+            if monotonic() > deadline:
+                os.kill(pid, signal.SIGKILL)
+
+        return True
+
+    def reload(self) -> None:
+        """Replace every worker with a freshly forked one, stopping the old ones only once the new ones serve."""
+        old_pids = set(self.workers)
+        new_pids = [self.spawn() for _ in range(self.worker_count)]
+        if self.wait_ready(new_pids):
+            self.log(f"Reloaded, {len(new_pids)} workers serving")
+            self.stop(old_pids)
+        else:
+            self.log("Reload failed, keeping the running workers")
+            self.stop(new_pids)
+
+    def run(self) -> int:
+        """Start the workers and supervise them until the server is stopped, then return the exit status."""
+        # NOTE: Signals are blocked and taken from the queue one at a time, so that handling one is never
+        #       interrupted by the next. Workers unblock them before serving.
+        signal.pthread_sigmask(signal.SIG_BLOCK, HANDLED_SIGNALS)
+
+        pids = [self.spawn() for _ in range(self.worker_count)]
+        if not self.wait_ready(pids):
+            self.stop(list(self.workers))
+            self.shutdown()
+
+            return 1
+
+        self.log(f"{len(pids)} workers serving on {self.sock.getsockname()}")
+
+        status = 0
+        while True:
+            received = signal.sigtimedwait(HANDLED_SIGNALS, 1.0)
+            if received is None or received.si_signo == signal.SIGCHLD:
+                if not self.reap():
+                    status = 1
+                    break
+            elif received.si_signo == signal.SIGHUP:
+                self.log("Reloading")
+                self.reload()
+            else:
+                self.log("Stopping")
+                break
+
+        self.stop(list(self.workers))
+        self.shutdown()
+
+        return status
+
+    def shutdown(self) -> None:
+        """Wait for the stopping workers to exit, killing the ones that overrun their deadline."""
+        while self.stopping:
+            self.reap()
+            signal.sigtimedwait({signal.SIGCHLD}, 0.1)
+
+
+def run_worker(sock: socket.socket, ready_pipe: int, log_level: str) -> int:
+    """Serve the app on the shared socket in this forked worker and return its exit status."""
+    for handled_signal in HANDLED_SIGNALS:
+        signal.signal(handled_signal, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, HANDLED_SIGNALS)
+
+    # NOTE: The lifespan opens this worker's own pools, connections are never shared across a fork
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            lifespan="on",
+            log_level=log_level,
+            timeout_graceful_shutdown=WORKER_SHUTDOWN_TIMEOUT,
+        )
+    )
+
+    async def serve():
+        async def report_ready():
+            while not server.started and not server.should_exit:
+                await asyncio.sleep(0.05)
+            if server.started:
+                os.write(ready_pipe, b"1")
+
+        ready_task = asyncio.create_task(report_ready())
+        await server.serve(sockets=[sock])
+        ready_task.cancel()
+
+    asyncio.run(serve())
+
+    return 0 if server.started else WORKER_STARTUP_FAILURE
+
+
+def bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+
+    return sock
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    # NOTE: Done once here rather than racing in every worker's lifespan, which then finds the schema current
+    create_db_and_tables()
+    # NOTE: Pooled connections must not cross the fork, a socket shared by two processes corrupts both sessions
+    asyncio.run(dispose_engines())
+    # NOTE: Every worker hashes in its own process pool, which is only started on first use after the fork
+    password_hash_pool.share(args.workers)
+
+    with bind(args.host, args.port) as sock:
+        return Arbiter(sock, args.workers, args.log_level).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+from hmac import compare_digest
+from typing import Optional
+
+from schemas.admin import DBPoolStats
+from custom_types.exceptions import NotAuthenticatedError
+from config.database import DATABASE_REPLICA_URL, get_db_pool_stats
+from config.environment import METRICS_TOKEN
+
+from .admission import admission_limiters, get_threadpool_stats
+from .cache import (
+    authenticated_user_cache,
+    syllabus_analytics_cache,
+    test_analytics_cache,
+    verified_token_cache,
+)
+from .metrics import (
+    admission_active,
+    admission_limit,
+    admission_queue_size,
+    admission_waiting,
+    cache_entries,
+    cache_evictions_total,
+    cache_expirations_total,
+    cache_hits_total,
+    cache_misses_total,
+    db_pool_checkout_timeouts_total,
+    db_pool_checkout_wait_seconds_max,
+    db_pool_checkouts_total,
+    db_pool_connections,
+    db_pool_size,
+    metrics_registry,
+    password_hash_duration_seconds_max,
+    password_hash_pending,
+    password_hash_queue_size,
+    password_hash_workers,
+    threadpool_busy,
+    threadpool_size,
+    threadpool_waiting,
+)
+from .password import password_hash_pool
+
+
+class AdminService:
+    """Service for operational insight into the running instance."""
+
+    def get_db_pool_stats(self) -> DBPoolStats:
+        """Get the connection pool state and checkout wait times."""
+        return DBPoolStats(**get_db_pool_stats())
+
+    def verify_metrics_scraper(self, authorization: Optional[str]) -> None:
+        """Verify that a scrape sends the metrics token as a bearer token, when one is configured."""
+        if METRICS_TOKEN and not compare_digest(
+            authorization or "", f"Bearer {METRICS_TOKEN}"
+        ):
+            raise NotAuthenticatedError
+
+    def render_metrics(self) -> str:
+        """Sample the limiter and pool gauges and render every metric in the Prometheus text exposition format."""
+        # NOTE: The pools already keep these counts, so they are read once per scrape instead of on every checkout
+        pools = (
+            {"primary": False, "replica": True}
+            if DATABASE_REPLICA_URL
+            else {"primary": False}
+        )
+        for pool, replica in pools.items():
+            pool_stats = get_db_pool_stats(replica)
+            for state in ("checked_out", "idle", "overflow"):
+                db_pool_connections.labels(pool, state).set(pool_stats[state])
+            db_pool_size.labels(pool).set(pool_stats["size"])
+            db_pool_checkouts_total.labels(pool).set(pool_stats["checkout_count"])
+            db_pool_checkout_timeouts_total.labels(pool).set(
+                pool_stats["checkout_timeouts"]
+            )
+            db_pool_checkout_wait_seconds_max.labels(pool).set(
+                pool_stats["checkout_wait_seconds_max"]
+            )
+        password_hash_stats = password_hash_pool.stats()
+        password_hash_pending.labels().set(password_hash_stats["pending"])
+        password_hash_workers.labels().set(password_hash_stats["workers"])
+        password_hash_queue_size.labels().set(password_hash_stats["queue_size"])
+        password_hash_duration_seconds_max.labels().set(
+            password_hash_stats["latency_seconds_max"]
+        )
+
+        caches = {
+            "authenticated_user": authenticated_user_cache,
+            "verified_token": verified_token_cache,
+            "test_analytics": test_analytics_cache,
+            "syllabus_analytics": syllabus_analytics_cache,
+        }
+        for cache, ttl_cache in caches.items():
+            cache_stats = ttl_cache.stats()
+            cache_entries.labels(cache).set(cache_stats["size"])
+            cache_hits_total.labels(cache).set(cache_stats["hits"])
+            cache_misses_total.labels(cache).set(cache_stats["misses"])
+            cache_evictions_total.labels(cache).set(cache_stats["evictions"])
+            cache_expirations_total.labels(cache).set(cache_stats["expirations"])
+
+        threadpool_stats = get_threadpool_stats()
+        threadpool_size.labels().set(threadpool_stats["size"])
+        threadpool_busy.labels().set(threadpool_stats["busy"])
+        threadpool_waiting.labels().set(threadpool_stats["waiting"])
+        for (method, route), limiter in admission_limiters.items():
+            admission_active.labels(method, route).set(limiter.active)
+            admission_waiting.labels(method, route).set(limiter.waiting)
+            admission_limit.labels(method, route).set(limiter.limit)
+            admission_queue_size.labels(method, route).set(limiter.queue_size)
+
+        return metrics_registry.render()
@@ -0,0 +1,129 @@
+import asyncio
+from collections import deque
+from contextlib import suppress
+from typing import Deque, Dict, Tuple
+from anyio.to_thread import current_default_thread_limiter
+
+from custom_types.exceptions import ServiceOverloadedError
+from config.environment import (
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_RETRY_AFTER,
+    ADMISSION_ROUTE_LIMIT,
+    ADMISSION_ROUTE_LIMITS,
+    ADMISSION_ROUTE_QUEUE_SIZE,
+    THREADPOOL_SIZE,
+)
+
+from .metrics import admission_rejected_total
+
+
+class AdmissionLimiter:
+    """Concurrency limit for a route, with a bounded first-in first-out queue of requests waiting for a turn."""
+
+    def __init__(
+        self,
+        method: str,
+        route: str,
+        limit: int,
+        queue_size: int,
+        queue_timeout: float,
+        retry_after: int,
+    ):
+        """Initialize the limiter with no requests admitted or waiting."""
+        self.method = method
+        self.route = route
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def waiting(self) -> int:
+        """Requests waiting for a turn."""
+        return len(self._waiters)
+
+    def _shed(self, reason: str) -> ServiceOverloadedError:
+        admission_rejected_total.labels(self.method, self.route, reason).inc()
+
+        return ServiceOverloadedError(retry_after=self.retry_after)
+
+    async def acquire(self) -> None:
+        """Admit a request, waiting for a turn in the queue, or shed it when the queue is full or the wait is too long."""
+        # NOTE: Only called from the event loop thread, so the counts need no lock
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            raise self._shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except BaseException as e:
+            # NOTE: A turn handed over as the wait ended is passed on, so that it isn't lost
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                with suppress(ValueError):
+                    self._waiters.remove(waiter)
+
+            if isinstance(e, TimeoutError):
+                raise self._shed("queue_timeout") from None
+            raise
+
+    def release(self) -> None:
+        """End a request's turn, handing it straight to the longest waiting request if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+                return
+
+        self.active -= 1
+
+
+# NOTE: Created on a route's first request, since routes are rebuilt with each prefix they are included under
+admission_limiters: Dict[Tuple[str, str], AdmissionLimiter] = {}
+
+
+def get_admission_limiter(method: str, route: str) -> AdmissionLimiter:
+    """Get the limiter of a route, configured from its override or the default limits."""
+    limiter = admission_limiters.get((method, route))
+    if limiter is None:
+        limit, queue_size = ADMISSION_ROUTE_LIMITS.get(
+            (method, route), (ADMISSION_ROUTE_LIMIT, ADMISSION_ROUTE_QUEUE_SIZE)
+        )
+        limiter = admission_limiters[(method, route)] = AdmissionLimiter(
+            method=method,
+            route=route,
+            limit=limit,
+            queue_size=queue_size,
+            queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+            retry_after=ADMISSION_RETRY_AFTER,
+        )
+
+    return limiter
+
+
+def configure_threadpool() -> None:
+    """Size the threadpool that runs sync sessions and sync dependencies. Must be called from the event loop."""
+    current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+
+def get_threadpool_stats() -> Dict[str, float]:
+    """Get the size, busy threads and waiting calls of the threadpool. Must be called from the event loop."""
+    thread_limiter = current_default_thread_limiter()
+    statistics = thread_limiter.statistics()
+
+    return {
+        "size": thread_limiter.total_tokens,
+        "busy": statistics.borrowed_tokens,
+        "waiting": statistics.tasks_waiting,
+    }
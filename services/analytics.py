@@ -0,0 +1,73 @@
+from typing import List
+from uuid import UUID
+from sqlmodel import Session
+
+from database.analytics import AnalyticsDatabase
+from schemas.analytics import HistogramBin, StudentRank, TestAnalytics
+from custom_types.exceptions import SyllabusNotFoundError, TestNotFoundError
+
+from .cache import syllabus_analytics_cache, test_analytics_cache
+
+# NOTE: Number of equal-width score bins between 0 and a test's total marks
+HISTOGRAM_BINS = 10
+
+
+class AnalyticsService:
+    """Service for score analytics over tests and syllabuses."""
+
+    def __init__(self, db: AnalyticsDatabase):
+        """Initialize AnalyticsService with a database dependency."""
+        self.db = db
+
+    def get_test_analytics(self, db_session: Session, test_id: UUID) -> TestAnalytics:
+        """Get the score distribution of a test, computed by Postgres and cached until its results change."""
+        test_analytics = test_analytics_cache.get(test_id)
+        if test_analytics is not None:
+            return test_analytics
+
+        total_marks = self.db.get_test_total_marks(db_session, test_id)
+        if total_marks is None:
+            raise TestNotFoundError
+
+        summary = self.db.get_score_summary(db_session, test_id)
+
+        histogram: List[HistogramBin] = []
+        if total_marks > 0:
+            bin_counts = dict(
+                self.db.get_score_histogram(
+                    db_session, test_id, total_marks, HISTOGRAM_BINS
+                )
+            )
+            bin_width = total_marks / HISTOGRAM_BINS
+            histogram = [
+                HistogramBin(
+                    lower=index * bin_width,
+                    upper=(index + 1) * bin_width,
+                    count=bin_counts.get(index + 1, 0),
+                )
+                for index in range(HISTOGRAM_BINS)
+            ]
+
+        test_analytics = TestAnalytics(**summary, histogram=histogram)
+        test_analytics_cache.set(test_id, test_analytics)
+
+        return test_analytics
+
+    def get_syllabus_analytics(
+        self, db_session: Session, syllabus_id: UUID
+    ) -> List[StudentRank]:
+        """Get the cohort percentile rank of every student in a syllabus, cached until its results change."""
+        student_ranks = syllabus_analytics_cache.get(syllabus_id)
+        if student_ranks is not None:
+            return student_ranks
+
+        if not self.db.syllabus_exists(db_session, syllabus_id):
+            raise SyllabusNotFoundError
+
+        student_ranks = [
+            StudentRank(**row)
+            for row in self.db.get_student_ranks(db_session, syllabus_id)
+        ]
+        syllabus_analytics_cache.set(syllabus_id, student_ranks)
+
+        return student_ranks
@@ -1,13 +1,18 @@
 import jwt
+import logging
 from datetime import datetime, timedelta, timezone
-from uuid import UUID
+from hashlib import sha256
+from time import time
+from uuid import UUID, uuid4
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from models import User
 
 from database.user import UserDatabase
-from schemas.auth import TokenPayload, AuthRegisterRequest
+from schemas.auth import TokenPayload, AuthRegisterRequest, AuthenticatedPrincipal
 from custom_types.exceptions import (
+    AdminRequiredError,
     EmailAlreadyExistsError,
     InvalidCredentialsError,
     InvalidTokenError,
@@ -15,7 +20,8 @@ from custom_types.exceptions import (
     NotAuthenticatedError,
     UserNotFoundError,
 )
-from custom_types.enums import TokenType
+from custom_types.enums import AuthEvent, TokenType, UserType
+from config.database import release_session_connection, run_in_session
 from config.auth import (
     JWT_SECRET,
     JWT_ALGORITHM,
@@ -23,7 +29,12 @@ from config.auth import (
     COOKIE_MAX_AGE_REFRESH,
 )
 
+from .cache import authenticated_user_cache, verified_token_cache
+from .metrics import auth_events_total
 from .password import PasswordService
+from .revocation import token_denylist
+
+logger = logging.getLogger("app.auth")
 
 
 class AuthService:
@@ -35,17 +46,36 @@ class AuthService:
 
     def _verify_token(self, token: str) -> TokenPayload:
         """Verify and decode a JWT token."""
-        try:
-            payload = jwt.decode(
-                token,
-                JWT_SECRET,
-                algorithms=[JWT_ALGORITHM],
+        token_digest = sha256(token.encode()).digest()
+
+        token_payload = verified_token_cache.get(token_digest)
+        if token_payload is None:
+            try:
+                payload = jwt.decode(
+                    token,
+                    JWT_SECRET,
+                    algorithms=[JWT_ALGORITHM],
+                )
+                token_payload = TokenPayload(**payload)
+            except jwt.ExpiredSignatureError:
+                auth_events_total.labels(AuthEvent.TOKEN_EXPIRED.value).inc()
+                raise InvalidTokenError("Token has expired")
+            except jwt.InvalidTokenError:
+                auth_events_total.labels(AuthEvent.TOKEN_INVALID.value).inc()
+                raise InvalidTokenError("Invalid token")
+
+            verified_token_cache.set(
+                token_digest,
+                token_payload,
+                ttl=token_payload.exp.timestamp() - time(),
             )
-            return TokenPayload(**payload)
-        except jwt.ExpiredSignatureError:
-            raise InvalidTokenError("Token has expired")
-        except jwt.InvalidTokenError:
-            raise InvalidTokenError("Invalid token")
+
+        # NOTE: Checked on every call since a cached token can be revoked after it was first verified
+        if token_denylist.is_revoked(token_payload.jti, token_payload.sub):
+            auth_events_total.labels(AuthEvent.TOKEN_REVOKED.value).inc()
+            raise InvalidTokenError("Token has been revoked")
+
+        return token_payload
 
     def create_token(self, user: User, token_type: TokenType) -> str:
         """Create an access / refresh token for a user."""
@@ -60,6 +90,10 @@ class AuthService:
             type=user.type,
             exp=datetime.now(timezone.utc) + timedelta(seconds=expiration_time),
             token_type=token_type,
+            jti=uuid4().hex,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            iat=time(),
         )
         return jwt.encode(
             payload.model_dump(),
@@ -67,33 +101,88 @@ class AuthService:
             algorithm=JWT_ALGORITHM,
         )
 
-    def register(self, db_session: Session, user_data: AuthRegisterRequest) -> User:
+    def revoke_tokens(self, *tokens: str | None) -> None:
+        """Revoke the given tokens until they expire, ignoring missing or already invalid ones."""
+        for token in tokens:
+            if not token:
+                continue
+
+            try:
+                payload = self._verify_token(token)
+            except InvalidTokenError:
+                continue
+
+            if payload.jti:
+                token_denylist.revoke_token(payload.jti, payload.exp.timestamp())
+
+    async def register(
+        self, db_session: Session | AsyncSession, user_data: AuthRegisterRequest
+    ) -> User:
         """Register a new user."""
-        existing_user = self.db.get_user_by_email(db_session, user_data.email)
+        existing_user = await run_in_session(
+            db_session, self.db.get_user_by_email, user_data.email
+        )
         if existing_user:
             raise EmailAlreadyExistsError
 
-        hashed_password = PasswordService.hash_password(user_data.password)
+        # NOTE: The lookup began a transaction, which is ended so that no pooled connection is held while the
+        #       password pool queues and hashes. create_user begins a new one.
+        await release_session_connection(db_session)
+        hashed_password = await PasswordService.hash_password(user_data.password)
 
         try:
-            user = self.db.create_user(db_session, user_data, hashed_password)
-            db_session.refresh(user)
+            user = await run_in_session(
+                db_session, self.db.create_user, user_data, hashed_password
+            )
         except Exception as e:
             raise RegistrationError from e
 
         return user
 
-    def login(self, db_session: Session, email: str, password: str) -> User:
+    async def login(
+        self, db_session: Session | AsyncSession, email: str, password: str
+    ) -> User:
         """Authenticate a user."""
-        user = self.db.get_user_by_email(db_session, email)
+        user = await run_in_session(db_session, self.db.get_user_by_email, email)
         if not user:
+            auth_events_total.labels(AuthEvent.LOGIN_FAILURE.value).inc()
             raise InvalidCredentialsError("Invalid email or password")
 
-        if not PasswordService.verify_password(password, user.password):
+        # NOTE: The lookup began a transaction, which is ended so that no pooled connection is held while the
+        #       password pool queues and verifies. The user stays readable as a detached instance.
+        await release_session_connection(db_session)
+        is_valid, updated_hash = await PasswordService.verify_and_update_password(
+            password, user.password
+        )
+        if not is_valid:
+            auth_events_total.labels(AuthEvent.LOGIN_FAILURE.value).inc()
             raise InvalidCredentialsError("Invalid email or password")
 
+        # NOTE: Upgrading the hash is opportunistic, a failed write must not fail an otherwise valid login
+        if updated_hash:
+            try:
+                await run_in_session(
+                    db_session, self._update_password_hash, user.id, updated_hash
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to upgrade the password hash of user %s", user.id
+                )
+
+        auth_events_total.labels(AuthEvent.LOGIN_SUCCESS.value).inc()
+
         return user
 
+    def _update_password_hash(
+        self, db_session: Session, user_id: UUID, hashed_password: str
+    ) -> None:
+        """Update a user's password hash, rolling the session back if the write fails so it stays usable."""
+        try:
+            self.db.update_user_password(db_session, user_id, hashed_password)
+        except Exception:
+            db_session.rollback()
+            raise
+
     def verify_authentication(self, db_session: Session, token: str | None) -> User:
         """Verify authentication token and return the authenticated user or None if not authenticated."""
         if not token:
@@ -101,12 +190,56 @@ class AuthService:
 
         payload = self._verify_token(token)
 
+        user = authenticated_user_cache.get(payload.sub)
+        if user:
+            return user
+
         user = self.db.get_user_by_id(db_session, UUID(payload.sub))
         if not user:
             raise UserNotFoundError
 
+        # NOTE: Detach before caching so that another request never touches this request's session
+        db_session.expunge(user)
+        authenticated_user_cache.set(payload.sub, user)
+
         return user
 
+    def verify_principal(self, token: str | None) -> AuthenticatedPrincipal:
+        """Verify an access token and return the authenticated principal from its claims alone."""
+        if not token:
+            raise NotAuthenticatedError
+
+        payload = self._verify_token(token)
+
+        # Verify this is an access token (not a refresh token)
+        if payload.token_type != TokenType.ACCESS:
+            raise InvalidTokenError("Token is not an access token")
+
+        # NOTE: Tokens issued before claims-only verification are rejected, so the client refreshes them
+        if not payload.jti or payload.first_name is None or payload.last_name is None:
+            raise InvalidTokenError("Token is missing required claims")
+
+        # NOTE: Claims are trusted as-is here, so tokens issued before the user's claims changed are rejected.
+        #       Refresh tokens are exempt, since refreshing reloads the user and issues up-to-date claims.
+        if token_denylist.is_issued_before_revocation(payload.sub, payload.iat):
+            raise InvalidTokenError("Token claims are outdated")
+
+        # NOTE: The payload is already validated, so the principal skips re-validating the email
+        return AuthenticatedPrincipal.model_construct(
+            id=UUID(payload.sub),
+            email=payload.email,
+            first_name=payload.first_name,
+            last_name=payload.last_name,
+            type=payload.type,
+        )
+
+    def verify_admin(self, principal: AuthenticatedPrincipal) -> AuthenticatedPrincipal:
+        """Verify that the authenticated principal is an admin."""
+        if principal.type != UserType.ADMIN:
+            raise AdminRequiredError
+
+        return principal
+
     def refresh_token(self, db_session: Session, token: str | None) -> User:
         """Verify refresh token and return the authenticated user."""
         if not token:
@@ -122,4 +255,6 @@ class AuthService:
         if not user:
             raise UserNotFoundError
 
+        auth_events_total.labels(AuthEvent.REFRESH.value).inc()
+
         return user
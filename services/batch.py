@@ -0,0 +1,62 @@
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple
+from uuid import UUID
+
+from schemas.batch import BatchItemResult
+from custom_types.enums import BatchItemStatus
+
+# NOTE: Items are positioned by submission order, updates first and then deletes, which is also the order of the
+#       reported results
+
+
+def reject_repeated_ids(item_ids: Sequence[UUID]) -> Dict[int, str]:
+    """Reject every item after the first for the same ID, keyed by position, since their order would be ambiguous."""
+    seen: Set[UUID] = set()
+    rejected: Dict[int, str] = {}
+    for position, item_id in enumerate(item_ids):
+        if item_id in seen:
+            rejected[position] = "ID appears more than once in the batch"
+        seen.add(item_id)
+
+    return rejected
+
+
+def group_changes(
+    items: Iterable[Tuple[UUID, Dict[str, Any]]],
+) -> Dict[Tuple[Tuple[str, Any], ...], List[UUID]]:
+    """Group update items by their changes, so that the items making the same changes share one UPDATE."""
+    groups: Dict[Tuple[Tuple[str, Any], ...], List[UUID]] = {}
+    for item_id, changes in items:
+        groups.setdefault(tuple(sorted(changes.items())), []).append(item_id)
+
+    return groups
+
+
+def report_batch(
+    update_ids: Sequence[UUID],
+    delete_ids: Sequence[UUID],
+    rejected: Dict[int, str],
+    updated: Set[UUID],
+    deleted: Set[UUID],
+) -> List[BatchItemResult]:
+    """Report the outcome of every batch item in submission order."""
+    items = [(item_id, updated, BatchItemStatus.UPDATED) for item_id in update_ids]
+    items += [(item_id, deleted, BatchItemStatus.DELETED) for item_id in delete_ids]
+
+    results: List[BatchItemResult] = []
+    for position, (item_id, applied, applied_status) in enumerate(items):
+        if position in rejected:
+            results.append(
+                BatchItemResult(
+                    id=item_id,
+                    status=BatchItemStatus.REJECTED,
+                    detail=rejected[position],
+                )
+            )
+        elif item_id in applied:
+            results.append(BatchItemResult(id=item_id, status=applied_status))
+        else:
+            results.append(
+                BatchItemResult(id=item_id, status=BatchItemStatus.NOT_FOUND)
+            )
+
+    return results
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from models import User
+from schemas.auth import TokenPayload
+from schemas.analytics import StudentRank, TestAnalytics
+from config.auth import (
+    AUTH_USER_CACHE_MAX_SIZE,
+    AUTH_USER_CACHE_TTL,
+    COOKIE_MAX_AGE_REFRESH,
+    JWT_VERIFY_CACHE_MAX_SIZE,
+)
+from config.environment import ANALYTICS_CACHE_MAX_SIZE, ANALYTICS_CACHE_TTL
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe bounded LRU cache whose entries expire after a time-to-live."""
+
+    def __init__(self, max_size: int, ttl: float):
+        """Initialize the cache with a maximum size and default time-to-live in seconds."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        """Get a value by key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries beyond the maximum size."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Remove a single entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the current size and hit/miss/eviction/expiration counters."""
+        with self._lock:
+            stats = {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+        return stats
+
+
+# NOTE: The cache is per process, so with multiple workers a write on one worker is only seen by the others after the TTL.
+#       Cached users are detached from their session so they can be shared safely across requests.
+authenticated_user_cache: TTLCache[str, User] = TTLCache(
+    max_size=AUTH_USER_CACHE_MAX_SIZE,
+    ttl=AUTH_USER_CACHE_TTL,
+)
+
+# NOTE: Keyed by a SHA-256 digest of the raw token, each entry is stored with the TTL left until the token's exp
+verified_token_cache: TTLCache[bytes, TokenPayload] = TTLCache(
+    max_size=JWT_VERIFY_CACHE_MAX_SIZE,
+    ttl=COOKIE_MAX_AGE_REFRESH,
+)
+
+# NOTE: Keyed by test ID and syllabus ID respectively, both are invalidated for every test that results are imported for
+test_analytics_cache: TTLCache[UUID, TestAnalytics] = TTLCache(
+    max_size=ANALYTICS_CACHE_MAX_SIZE,
+    ttl=ANALYTICS_CACHE_TTL,
+)
+syllabus_analytics_cache: TTLCache[UUID, List[StudentRank]] = TTLCache(
+    max_size=ANALYTICS_CACHE_MAX_SIZE,
+    ttl=ANALYTICS_CACHE_TTL,
+)
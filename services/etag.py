@@ -0,0 +1,26 @@
+from hashlib import sha256
+from typing import Any, Optional
+
+# NOTE: ETags are derived from updated_at, which TimestampedModel bumps on every ORM and Core UPDATE, so a version
+#       query can answer a conditional GET without loading or serializing the resource
+
+
+def make_etag(*parts: Any) -> str:
+    """Make a strong ETag from the parts that identify a version of a representation."""
+    digest = sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check whether an If-None-Match header matches an ETag, using the weak comparison it calls for."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
@@ -0,0 +1,386 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Generic, Iterator, List, Sequence, Tuple, TypeVar
+
+# NOTE: Every series guards its own value with its own lock, so recording only ever contends with recordings to
+#       the same series, and a scrape never blocks recording for longer than it takes to copy one series
+
+# NOTE: Metrics are kept in process memory, so each worker process exposes its own
+
+# NOTE: Upper bounds in seconds, from a cached token check to an Argon2 hash queued behind others
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+S = TypeVar("S")
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str]) -> str:
+    if not label_names:
+        return ""
+
+    pairs = (
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in zip(label_names, label_values)
+    )
+
+    return "{" + ",".join(pairs) + "}"
+
+
+class CounterSeries:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class GaugeSeries:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class HistogramSeries:
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # NOTE: Per-bucket counts with a final +Inf bucket, made cumulative when rendered
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.bucket_counts), self.sum, self.count
+
+
+class Metric(Generic[S]):
+    """A named metric with a series per combination of label values."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], S] = {}
+        self._lock = Lock()
+
+    def _create_series(self) -> S:
+        raise NotImplementedError
+
+    def labels(self, *label_values: str) -> S:
+        """Get the series for the label values, creating it on first use. Callers on hot paths keep the result."""
+        series = self._series.get(label_values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(label_values, self._create_series())
+
+        return series
+
+    def _render_series(self, label_values: Tuple[str, ...], series: S) -> Iterator[str]:
+        labels = _format_labels(self.label_names, label_values)
+        yield f"{self.name}{labels} {series.value}"  # type: ignore[attr-defined]
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        # NOTE: Copied so that series created while rendering don't change the dict being iterated
+        for label_values, series in list(self._series.items()):
+            yield from self._render_series(label_values, series)
+
+
+class Counter(Metric[CounterSeries]):
+    type_name = "counter"
+
+    def _create_series(self) -> CounterSeries:
+        return CounterSeries()
+
+
+class Gauge(Metric[GaugeSeries]):
+    type_name = "gauge"
+
+    def _create_series(self) -> GaugeSeries:
+        return GaugeSeries()
+
+
+class SampledCounter(Metric[GaugeSeries]):
+    """A counter whose total is kept by the object it counts for, and copied in when the metrics are rendered."""
+
+    type_name = "counter"
+
+    def _create_series(self) -> GaugeSeries:
+        return GaugeSeries()
+
+
+class Histogram(Metric[HistogramSeries]):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+
+    def _create_series(self) -> HistogramSeries:
+        return HistogramSeries(self.buckets)
+
+    def _render_series(
+        self, label_values: Tuple[str, ...], series: HistogramSeries
+    ) -> Iterator[str]:
+        bucket_counts, total, count = series.snapshot()
+        label_names = self.label_names + ("le",)
+
+        cumulative = 0
+        for upper_bound, bucket_count in zip(
+            [str(bound) for bound in self.buckets] + ["+Inf"], bucket_counts
+        ):
+            cumulative += bucket_count
+            labels = _format_labels(label_names, label_values + (upper_bound,))
+            yield f"{self.name}_bucket{labels} {cumulative}"
+
+        labels = _format_labels(self.label_names, label_values)
+        yield f"{self.name}_sum{labels} {total}"
+        yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """The metrics of this process, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric[S]) -> Metric[S]:
+        self._metrics.append(metric)
+
+        return metric
+
+    def render(self) -> str:
+        lines = [line for metric in self._metrics for line in metric.render()]
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+# Request metrics, labelled by the route's templated path
+http_requests_total = metrics_registry.register(
+    Counter(
+        "http_requests_total",
+        "Requests handled, by route and status code.",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration_seconds = metrics_registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time to handle a request, by route.",
+        ("method", "route"),
+    )
+)
+http_requests_in_flight = metrics_registry.register(
+    Gauge(
+        "http_requests_in_flight",
+        "Requests being handled, by route.",
+        ("method", "route"),
+    )
+)
+
+# Admission control metrics
+admission_rejected_total = metrics_registry.register(
+    Counter(
+        "admission_rejected_total",
+        "Requests shed by admission control, by route and reason.",
+        ("method", "route", "reason"),
+    )
+)
+
+# Authentication metrics
+auth_events_total = metrics_registry.register(
+    Counter(
+        "auth_events_total",
+        "Authentication outcomes, by event.",
+        ("event",),
+    )
+)
+
+# Password hashing metrics
+password_hash_duration_seconds = metrics_registry.register(
+    Histogram(
+        "password_hash_duration_seconds",
+        "Time to hash or verify a password in the process pool, including the wait for a worker.",
+    )
+)
+password_hash_rejected_total = metrics_registry.register(
+    Counter(
+        "password_hash_rejected_total",
+        "Password hashes rejected because the process pool queue was full.",
+    )
+)
+
+# Gauges and counters sampled from the limiters and pools when the metrics are rendered
+admission_active = metrics_registry.register(
+    Gauge(
+        "admission_active",
+        "Requests admitted and being handled, by route.",
+        ("method", "route"),
+    )
+)
+admission_waiting = metrics_registry.register(
+    Gauge(
+        "admission_waiting",
+        "Requests queued for admission, by route.",
+        ("method", "route"),
+    )
+)
+admission_limit = metrics_registry.register(
+    Gauge(
+        "admission_limit",
+        "Requests a route handles at once.",
+        ("method", "route"),
+    )
+)
+admission_queue_size = metrics_registry.register(
+    Gauge(
+        "admission_queue_size",
+        "Requests a route holds waiting for admission.",
+        ("method", "route"),
+    )
+)
+threadpool_size = metrics_registry.register(
+    Gauge("threadpool_size", "Threads that run sync sessions and dependencies.")
+)
+threadpool_busy = metrics_registry.register(
+    Gauge("threadpool_busy", "Threads running a call.")
+)
+threadpool_waiting = metrics_registry.register(
+    Gauge("threadpool_waiting", "Calls waiting for a thread.")
+)
+password_hash_pending = metrics_registry.register(
+    Gauge(
+        "password_hash_pending",
+        "Password hashes queued or running in the process pool.",
+    )
+)
+password_hash_workers = metrics_registry.register(
+    Gauge("password_hash_workers", "Processes in the password hash pool.")
+)
+password_hash_queue_size = metrics_registry.register(
+    Gauge(
+        "password_hash_queue_size",
+        "Password hashes the process pool holds, queued or running, before it rejects more.",
+    )
+)
+password_hash_duration_seconds_max = metrics_registry.register(
+    Gauge(
+        "password_hash_duration_seconds_max",
+        "Longest time to hash or verify a password since startup.",
+    )
+)
+cache_entries = metrics_registry.register(
+    Gauge("cache_entries", "Entries held by an in-process cache.", ("cache",))
+)
+cache_hits_total = metrics_registry.register(
+    SampledCounter(
+        "cache_hits_total", "Lookups answered by an in-process cache.", ("cache",)
+    )
+)
+cache_misses_total = metrics_registry.register(
+    SampledCounter(
+        "cache_misses_total",
+        "Lookups an in-process cache had no live entry for.",
+        ("cache",),
+    )
+)
+cache_evictions_total = metrics_registry.register(
+    SampledCounter(
+        "cache_evictions_total",
+        "Entries evicted from an in-process cache to stay within its size.",
+        ("cache",),
+    )
+)
+cache_expirations_total = metrics_registry.register(
+    SampledCounter(
+        "cache_expirations_total",
+        "Entries an in-process cache dropped on lookup because they had expired.",
+        ("cache",),
+    )
+)
+db_pool_connections = metrics_registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Connections in a pool serving requests, by pool and state.",
+        ("pool", "state"),
+    )
+)
+db_pool_size = metrics_registry.register(
+    Gauge("db_pool_size", "Connections a pool keeps open.", ("pool",))
+)
+db_pool_checkouts_total = metrics_registry.register(
+    SampledCounter(
+        "db_pool_checkouts_total",
+        "Connections checked out of a pool since startup.",
+        ("pool",),
+    )
+)
+db_pool_checkout_timeouts_total = metrics_registry.register(
+    SampledCounter(
+        "db_pool_checkout_timeouts_total",
+        "Checkouts that timed out waiting for a connection since startup.",
+        ("pool",),
+    )
+)
+db_pool_checkout_wait_seconds_max = metrics_registry.register(
+    Gauge(
+        "db_pool_checkout_wait_seconds_max",
+        "Longest wait for a connection checkout since startup.",
+        ("pool",),
+    )
+)
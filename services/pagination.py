@@ -0,0 +1,33 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, List
+
+from custom_types.exceptions import InvalidCursorError
+
+# NOTE: Cursors are opaque to clients but not signed, they only carry the sort key of the last row of a page
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List[str]:
+    """Decode a cursor back into its sort key values."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(urlsafe_b64decode(cursor + padding))
+    except ValueError as e:
+        raise InvalidCursorError from e
+
+    # NOTE: Cursors are decoded from client input, so every value is checked to be one of the strings encoded above
+    if (
+        not isinstance(values, list)
+        or len(values) != length
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise InvalidCursorError
+
+    return values
@@ -1,13 +1,142 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 
-pwd_context = PasswordHash.recommended()
+from custom_types.exceptions import ServiceOverloadedError
+from config.auth import (
+    PASSWORD_ARGON2_TIME_COST,
+    PASSWORD_ARGON2_MEMORY_COST,
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_QUEUE_SIZE,
+    PASSWORD_HASH_RETRY_AFTER,
+)
+
+from .metrics import password_hash_duration_seconds, password_hash_rejected_total
+
+T = TypeVar("T")
+
+pwd_context = PasswordHash(
+    (
+        Argon2Hasher(
+            time_cost=PASSWORD_ARGON2_TIME_COST,
+            memory_cost=PASSWORD_ARGON2_MEMORY_COST,
+            parallelism=PASSWORD_ARGON2_PARALLELISM,
+        ),
+    )
+)
+
+
+# NOTE: Module-level functions so that they can be pickled into the worker processes
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update_password(
+    password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHashPool:
+    """Dedicated process pool for password hashing with a bounded queue."""
+
+    def __init__(self, workers: int, queue_size: int, retry_after: int):
+        """Initialize the pool; worker processes are only started on first use."""
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the process pool, starting it if needed."""
+        if self._executor is None:
+            # NOTE: "spawn" avoids forking a process that already runs the event loop and threadpool
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=get_context("spawn")
+            )
+
+        return self._executor
+
+    async def run(self, operation: Callable[..., T], *args: Any) -> T:
+        """Run an operation in the pool, rejecting it immediately when the queue is full."""
+        # NOTE: Only called from the event loop thread, so the counters need no lock
+        if self.pending >= self.queue_size:
+            self.rejected += 1
+            password_hash_rejected_total.labels().inc()
+            raise ServiceOverloadedError(
+                "Too many concurrent sign-ins, please retry shortly",
+                retry_after=self.retry_after,
+            )
+
+        self.pending += 1
+        started_at = perf_counter()
+        try:
+            result = await asyncio.wrap_future(
+                self._get_executor().submit(operation, *args)
+            )
+        finally:
+            self.pending -= 1
+
+        latency = perf_counter() - started_at
+        password_hash_duration_seconds.labels().observe(latency)
+        self.completed += 1
+        self.latency_seconds_total += latency
+        self.latency_seconds_max = max(self.latency_seconds_max, latency)
+
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Get the queue depth and latency metrics."""
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "latency_seconds_avg": (
+                self.latency_seconds_total / self.completed if self.completed else 0.0
+            ),
+            "latency_seconds_max": self.latency_seconds_max,
+        }
+
+    def share(self, processes: int) -> None:
+        """Split the workers and queue between this many server processes, before any of them starts the pool."""
+        self.workers = max(1, self.workers // processes)
+        self.queue_size = max(1, self.queue_size // processes)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    workers=PASSWORD_HASH_WORKERS,
+    queue_size=PASSWORD_HASH_QUEUE_SIZE,
+    retry_after=PASSWORD_HASH_RETRY_AFTER,
+)
 
 
 class PasswordService:
     @staticmethod
-    def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+    async def hash_password(password: str) -> str:
+        return await password_hash_pool.run(_hash_password, password)
 
     @staticmethod
-    def verify_password(password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(password, hashed_password)
+    async def verify_and_update_password(
+        password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await password_hash_pool.run(
+            _verify_and_update_password, password, hashed_password
+        )
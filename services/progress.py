@@ -0,0 +1,40 @@
+from uuid import UUID
+from sqlmodel import Session
+
+from database.progress import ProgressDatabase
+from schemas.syllabus import SyllabusProgress
+from custom_types.exceptions import ProgressNotFoundError
+
+
+class ProgressService:
+    """Service for student progress summaries."""
+
+    def __init__(self, db: ProgressDatabase):
+        """Initialize ProgressService with a database dependency."""
+        self.db = db
+
+    def get_progress(
+        self, db_session: Session, user_id: UUID, syllabus_id: UUID
+    ) -> SyllabusProgress:
+        """Get a user's progress summary in a syllabus they are enrolled in."""
+        progress = self.db.get_progress_by_user_and_syllabus(
+            db_session, user_id, syllabus_id
+        )
+        if not progress:
+            # NOTE: Enrolments from before summaries were maintained are summarized on their first read
+            progress = self.db.create_progress_by_user_and_syllabus(
+                db_session, user_id, syllabus_id
+            )
+        if not progress:
+            raise ProgressNotFoundError
+
+        return SyllabusProgress(
+            lessons_covered=progress.lessons_covered,
+            files_completed=progress.files_completed,
+            tests_taken=progress.tests_taken,
+            average_percentage=(
+                progress.percentage_total / progress.tests_taken
+                if progress.tests_taken
+                else None
+            ),
+        )
@@ -0,0 +1,305 @@
+import csv
+import codecs
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.result import ResultDatabase
+from schemas.result import ResultImportRowError
+from custom_types.exceptions import DatabaseError, InvalidCSVError
+from config.database import run_in_session
+
+from .cache import syllabus_analytics_cache, test_analytics_cache
+
+RESULT_CSV_COLUMNS = ("test_id", "user_syllabus_id", "score")
+
+# NOTE: Rows validated and inserted per round trip to the database
+IMPORT_BATCH_SIZE = 5000
+
+
+# NOTE: Every test ID repeats once per student in an upload, so parsed IDs are memoized
+@lru_cache(maxsize=IMPORT_BATCH_SIZE)
+def _parse_uuid(value: str) -> UUID:
+    return UUID(value.strip())
+
+
+async def _iter_csv_lines(csv_chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a stream of UTF-8 chunks into lines without buffering the whole upload."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+
+    try:
+        async for chunk in csv_chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise InvalidCSVError("CSV upload must be UTF-8 encoded")
+
+    if pending:
+        yield pending
+
+
+class ResultService:
+    """Service for result-related business logic."""
+
+    def __init__(self, db: ResultDatabase):
+        """Initialize ResultService with a database dependency."""
+        self.db = db
+
+    async def import_results(
+        self, db_session: Session | AsyncSession, csv_chunks: AsyncIterator[bytes]
+    ) -> Tuple[int, List[ResultImportRowError]]:
+        """Import results from a streamed CSV upload in a single transaction, reporting the rejected rows."""
+        lines = _iter_csv_lines(csv_chunks)
+
+        header = next(csv.reader([await anext(lines, "")]), [])
+        columns = [column.strip() for column in header]
+        if sorted(columns) != sorted(RESULT_CSV_COLUMNS):
+            raise InvalidCSVError(
+                f"CSV header must be exactly: {','.join(RESULT_CSV_COLUMNS)}"
+            )
+        column_indexes = {column: columns.index(column) for column in columns}
+
+        # NOTE: Shared across batches so that each test and user syllabus is only looked up once per upload
+        tests: Dict[UUID, Optional[Tuple[UUID, int]]] = {}
+        user_syllabuses: Dict[UUID, Optional[UUID]] = {}
+
+        # NOTE: The (test ID, user syllabus ID) pairs that already have a result, loaded along with each user
+        #       syllabus, and the line of every result imported so far, to reject a second result for a test
+        result_keys: Set[Tuple[UUID, UUID]] = set()
+        result_lines: Dict[Tuple[UUID, UUID], int] = {}
+        # NOTE: Summed over the whole upload and applied once, since every batch can touch every student
+        progress_deltas: Dict[UUID, Dict[str, Any]] = {}
+        errors: List[ResultImportRowError] = []
+        imported = 0
+
+        # NOTE: Only the database steps are reported as a DatabaseError, errors reading the upload propagate as-is
+        batch: List[Tuple[int, str]] = []
+        line_number = 1
+        async for line in lines:
+            line_number += 1
+            if line.strip():
+                batch.append((line_number, line))
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                imported += await self._run_import_operation(
+                    db_session,
+                    self._import_results_batch,
+                    batch,
+                    column_indexes,
+                    tests,
+                    user_syllabuses,
+                    result_keys,
+                    result_lines,
+                    progress_deltas,
+                    errors,
+                )
+                batch = []
+
+        if batch:
+            imported += await self._run_import_operation(
+                db_session,
+                self._import_results_batch,
+                batch,
+                column_indexes,
+                tests,
+                user_syllabuses,
+                result_keys,
+                result_lines,
+                progress_deltas,
+                errors,
+            )
+
+        await self._run_import_operation(
+            db_session, self.db.commit_results, list(progress_deltas.values())
+        )
+
+        for test_id, test in tests.items():
+            if test is not None:
+                test_analytics_cache.invalidate(test_id)
+                syllabus_analytics_cache.invalidate(test[0])
+
+        # NOTE: Errors are found in two passes per batch, so restore upload order
+        errors.sort(key=lambda error: error.line)
+
+        return imported, errors
+
+    async def _run_import_operation(
+        self,
+        db_session: Session | AsyncSession,
+        operation: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        """Run a database step of an import, reporting any failure as a DatabaseError."""
+        try:
+            return await run_in_session(db_session, operation, *args)
+        except Exception as e:
+            raise DatabaseError("Failed to import results") from e
+
+    def _import_results_batch(
+        self,
+        db_session: Session,
+        batch: List[Tuple[int, str]],
+        column_indexes: Dict[str, int],
+        tests: Dict[UUID, Optional[Tuple[UUID, int]]],
+        user_syllabuses: Dict[UUID, Optional[UUID]],
+        result_keys: Set[Tuple[UUID, UUID]],
+        result_lines: Dict[Tuple[UUID, UUID], int],
+        progress_deltas: Dict[UUID, Dict[str, Any]],
+        errors: List[ResultImportRowError],
+    ) -> int:
+        """Validate a batch of CSV lines and insert the valid ones, appending an error for each rejected line."""
+        parsed_rows: List[Tuple[int, UUID, UUID, int]] = []
+        for line_number, line in batch:
+            row = next(csv.reader([line]))
+            if len(row) != len(column_indexes):
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number,
+                        detail=f"Expected {len(column_indexes)} columns, got {len(row)}",
+                    )
+                )
+                continue
+
+            try:
+                test_id = _parse_uuid(row[column_indexes["test_id"]])
+            except ValueError:
+                errors.append(
+                    ResultImportRowError(line=line_number, detail="Invalid test_id")
+                )
+                continue
+
+            try:
+                user_syllabus_id = _parse_uuid(row[column_indexes["user_syllabus_id"]])
+            except ValueError:
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number, detail="Invalid user_syllabus_id"
+                    )
+                )
+                continue
+
+            try:
+                score = int(row[column_indexes["score"]])
+            except ValueError:
+                errors.append(
+                    ResultImportRowError(line=line_number, detail="Invalid score")
+                )
+                continue
+
+            # NOTE: Mirrors ck_result_score_positive, so one bad row can't abort the whole transaction
+            if score < 0:
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number, detail="Score must not be negative"
+                    )
+                )
+                continue
+
+            parsed_rows.append((line_number, test_id, user_syllabus_id, score))
+
+        unknown_test_ids = {row[1] for row in parsed_rows} - tests.keys()
+        if unknown_test_ids:
+            found_tests = self.db.get_tests_by_ids(db_session, unknown_test_ids)
+            for test_id in unknown_test_ids:
+                tests[test_id] = found_tests.get(test_id)
+
+        unknown_user_syllabus_ids = {
+            row[2] for row in parsed_rows
+        } - user_syllabuses.keys()
+        if unknown_user_syllabus_ids:
+            found_user_syllabuses = self.db.get_user_syllabuses_by_ids(
+                db_session, unknown_user_syllabus_ids
+            )
+            for user_syllabus_id in unknown_user_syllabus_ids:
+                user_syllabuses[user_syllabus_id] = found_user_syllabuses.get(
+                    user_syllabus_id
+                )
+            result_keys.update(
+                self.db.get_result_keys_by_user_syllabus_ids(
+                    db_session, found_user_syllabuses.keys()
+                )
+            )
+
+        results: List[Tuple[UUID, int, UUID, UUID]] = []
+        for line_number, test_id, user_syllabus_id, score in parsed_rows:
+            test = tests[test_id]
+            if test is None:
+                errors.append(
+                    ResultImportRowError(line=line_number, detail="Test not found")
+                )
+                continue
+
+            syllabus_id = user_syllabuses[user_syllabus_id]
+            if syllabus_id is None:
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number, detail="User syllabus not found"
+                    )
+                )
+                continue
+
+            test_syllabus_id, total_marks = test
+            if syllabus_id != test_syllabus_id:
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number,
+                        detail="Test and user syllabus belong to different syllabuses",
+                    )
+                )
+                continue
+
+            if score > total_marks:
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number,
+                        detail=f"Score exceeds the test's total marks of {total_marks}",
+                    )
+                )
+                continue
+
+            # NOTE: Mirrors uq_result_test_id_user_syllabus_id, so a re-imported row can't abort the whole transaction
+            result_key = (test_id, user_syllabus_id)
+            if result_key in result_keys:
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number,
+                        detail="Result already exists for this test and user syllabus",
+                    )
+                )
+                continue
+
+            if result_key in result_lines:
+                errors.append(
+                    ResultImportRowError(
+                        line=line_number,
+                        detail=f"Duplicates the result on line {result_lines[result_key]}",
+                    )
+                )
+                continue
+
+            result_lines[result_key] = line_number
+            results.append((uuid4(), score, test_id, user_syllabus_id))
+
+            progress_delta = progress_deltas.setdefault(
+                user_syllabus_id,
+                {
+                    "user_syllabus_id": user_syllabus_id,
+                    "tests_taken": 0,
+                    "percentage_total": 0.0,
+                },
+            )
+            progress_delta["tests_taken"] += 1
+            progress_delta["percentage_total"] += (
+                score * 100 / total_marks if total_marks else 0.0
+            )
+
+        if results:
+            self.db.create_results(db_session, results)
+
+        return len(results)
@@ -0,0 +1,75 @@
+from heapq import heappop, heappush
+from threading import Lock
+from time import time
+from typing import Dict, List, Optional, Tuple
+
+
+class TokenDenylist:
+    """In-memory denylist of revoked token IDs and subjects, each kept only until the token would have expired."""
+
+    def __init__(self):
+        """Initialize an empty denylist."""
+        self._revoked: Dict[str, float] = {}
+        self._issued_before: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = Lock()
+
+    def _revoke(self, key: str, expires_at: float) -> None:
+        """Deny a key until the given UNIX timestamp and drop entries that are already expired."""
+        with self._lock:
+            now = time()
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expired_at, expired_key = heappop(self._expiry_heap)
+                if self._revoked.get(expired_key) == expired_at:
+                    del self._revoked[expired_key]
+                    self._issued_before.pop(expired_key, None)
+
+            if expires_at <= max(now, self._revoked.get(key, 0)):
+                return
+
+            self._revoked[key] = expires_at
+            heappush(self._expiry_heap, (expires_at, key))
+
+    def revoke_token(self, jti: str, expires_at: float) -> None:
+        """Revoke a single token by its jti claim until it expires."""
+        self._revoke(f"jti:{jti}", expires_at)
+
+    def revoke_subject(self, sub: str, expires_at: float) -> None:
+        """Revoke every token issued to a subject until the given UNIX timestamp."""
+        self._revoke(f"sub:{sub}", expires_at)
+
+    def revoke_issued_before(
+        self, sub: str, issued_before: float, expires_at: float
+    ) -> None:
+        """Revoke the tokens issued to a subject before a UNIX timestamp until another, leaving later ones valid."""
+        key = f"iat:{sub}"
+        with self._lock:
+            self._issued_before[key] = max(
+                issued_before, self._issued_before.get(key, 0)
+            )
+        self._revoke(key, expires_at)
+
+    def is_revoked(self, jti: Optional[str], sub: str) -> bool:
+        """Check whether a token is revoked, either by its jti or by its subject."""
+        # NOTE: Lock-free read, dict lookups are atomic and a stale entry is rejected by its expiry
+        now = time()
+        if jti and self._revoked.get(f"jti:{jti}", 0) > now:
+            return True
+
+        return self._revoked.get(f"sub:{sub}", 0) > now
+
+    def is_issued_before_revocation(self, sub: str, issued_at: Optional[float]) -> bool:
+        """Check whether a token was issued before its subject's latest cutoff, counting tokens without iat as older."""
+        key = f"iat:{sub}"
+        if self._revoked.get(key, 0) <= time():
+            return False
+
+        return issued_at is None or issued_at < self._issued_before.get(key, 0)
+
+    def __len__(self) -> int:
+        """Get the number of denylist entries, including expired ones that are not yet pruned."""
+        return len(self._revoked)
+
+
+# NOTE: The denylist is per process, so with multiple workers a revocation is only enforced by the worker that handled it.
+token_denylist = TokenDenylist()
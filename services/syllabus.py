@@ -1,18 +1,62 @@
-from typing import List
+import json
+import re
+from datetime import date, datetime
+from html import escape
+from typing import Any, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
 from sqlmodel import Session
 
-from models import Syllabus
+from models import Syllabus, Test
 
-from schemas.syllabus import SyllabusCreateRequest, SyllabusUpdateRequest
-from database.syllabus import SyllabusDatabase
+from schemas.syllabus import (
+    LessonDetail,
+    SyllabusBatchUpdate,
+    SyllabusCreateRequest,
+    SyllabusSearchResult,
+    SyllabusUpdateRequest,
+)
+from schemas.batch import BatchItemResult
+from database.syllabus import (
+    SEARCH_HIGHLIGHT_START,
+    SEARCH_HIGHLIGHT_STOP,
+    SyllabusDatabase,
+)
 from custom_types.exceptions import (
     SyllabusNotFoundError,
     DatabaseError,
+    InvalidCursorError,
 )
+from custom_types.enums import SyllabusInclude
+from config.database import unit_of_work
+
+from .batch import group_changes, reject_repeated_ids, report_batch
+from .cache import syllabus_analytics_cache, test_analytics_cache
+from .etag import etag_matches, make_etag
+from .pagination import decode_cursor, encode_cursor
+
+# NOTE: Writes are grouped with unit_of_work and flushed with RETURNING, so objects come back with their server
+#       defaults without a refresh() after the commit
+
+
+# NOTE: Letters and digits only, so that search terms can be joined into a tsquery without escaping its syntax
+SEARCH_TERM_PATTERN = re.compile(r"[^\W_]+")
+
 
-# NOTE: In order to get back the latest data after CREATE and UPDATE operations, we need to refresh the session after the operation.
-#       Reference: https://sqlmodel.tiangolo.com/tutorial/automatic-id-none-refresh/#refresh-objects-explicitly
+def _to_json_value(value: Any) -> Any:
+    """Convert column values that the json module can't serialize."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+
+    return str(value)
+
+
+def _highlight_html(text: str) -> str:
+    """Escape highlighted text for HTML, then wrap its matched words in <mark> tags."""
+    return (
+        escape(text)
+        .replace(SEARCH_HIGHLIGHT_START, "<mark>")
+        .replace(SEARCH_HIGHLIGHT_STOP, "</mark>")
+    )
 
 
 class SyllabusService:
@@ -27,9 +71,9 @@ class SyllabusService:
     ) -> Syllabus:
         """Create a new syllabus and add it to the user's syllabus list."""
         try:
-            syllabus = self.db.create_syllabus(db_session, syllabus_data)
-            self.db.create_user_syllabus(db_session, user_id, syllabus.id)
-            db_session.refresh(syllabus)
+            with unit_of_work(db_session):
+                syllabus = self.db.create_syllabus(db_session, syllabus_data)
+                self.db.create_user_syllabus(db_session, user_id, syllabus.id)
         except Exception as e:
             raise DatabaseError("Failed to create syllabus") from e
 
@@ -43,16 +87,170 @@ class SyllabusService:
 
         return syllabus
 
-    def get_all_syllabuses_by_user_id(
-        self, db_session: Session, user_id: UUID
-    ) -> List[Syllabus]:
-        """Get all syllabuses for a user, sorted by the latest created first."""
+    def get_modified_syllabus_by_id(
+        self, db_session: Session, syllabus_id: UUID, if_none_match: Optional[str]
+    ) -> Tuple[Optional[Syllabus], str]:
+        """Get a syllabus and its ETag, or only the ETag when it matches If-None-Match."""
+        # NOTE: Conditional requests are answered from the version alone, so a match skips loading the row
+        if if_none_match:
+            updated_at = self.db.get_syllabus_updated_at(db_session, syllabus_id)
+            if updated_at is not None:
+                etag = make_etag(syllabus_id, updated_at)
+                if etag_matches(if_none_match, etag):
+                    return None, etag
+
+        syllabus = self.get_syllabus_by_id(db_session, syllabus_id)
+
+        return syllabus, make_etag(syllabus.id, syllabus.updated_at)
+
+    def get_syllabus_detail_by_id(
+        self, db_session: Session, syllabus_id: UUID, include: Set[SyllabusInclude]
+    ) -> Tuple[Syllabus, Optional[List[LessonDetail]], Optional[List[Test]]]:
+        """Get a syllabus with its requested lessons, files and tests in a fixed number of queries."""
+        include_files = SyllabusInclude.FILES in include
+        include_lessons = include_files or SyllabusInclude.LESSONS in include
+        include_tests = SyllabusInclude.TESTS in include
+
+        syllabus = self.db.get_syllabus_detail_by_id(
+            db_session, syllabus_id, include_lessons, include_files, include_tests
+        )
+        if not syllabus:
+            raise SyllabusNotFoundError
+
+        # NOTE: Only eager loaded relationships may be touched here, anything else would lazy load per row
+        lessons = None
+        if include_lessons:
+            lessons = [
+                LessonDetail(
+                    lesson=lesson,
+                    files=(
+                        sorted(lesson.files, key=lambda file: file.created_at)
+                        if include_files
+                        else None
+                    ),
+                )
+                for lesson in sorted(
+                    syllabus.lessons, key=lambda lesson: lesson.conducted_at
+                )
+            ]
+
+        tests = None
+        if include_tests:
+            tests = sorted(syllabus.tests, key=lambda test: test.conducted_at)
+
+        return syllabus, lessons, tests
+
+    def get_modified_syllabuses_page_by_user_id(
+        self,
+        db_session: Session,
+        user_id: UUID,
+        limit: int,
+        cursor: Optional[str],
+        if_none_match: Optional[str],
+    ) -> Tuple[Optional[List[Syllabus]], Optional[str], str]:
+        """Get a page of a user's syllabuses, the cursor of the next page and the page's ETag, or only the ETag when it matches If-None-Match."""
+        # NOTE: Any change to the user's syllabuses bumps their latest updated_at or their count, which invalidates
+        #       every page at once. Unlike a single resource, the version is also needed for a full response's ETag.
+        latest_updated_at, count = self.db.get_syllabuses_version_by_user_id(
+            db_session, user_id
+        )
+        etag = make_etag(user_id, latest_updated_at, count, limit, cursor)
+        if etag_matches(if_none_match, etag):
+            return None, None, etag
+
+        syllabuses, next_cursor = self.get_syllabuses_page_by_user_id(
+            db_session, user_id, limit, cursor
+        )
+
+        return syllabuses, next_cursor, etag
+
+    def get_syllabuses_page_by_user_id(
+        self,
+        db_session: Session,
+        user_id: UUID,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Syllabus], Optional[str]]:
+        """Get a page of syllabuses for a user, sorted by the latest created first, and the cursor of the next page."""
+        after = None
+        if cursor:
+            created_at, syllabus_id = decode_cursor(cursor, 2)
+            try:
+                after = (datetime.fromisoformat(created_at), UUID(syllabus_id))
+            except ValueError as e:
+                raise InvalidCursorError from e
+
+        # NOTE: One extra row tells whether there is a next page without a separate count query
         try:
-            syllabuses = self.db.get_all_syllabuses_by_user_id(db_session, user_id)
+            syllabuses = self.db.get_syllabuses_page_by_user_id(
+                db_session, user_id, limit + 1, after
+            )
         except Exception as e:
             raise DatabaseError("Failed to get syllabuses") from e
 
-        return syllabuses
+        next_cursor = None
+        if len(syllabuses) > limit:
+            syllabuses = syllabuses[:limit]
+            next_cursor = encode_cursor(syllabuses[-1].created_at, syllabuses[-1].id)
+
+        return syllabuses, next_cursor
+
+    def search_syllabus_content(
+        self,
+        db_session: Session,
+        user_id: UUID,
+        query: str,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[SyllabusSearchResult], Optional[str]]:
+        """Search a user's syllabuses and their lessons, files and tests, best matches first, and get the cursor of the next page."""
+        terms = SEARCH_TERM_PATTERN.findall(query)
+        if not terms:
+            return [], None
+
+        # NOTE: Every term must match, the last one as a prefix so that results show up while it is being typed
+        tsquery_text = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+        after = None
+        if cursor:
+            rank, result_id = decode_cursor(cursor, 2)
+            try:
+                after = (float(rank), UUID(result_id))
+            except ValueError as e:
+                raise InvalidCursorError from e
+
+        # NOTE: One extra row tells whether there is a next page without a separate count query
+        try:
+            rows = self.db.search_syllabus_content(
+                db_session, user_id, tsquery_text, query, limit + 1, after
+            )
+        except Exception as e:
+            raise DatabaseError("Failed to search syllabuses") from e
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+
+        results = [
+            SyllabusSearchResult(
+                type=row["type"],
+                id=row["id"],
+                syllabus_id=row["syllabus_id"],
+                title=_highlight_html(row["title"]),
+                snippet=_highlight_html(row["snippet"]) if row["snippet"] else None,
+            )
+            for row in rows
+        ]
+
+        return results, next_cursor
+
+    def export_syllabus(self, db_session: Session, syllabus_id: UUID) -> Iterator[str]:
+        """Export a syllabus and everything under it as NDJSON lines, one record per line."""
+        for record_type, row in self.db.stream_syllabus_tree(db_session, syllabus_id):
+            yield json.dumps(
+                {"type": record_type, "data": dict(row)}, default=_to_json_value
+            ) + "\n"
 
     def update_syllabus(
         self,
@@ -66,24 +264,74 @@ class SyllabusService:
             raise SyllabusNotFoundError
 
         try:
-            updated_syllabus = self.db.update_syllabus(
-                db_session, syllabus, syllabus_data
-            )
-            db_session.refresh(updated_syllabus)
+            with unit_of_work(db_session):
+                updated_syllabus = self.db.update_syllabus(
+                    db_session, syllabus, syllabus_data
+                )
         except Exception as e:
             raise DatabaseError("Failed to update syllabus") from e
 
         return updated_syllabus
 
+    def apply_syllabus_batch(
+        self,
+        db_session: Session,
+        updates: List[SyllabusBatchUpdate],
+        deletes: List[UUID],
+    ) -> List[BatchItemResult]:
+        """Apply a batch of syllabus updates and deletions in one transaction, reporting the outcome of each item."""
+        update_ids = [update.id for update in updates]
+        rejected = reject_repeated_ids(update_ids + deletes)
+        update_groups = group_changes(
+            (update.id, update.model_dump(exclude_unset=True, exclude={"id"}))
+            for position, update in enumerate(updates)
+            if position not in rejected
+        )
+        delete_ids = [
+            syllabus_id
+            for position, syllabus_id in enumerate(deletes, len(updates))
+            if position not in rejected
+        ]
+
+        updated_ids: Set[UUID] = set()
+        deleted_ids: Set[UUID] = set()
+        deleted_test_ids: Set[UUID] = set()
+        try:
+            with unit_of_work(db_session):
+                for changes, syllabus_ids in update_groups.items():
+                    updated_ids |= self.db.update_syllabuses(
+                        db_session, syllabus_ids, dict(changes)
+                    )
+                if delete_ids:
+                    deleted_ids, deleted_test_ids = self.db.delete_syllabuses(
+                        db_session, delete_ids
+                    )
+        except Exception as e:
+            raise DatabaseError("Failed to apply syllabus batch") from e
+
+        for syllabus_id in deleted_ids:
+            syllabus_analytics_cache.invalidate(syllabus_id)
+        for test_id in deleted_test_ids:
+            test_analytics_cache.invalidate(test_id)
+
+        return report_batch(update_ids, deletes, rejected, updated_ids, deleted_ids)
+
     def delete_syllabus(self, db_session: Session, syllabus_id: UUID) -> bool:
         """Delete a syllabus."""
         syllabus = self.db.get_syllabus_by_id(db_session, syllabus_id)
         if not syllabus:
             raise SyllabusNotFoundError
 
+        # NOTE: Collected before the delete cascades to the tests and their results
+        test_ids = [test.id for test in syllabus.tests]
+
         try:
             self.db.delete_syllabus(db_session, syllabus)
         except Exception as e:
             raise DatabaseError("Failed to delete syllabus") from e
 
+        syllabus_analytics_cache.invalidate(syllabus_id)
+        for test_id in test_ids:
+            test_analytics_cache.invalidate(test_id)
+
         return True
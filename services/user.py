@@ -1,15 +1,33 @@
+from time import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import UUID
 from sqlmodel import Session
 
 from models import User
 
-from schemas.user import UserUpdateRequest
+from schemas.user import UserBatchUpdate, UserUpdateRequest
+from schemas.batch import BatchItemResult
 from database.user import UserDatabase
 from custom_types.exceptions import (
     UserNotFoundError,
     EmailAlreadyExistsError,
     DatabaseError,
 )
+from custom_types.enums import UserType
+from config.auth import COOKIE_MAX_AGE_ACCESS
+from config.database import unit_of_work
+
+from .batch import group_changes, reject_repeated_ids, report_batch
+from .cache import (
+    authenticated_user_cache,
+    syllabus_analytics_cache,
+    test_analytics_cache,
+)
+from .etag import etag_matches, make_etag
+from .revocation import token_denylist
+
+# NOTE: The user fields that access tokens carry as claims, in the order _get_token_claims returns them
+TOKEN_CLAIM_FIELDS = ("email", "type", "first_name", "last_name")
 
 
 class UserService:
@@ -27,6 +45,22 @@ class UserService:
 
         return user
 
+    def get_modified_user_by_id(
+        self, db_session: Session, user_id: UUID, if_none_match: Optional[str]
+    ) -> Tuple[Optional[User], str]:
+        """Get a user and their ETag, or only the ETag when it matches If-None-Match."""
+        # NOTE: Conditional requests are answered from the version alone, so a match skips loading the row
+        if if_none_match:
+            updated_at = self.db.get_user_updated_at(db_session, user_id)
+            if updated_at is not None:
+                etag = make_etag(user_id, updated_at)
+                if etag_matches(if_none_match, etag):
+                    return None, etag
+
+        user = self.get_user_by_id(db_session, user_id)
+
+        return user, make_etag(user.id, user.updated_at)
+
     def update_user(
         self, db_session: Session, user_id: UUID, user_data: UserUpdateRequest
     ) -> User:
@@ -40,23 +74,133 @@ class UserService:
             if existing_user:
                 raise EmailAlreadyExistsError
 
+        claims = self._get_token_claims(user)
+
         try:
-            updated_user = self.db.update_user(db_session, user, user_data)
-            db_session.refresh(updated_user)
+            with unit_of_work(db_session):
+                updated_user = self.db.update_user(db_session, user, user_data)
         except Exception as e:
             raise DatabaseError("Failed to update user") from e
 
+        authenticated_user_cache.invalidate(str(user_id))
+
+        # NOTE: Claims-only verification would keep trusting the old role or email until the access token expires,
+        #       so tokens issued before the change are revoked while the ones issued after it stay valid
+        if self._get_token_claims(updated_user) != claims:
+            now = time()
+            token_denylist.revoke_issued_before(
+                str(user_id), now, now + COOKIE_MAX_AGE_ACCESS
+            )
+
         return updated_user
 
+    def _get_token_claims(self, user: User) -> Tuple[str, UserType, str, str]:
+        """Get the user fields that access tokens carry as claims."""
+        return user.email, user.type, user.first_name, user.last_name
+
+    def apply_user_batch(
+        self,
+        db_session: Session,
+        updates: List[UserBatchUpdate],
+        deletes: List[UUID],
+    ) -> List[BatchItemResult]:
+        """Apply a batch of user updates and deletions in one transaction, reporting the outcome of each item."""
+        update_ids = [update.id for update in updates]
+        rejected = reject_repeated_ids(update_ids + deletes)
+        claims = self.db.get_token_claims_by_ids(db_session, set(update_ids))
+        requested_emails = {update.email for update in updates if update.email}
+        email_owners = (
+            self.db.get_user_ids_by_emails(db_session, requested_emails)
+            if requested_emails
+            else {}
+        )
+
+        update_items: List[Tuple[UUID, Dict[str, Any]]] = []
+        for position, update in enumerate(updates):
+            if position in rejected or update.id not in claims:
+                continue
+
+            # NOTE: The first item asking for a free email claims it, so a later item asking for it is rejected
+            #       just like one asking for an email that is already taken
+            if update.email:
+                email_owner = email_owners.setdefault(update.email, update.id)
+                if email_owner != update.id:
+                    rejected[position] = "Email already in use"
+                    continue
+
+            update_items.append(
+                (update.id, update.model_dump(exclude_unset=True, exclude={"id"}))
+            )
+
+        delete_ids = [
+            user_id
+            for position, user_id in enumerate(deletes, len(updates))
+            if position not in rejected
+        ]
+
+        updated_ids: Set[UUID] = set()
+        deleted_ids: Set[UUID] = set()
+        test_ids: Set[UUID] = set()
+        syllabus_ids: Set[UUID] = set()
+        try:
+            with unit_of_work(db_session):
+                for changes, user_ids in group_changes(update_items).items():
+                    updated_ids |= self.db.update_users(
+                        db_session, user_ids, dict(changes)
+                    )
+                if delete_ids:
+                    deleted_ids, test_ids, syllabus_ids = self.db.delete_users(
+                        db_session, delete_ids
+                    )
+        except Exception as e:
+            raise DatabaseError("Failed to apply user batch") from e
+
+        # NOTE: Mirrors update_user and delete_user for every user the batch changed
+        now = time()
+        for user_id, changes in update_items:
+            if user_id not in updated_ids:
+                continue
+
+            authenticated_user_cache.invalidate(str(user_id))
+            new_claims = (
+                changes.get(field, value)
+                for field, value in zip(TOKEN_CLAIM_FIELDS, claims[user_id])
+            )
+            if tuple(new_claims) != claims[user_id]:
+                token_denylist.revoke_issued_before(
+                    str(user_id), now, now + COOKIE_MAX_AGE_ACCESS
+                )
+
+        for user_id in deleted_ids:
+            authenticated_user_cache.invalidate(str(user_id))
+            token_denylist.revoke_subject(str(user_id), now + COOKIE_MAX_AGE_ACCESS)
+        for test_id in test_ids:
+            test_analytics_cache.invalidate(test_id)
+        for syllabus_id in syllabus_ids:
+            syllabus_analytics_cache.invalidate(syllabus_id)
+
+        return report_batch(update_ids, deletes, rejected, updated_ids, deleted_ids)
+
     def delete_user(self, db_session: Session, user_id: UUID) -> bool:
         """Delete a user."""
         user = self.db.get_user_by_id(db_session, user_id)
         if not user:
             raise UserNotFoundError
 
+        # NOTE: Looked up before the delete cascades to the user's results
+        result_tests = self.db.get_result_tests_by_user_id(db_session, user_id)
+
         try:
             self.db.delete_user(db_session, user)
         except Exception as e:
             raise DatabaseError("Failed to delete user") from e
 
+        for test_id, syllabus_id in result_tests.items():
+            test_analytics_cache.invalidate(test_id)
+            syllabus_analytics_cache.invalidate(syllabus_id)
+
+        # NOTE: Claims-only verification never reloads the user, so outstanding access tokens must be revoked
+        authenticated_user_cache.invalidate(str(user_id))
+        token_denylist.revoke_subject(str(user_id), time() + COOKIE_MAX_AGE_ACCESS)
+
         return True
@@ -0,0 +1,51 @@
+from uuid import UUID
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.user import UserDatabase
+from database.syllabus import SyllabusDatabase
+from database.progress import ProgressDatabase
+from config.database import (
+    async_engine,
+    async_read_engine,
+    engine,
+    read_engine,
+    run_in_session,
+)
+
+# NOTE: Matches no row, so warming up reads nothing and writes nothing
+WARMUP_ID = UUID(int=0)
+WARMUP_PAGE_LIMIT = 51
+
+
+def _run_hot_queries(db_session: Session) -> None:
+    user_db = UserDatabase()
+    user_db.get_user_by_id(db_session, WARMUP_ID)
+    user_db.get_user_updated_at(db_session, WARMUP_ID)
+
+    syllabus_db = SyllabusDatabase()
+    syllabus_db.get_syllabus_by_id(db_session, WARMUP_ID)
+    syllabus_db.get_syllabus_updated_at(db_session, WARMUP_ID)
+    syllabus_db.get_syllabus_detail_by_id(db_session, WARMUP_ID, True, True, True)
+    syllabus_db.get_syllabuses_version_by_user_id(db_session, WARMUP_ID)
+    syllabus_db.get_syllabuses_page_by_user_id(db_session, WARMUP_ID, WARMUP_PAGE_LIMIT)
+
+    ProgressDatabase().get_progress_by_user_and_syllabus(
+        db_session, WARMUP_ID, WARMUP_ID
+    )
+
+
+async def warm_up_queries() -> None:
+    """Run the hot routes' queries on every engine serving requests, so their SQL is compiled before the first request."""
+    # NOTE: SQLAlchemy caches compiled statements per engine and keys them by structure, not by parameter values
+    if async_engine is not None:
+        for warmed_async_engine in {async_engine, async_read_engine}:
+            assert warmed_async_engine is not None
+            async with AsyncSession(warmed_async_engine) as async_db_session:
+                await run_in_session(async_db_session, _run_hot_queries)
+
+        return
+
+    for warmed_engine in {engine, read_engine}:
+        with Session(warmed_engine) as db_session:
+            await run_in_session(db_session, _run_hot_queries)
@@ -0,0 +1,138 @@
+"""Fixtures for tests that run against the Postgres database configured by DATABASE_URL."""
+
+import pytest
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Iterator, List
+from uuid import UUID, uuid4
+from sqlalchemy import event
+from sqlmodel import Session
+
+from models import User, Syllabus, Lesson, File, Test
+from custom_types.enums import FileType, SubjectCode, SyllabusLevel, UserType
+from config.database import create_db_and_tables, engine
+
+# NOTE: Loads every module the app does, so mapper listeners such as the progress summaries are registered just
+#       like they are when serving requests
+import app  # noqa: F401
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the tables and indexes once for the whole test session."""
+    create_db_and_tables()
+
+
+@pytest.fixture
+def db_session() -> Iterator[Session]:
+    """A session configured like the ones requests get, closed after the test."""
+    with Session(engine, expire_on_commit=False) as db_session:
+        yield db_session
+
+
+@pytest.fixture
+def count_statements() -> Callable[[], Iterator[List[str]]]:
+    """Get a context manager collecting every statement sent to the database while it is open."""
+
+    @contextmanager
+    def counter() -> Iterator[List[str]]:
+        statements: List[str] = []
+
+        def before_cursor_execute(connection, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+
+@pytest.fixture
+def create_syllabus() -> Iterator[Callable[[int, int, int], UUID]]:
+    """Get a factory for syllabuses with the given numbers of lessons, files per lesson and tests, deleted after the test."""
+    syllabus_ids: List[UUID] = []
+
+    def factory(lesson_count: int, files_per_lesson: int, test_count: int) -> UUID:
+        with Session(engine) as db_session:
+            syllabus = Syllabus(
+                name="Syllabus",
+                description="Description",
+                code=SubjectCode.EDEXCEL_IGCSE_CS,
+                level=SyllabusLevel.IGCSE,
+                examination_date=date.today() + timedelta(days=365),
+            )
+            for lesson_index in range(lesson_count):
+                lesson = Lesson(
+                    title=f"Lesson {lesson_index}",
+                    description="Description",
+                    conducted_at=date.today() - timedelta(days=lesson_index),
+                    syllabus=syllabus,
+                )
+                for file_index in range(files_per_lesson):
+                    File(
+                        title=f"File {file_index}",
+                        description="Description",
+                        filename=f"file-{file_index}.pdf",
+                        gdrive_url="https://drive.google.com/file",
+                        type=FileType.NOTE,
+                        lesson=lesson,
+                    )
+            for test_index in range(test_count):
+                Test(
+                    title=f"Test {test_index}",
+                    description="Description",
+                    total_marks=100,
+                    duration=60,
+                    conducted_at=date.today() - timedelta(days=test_index),
+                    syllabus=syllabus,
+                )
+
+            db_session.add(syllabus)
+            db_session.commit()
+            syllabus_ids.append(syllabus.id)
+
+            return syllabus.id
+
+    yield factory
+
+    # NOTE: Tests may have deleted some of them already
+    with Session(engine) as db_session:
+        for syllabus_id in syllabus_ids:
+            syllabus = db_session.get(Syllabus, syllabus_id)
+            if syllabus:
+                db_session.delete(syllabus)
+        db_session.commit()
+
+
+@pytest.fixture
+def create_user() -> Iterator[Callable[[], User]]:
+    """Get a factory for students with unique emails, deleted after the test."""
+    user_ids: List[UUID] = []
+
+    def factory() -> User:
+        with Session(engine, expire_on_commit=False) as db_session:
+            user = User(
+                first_name="First",
+                last_name="Last",
+                email=f"{uuid4()}@example.com",
+                password="hash",
+                type=UserType.STUDENT,
+            )
+            db_session.add(user)
+            db_session.commit()
+            user_ids.append(user.id)
+
+            return user
+
+    yield factory
+
+    # NOTE: Tests may have deleted some of them already
+    with Session(engine) as db_session:
+        for user_id in user_ids:
+            user = db_session.get(User, user_id)
+            if user:
+                db_session.delete(user)
+        db_session.commit()
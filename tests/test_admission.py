@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+
+from custom_types.exceptions import ServiceOverloadedError
+from services.admission import AdmissionLimiter
+
+
+def make_limiter(limit: int, queue_size: int, queue_timeout: float = 1.0):
+    return AdmissionLimiter(
+        method="GET",
+        route="/test",
+        limit=limit,
+        queue_size=queue_size,
+        queue_timeout=queue_timeout,
+        retry_after=1,
+    )
+
+
+def test_limiter_admits_waiters_in_order_and_sheds_when_queue_is_full():
+    async def scenario():
+        limiter = make_limiter(limit=1, queue_size=2)
+        admitted = []
+
+        async def request(name: str):
+            await limiter.acquire()
+            admitted.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        await limiter.acquire()
+        waiters = [asyncio.create_task(request(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        assert limiter.waiting == 2
+
+        with pytest.raises(ServiceOverloadedError) as shed:
+            await limiter.acquire()
+        assert shed.value.status_code == 503
+        assert shed.value.headers == {"Retry-After": "1"}
+
+        limiter.release()
+        await asyncio.gather(*waiters)
+
+        assert admitted == ["first", "second"]
+        assert limiter.active == 0 and limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_limiter_sheds_requests_that_wait_too_long():
+    async def scenario():
+        limiter = make_limiter(limit=1, queue_size=1, queue_timeout=0.01)
+
+        await limiter.acquire()
+        with pytest.raises(ServiceOverloadedError):
+            await limiter.acquire()
+
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
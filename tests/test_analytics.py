@@ -0,0 +1,63 @@
+import asyncio
+from typing import AsyncIterator
+from sqlmodel import Session
+
+from models import Syllabus, UserSyllabus
+from database.analytics import AnalyticsDatabase
+from database.result import ResultDatabase
+from database.user import UserDatabase
+from services.analytics import AnalyticsService
+from services.result import ResultService
+from services.user import UserService
+from config.database import engine
+
+
+def _import_result(db_session: Session, test_id, user_syllabus_id, score: int):
+    async def chunks() -> AsyncIterator[bytes]:
+        yield f"test_id,user_syllabus_id,score\n{test_id},{user_syllabus_id},{score}\n".encode()
+
+    imported, errors = asyncio.run(
+        ResultService(ResultDatabase()).import_results(db_session, chunks())
+    )
+    assert imported == 1 and errors == []
+
+
+def test_writes_invalidate_the_cached_analytics(
+    db_session, create_syllabus, create_user
+):
+    syllabus_id = create_syllabus(1, 0, 1)
+    first, second = create_user(), create_user()
+    first_enrolment = UserSyllabus(user_id=first.id, syllabus_id=syllabus_id)
+    second_enrolment = UserSyllabus(user_id=second.id, syllabus_id=syllabus_id)
+    db_session.add_all([first_enrolment, second_enrolment])
+    db_session.commit()
+    test_id = db_session.get(Syllabus, syllabus_id).tests[0].id
+    analytics_service = AnalyticsService(AnalyticsDatabase())
+
+    _import_result(db_session, test_id, first_enrolment.id, 40)
+    analytics = analytics_service.get_test_analytics(db_session, test_id)
+    ranks = analytics_service.get_syllabus_analytics(db_session, syllabus_id)
+    assert (analytics.count, analytics.mean) == (1, 40)
+    assert [rank.user_id for rank in ranks] == [first.id]
+
+    # NOTE: Cached until a write, reads in between are answered without the database
+    assert analytics_service.get_test_analytics(db_session, test_id) is analytics
+
+    _import_result(db_session, test_id, second_enrolment.id, 80)
+    analytics = analytics_service.get_test_analytics(db_session, test_id)
+    ranks = analytics_service.get_syllabus_analytics(db_session, syllabus_id)
+    assert (analytics.count, analytics.mean) == (2, 60)
+    assert {rank.user_id for rank in ranks} == {first.id, second.id}
+
+    # NOTE: Deleting a student cascades to their results
+    with Session(engine) as write_session:
+        UserService(UserDatabase()).delete_user(write_session, second.id)
+
+    analytics = analytics_service.get_test_analytics(db_session, test_id)
+    ranks = analytics_service.get_syllabus_analytics(db_session, syllabus_id)
+    assert (analytics.count, analytics.mean) == (1, 40)
+    assert [rank.user_id for rank in ranks] == [first.id]
+
+    # NOTE: Cascades to the imported result before the fixtures' teardown deletes the student
+    db_session.delete(first_enrolment)
+    db_session.commit()
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from time import time
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from models import User
+
+from database.user import UserDatabase
+from services.auth import AuthService
+from services.cache import authenticated_user_cache, verified_token_cache
+from services.password import pwd_context
+from services.revocation import token_denylist
+from services.user import UserService
+from schemas.user import UserUpdateRequest
+from custom_types.enums import TokenType
+from custom_types.exceptions import InvalidTokenError
+
+
+def test_logout_revokes_tokens_that_were_already_verified(db_session, create_user):
+    user = create_user()
+    auth_service = AuthService(UserDatabase())
+    access_token = auth_service.create_token(user, TokenType.ACCESS)
+    refresh_token = auth_service.create_token(user, TokenType.REFRESH)
+    other_session_token = auth_service.create_token(user, TokenType.ACCESS)
+
+    assert auth_service.verify_principal(access_token).id == user.id
+
+    auth_service.revoke_tokens(access_token, refresh_token)
+
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        auth_service.verify_principal(access_token)
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        auth_service.refresh_token(db_session, refresh_token)
+    # NOTE: Only the tokens of the session that logged out are revoked
+    assert auth_service.verify_principal(other_session_token).id == user.id
+
+
+def test_tokens_issued_before_a_claims_change_are_rejected(db_session, create_user):
+    user = create_user()
+    auth_service = AuthService(UserDatabase())
+    user_service = UserService(UserDatabase())
+    old_token = auth_service.create_token(user, TokenType.ACCESS)
+    assert auth_service.verify_principal(old_token).first_name == "First"
+
+    # NOTE: Updates that leave the claims as they are keep the issued tokens valid
+    user_service.update_user(db_session, user.id, UserUpdateRequest())
+    assert auth_service.verify_principal(old_token).id == user.id
+
+    updated_user = user_service.update_user(
+        db_session, user.id, UserUpdateRequest(first_name="Renamed")
+    )
+
+    with pytest.raises(InvalidTokenError, match="outdated"):
+        auth_service.verify_principal(old_token)
+
+    new_token = auth_service.create_token(updated_user, TokenType.ACCESS)
+    assert auth_service.verify_principal(new_token).first_name == "Renamed"
+
+
+def test_updates_and_deletes_evict_the_cached_user(db_session, create_user):
+    user = create_user()
+    auth_service = AuthService(UserDatabase())
+    user_service = UserService(UserDatabase())
+    token = auth_service.create_token(user, TokenType.ACCESS)
+    assert auth_service.verify_authentication(db_session, token).first_name == "First"
+    assert authenticated_user_cache.get(str(user.id)) is not None
+
+    updated_user = user_service.update_user(
+        db_session, user.id, UserUpdateRequest(first_name="Renamed")
+    )
+    # NOTE: Cached by subject, so a stale entry would answer the new token with the old name
+    token = auth_service.create_token(updated_user, TokenType.ACCESS)
+    assert auth_service.verify_authentication(db_session, token).first_name == "Renamed"
+
+    user_service.delete_user(db_session, user.id)
+
+    assert authenticated_user_cache.get(str(user.id)) is None
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        auth_service.verify_authentication(db_session, token)
+
+
+def test_repeat_verifications_are_served_from_the_cache_until_revoked(create_user):
+    user = create_user()
+    auth_service = AuthService(UserDatabase())
+    token = auth_service.create_token(user, TokenType.ACCESS)
+
+    auth_service.verify_principal(token)
+    hits = verified_token_cache.hits
+    assert auth_service.verify_principal(token).id == user.id
+    assert verified_token_cache.hits == hits + 1
+
+    # NOTE: Keyed by the whole token, so a forged signature never matches the cached entry
+    header, claims, signature = token.split(".")
+    forged_token = f"{header}.{claims}.{signature[::-1]}"
+    with pytest.raises(InvalidTokenError, match="Invalid token"):
+        auth_service.verify_principal(forged_token)
+
+    token_denylist.revoke_subject(str(user.id), time() + 60)
+    with pytest.raises(InvalidTokenError, match="revoked"):
+        auth_service.verify_principal(token)
+
+
+def test_login_rehashes_passwords_hashed_with_another_profile(db_session, create_user):
+    user = create_user()
+    auth_service = AuthService(UserDatabase())
+    cheap_context = PasswordHash(
+        (Argon2Hasher(time_cost=1, memory_cost=8, parallelism=1),)
+    )
+    cheap_hash = cheap_context.hash("password")
+    user.password = cheap_hash
+    db_session.add(user)
+    db_session.commit()
+
+    asyncio.run(auth_service.login(db_session, user.email, "password"))
+
+    db_session.expire_all()
+    rehashed = db_session.get(User, user.id).password
+    assert rehashed != cheap_hash
+    assert pwd_context.verify_and_update("password", rehashed) == (True, None)
+
+    # NOTE: A hash that already matches the current profile is left as it is
+    asyncio.run(auth_service.login(db_session, user.email, "password"))
+
+    db_session.expire_all()
+    assert db_session.get(User, user.id).password == rehashed
@@ -0,0 +1,86 @@
+from uuid import uuid4
+from sqlmodel import select
+
+from models import Syllabus, User, UserSyllabus, Result
+from schemas.syllabus import SyllabusBatchUpdate
+from schemas.user import UserBatchUpdate
+from database.syllabus import SyllabusDatabase
+from database.user import UserDatabase
+from services.syllabus import SyllabusService
+from services.user import UserService
+from custom_types.enums import BatchItemStatus, UserType
+
+
+def _enrol_with_result(db_session, user_id, syllabus_id):
+    user_syllabus = UserSyllabus(user_id=user_id, syllabus_id=syllabus_id)
+    test = db_session.get(Syllabus, syllabus_id).tests[0]
+    db_session.add(Result(score=50, test=test, user_syllabus=user_syllabus))
+    db_session.commit()
+
+
+def test_syllabus_batch_groups_updates_and_deletes_whole_trees(
+    db_session, count_statements, create_syllabus, create_user
+):
+    first_id, second_id, deleted_id = (create_syllabus(2, 2, 2) for _ in range(3))
+    _enrol_with_result(db_session, create_user().id, deleted_id)
+    missing_id = uuid4()
+
+    with count_statements() as statements:
+        results = SyllabusService(SyllabusDatabase()).apply_syllabus_batch(
+            db_session,
+            [
+                SyllabusBatchUpdate(id=first_id, name="Renamed"),
+                SyllabusBatchUpdate(id=second_id, name="Renamed"),
+                SyllabusBatchUpdate(id=missing_id, name="Renamed"),
+                SyllabusBatchUpdate(id=first_id, name="Again"),
+            ],
+            [deleted_id],
+        )
+
+    assert [result.status for result in results] == [
+        BatchItemStatus.UPDATED,
+        BatchItemStatus.UPDATED,
+        BatchItemStatus.NOT_FOUND,
+        BatchItemStatus.REJECTED,
+        BatchItemStatus.DELETED,
+    ]
+    # NOTE: Items making the same changes share one UPDATE, and a delete takes one DELETE per table
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"] + [
+        "DELETE"
+    ] * 7
+
+    db_session.expire_all()
+    assert db_session.get(Syllabus, first_id).name == "Renamed"
+    assert db_session.get(Syllabus, second_id).name == "Renamed"
+    assert db_session.get(Syllabus, deleted_id) is None
+
+
+def test_user_batch_rejects_taken_emails_and_deletes_enrolments(
+    db_session, create_syllabus, create_user
+):
+    first, second, deleted = create_user(), create_user(), create_user()
+    _enrol_with_result(db_session, deleted.id, create_syllabus(1, 1, 1))
+
+    results = UserService(UserDatabase()).apply_user_batch(
+        db_session,
+        [
+            UserBatchUpdate(id=first.id, email=second.email),
+            UserBatchUpdate(id=second.id, type=UserType.ADMIN),
+        ],
+        [deleted.id, uuid4()],
+    )
+
+    assert [(result.status, result.detail) for result in results] == [
+        (BatchItemStatus.REJECTED, "Email already in use"),
+        (BatchItemStatus.UPDATED, None),
+        (BatchItemStatus.DELETED, None),
+        (BatchItemStatus.NOT_FOUND, None),
+    ]
+
+    db_session.expire_all()
+    assert db_session.get(User, first.id).email == first.email
+    assert db_session.get(User, second.id).type == UserType.ADMIN
+    assert db_session.get(User, deleted.id) is None
+    assert not db_session.exec(
+        select(UserSyllabus).where(UserSyllabus.user_id == deleted.id)
+    ).all()
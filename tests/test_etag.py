@@ -0,0 +1,19 @@
+from services.etag import etag_matches, make_etag
+
+
+def test_make_etag_changes_with_every_part():
+    etag = make_etag("id", "2026-01-01T00:00:00+00:00")
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("id", "2026-01-01T00:00:00+00:00")
+    assert etag != make_etag("id", "2026-01-01T00:00:00.000001+00:00")
+
+
+def test_etag_matches_if_none_match_lists_weak_tags_and_wildcard():
+    etag = make_etag("id", 1)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
@@ -0,0 +1,31 @@
+from benchmarks.load import compare_reports, percentile
+
+
+def _report(p95_ms: float, errors: int = 0):
+    return {
+        "endpoints": {
+            "GET /api/syllabus/all": {"p95_ms": p95_ms, "errors": errors},
+        }
+    }
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([7.0], 0.95) == 7.0
+
+
+def test_compare_reports_flags_regressions_beyond_threshold_and_noise():
+    def compare(current):
+        return compare_reports(_report(10.0), current, "p95", 0.25, 1.0)
+
+    assert compare(_report(12.4)) == []
+    assert compare(_report(12.6)) == [
+        "GET /api/syllabus/all: p95 10.00 ms -> 12.60 ms (+26%)"
+    ]
+    assert compare_reports(_report(0.2), _report(1.0), "p95", 0.25, 1.0) == []
+    assert compare(_report(10.0, errors=3)) == [
+        "GET /api/syllabus/all: 3 errors, none in the baseline"
+    ]
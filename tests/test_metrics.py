@@ -0,0 +1,75 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app import app
+from api.instrumentation import MetricsRoute
+from custom_types.exceptions import SyllabusNotFoundError
+from services.cache import verified_token_cache
+from services.password import password_hash_pool
+from services.metrics import Counter, Histogram, MetricsRegistry, http_requests_total
+
+
+def test_render_cumulates_histogram_buckets_and_escapes_labels():
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("duration_seconds", "Duration.", ("route",), buckets=(0.1, 1.0))
+    )
+    counter = registry.register(Counter("events_total", "Events.", ("event",)))
+
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.labels("/items/{item_id}").observe(value)
+    counter.labels('say "hi"\n').inc(2)
+
+    assert registry.render().splitlines() == [
+        "# HELP duration_seconds Duration.",
+        "# TYPE duration_seconds histogram",
+        'duration_seconds_bucket{route="/items/{item_id}",le="0.1"} 2',
+        'duration_seconds_bucket{route="/items/{item_id}",le="1.0"} 3',
+        'duration_seconds_bucket{route="/items/{item_id}",le="+Inf"} 4',
+        'duration_seconds_sum{route="/items/{item_id}"} 2.65',
+        'duration_seconds_count{route="/items/{item_id}"} 4',
+        "# HELP events_total Events.",
+        "# TYPE events_total counter",
+        'events_total{event="say \\"hi\\"\\n"} 2.0',
+    ]
+
+
+def test_metrics_route_labels_requests_by_templated_path_and_status():
+    router = APIRouter(prefix="/metrics-test", route_class=MetricsRoute)
+
+    @router.get("/{item_id}", status_code=200)
+    async def get_item(item_id: str):
+        if item_id == "missing":
+            raise SyllabusNotFoundError
+
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    client.get("/metrics-test/1")
+    client.get("/metrics-test/2")
+    client.get("/metrics-test/missing")
+
+    route = ("GET", "/metrics-test/{item_id}")
+    assert http_requests_total.labels(*route, "200").value == 2
+    assert http_requests_total.labels(*route, "404").value == 1
+
+
+def test_render_metrics_samples_the_cache_counters():
+    verified_token_cache.get(b"never cached")
+    misses = verified_token_cache.stats()["misses"]
+
+    lines = TestClient(app).get("/metrics").text.splitlines()
+
+    assert "# TYPE cache_misses_total counter" in lines
+    assert f'cache_misses_total{{cache="verified_token"}} {misses}' in lines
+
+
+def test_render_metrics_samples_the_password_hash_pool():
+    lines = TestClient(app).get("/metrics").text.splitlines()
+
+    assert f"password_hash_workers {password_hash_pool.workers}" in lines
+    assert f"password_hash_queue_size {password_hash_pool.queue_size}" in lines
+    assert any(line.startswith("password_hash_duration_seconds_max ") for line in lines)
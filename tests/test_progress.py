@@ -0,0 +1,84 @@
+import asyncio
+from datetime import date
+from typing import AsyncIterator
+
+from models import File, Lesson, Result, Syllabus, UserSyllabus
+from database.progress import ProgressDatabase
+from database.result import ResultDatabase
+from services.result import ResultService
+from custom_types.enums import FileType
+from scripts.rebuild_progress import verify
+
+
+def test_maintained_summaries_match_a_rebuild(db_session, create_syllabus, create_user):
+    syllabus_id = create_syllabus(2, 2, 3)
+    first = UserSyllabus(user_id=create_user().id, syllabus_id=syllabus_id)
+    second = UserSyllabus(user_id=create_user().id, syllabus_id=syllabus_id)
+    db_session.add_all([first, second])
+    db_session.commit()
+    try:
+        syllabus = db_session.get(Syllabus, syllabus_id)
+        first_lesson, second_lesson = syllabus.lessons
+        first_test, second_test, third_test = syllabus.tests
+
+        # Inserts
+        lesson = Lesson(
+            title="Added", description="", conducted_at=date.today(), syllabus=syllabus
+        )
+        db_session.add_all(
+            [
+                File(
+                    title="Added",
+                    description="",
+                    filename="added.pdf",
+                    gdrive_url="https://drive.google.com/file",
+                    type=FileType.NOTE,
+                    completed=True,
+                    lesson=lesson,
+                ),
+                Result(score=40, test=first_test, user_syllabus=first),
+                Result(score=90, test=second_test, user_syllabus=first),
+                Result(score=60, test=first_test, user_syllabus=second),
+            ]
+        )
+        db_session.commit()
+
+        # Updates, including ones that move a row between summaries
+        first_lesson.files[0].completed = True
+        second_lesson.files[0].completed = True
+        first.results[0].score = 55
+        second.results[0].test = third_test
+        second_lesson.files[1].lesson = first_lesson
+        db_session.commit()
+
+        # Deletes, including ones that cascade
+        db_session.delete(first.results[1])
+        db_session.delete(second_lesson)
+        db_session.delete(second_test)
+        db_session.commit()
+
+        # NOTE: Imported results bypass the mapper events and update the summaries in bulk
+        async def chunks() -> AsyncIterator[bytes]:
+            yield f"test_id,user_syllabus_id,score\n{first_test.id},{second.id},70\n".encode()
+
+        imported, _ = asyncio.run(
+            ResultService(ResultDatabase()).import_results(db_session, chunks())
+        )
+        assert imported == 1
+
+        progress_db = ProgressDatabase()
+        assert verify(progress_db, db_session) == 0
+
+        stored = progress_db.get_stored_progress(db_session)
+        assert stored[first.id]["lessons_covered"] == 2
+        assert stored[first.id]["files_completed"] == 2
+        assert stored[first.id]["tests_taken"] == 1
+        assert stored[second.id]["tests_taken"] == 2
+    finally:
+        # NOTE: Deleting the enrolments cascades to their results and summaries, reloaded to include the imported
+        #       result, so that a failure leaves no drifted summary behind for the next verification
+        db_session.rollback()
+        db_session.expire_all()
+        db_session.delete(first)
+        db_session.delete(second)
+        db_session.commit()
@@ -0,0 +1,73 @@
+import os
+import pytest
+from typing import Iterator
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, make_url
+from sqlmodel import Session, SQLModel, create_engine
+
+import config.database
+from app import app
+from models import User
+from database.user import UserDatabase
+from services.auth import AuthService
+from custom_types.enums import TokenType
+from config.auth import ACCESS_TOKEN_COOKIE_NAME
+from config.database import READ_PRIMARY_COOKIE_NAME, engine
+
+
+@pytest.fixture
+def replica_engine(monkeypatch) -> Iterator[Engine]:
+    """Serve reads from DATABASE_REPLICA_URL, or from a second local database created next to the primary's.
+
+    Nothing replicates between the two, so a row only reaches the replica when a test copies it there.
+    """
+    replica_url = make_url(
+        os.getenv("DATABASE_REPLICA_URL")
+        or engine.url.set(database=f"{engine.url.database}_replica")
+    )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        statement = text("SELECT 1 FROM pg_database WHERE datname = :name")
+        if not connection.execute(statement, {"name": replica_url.database}).first():
+            connection.execute(text(f'CREATE DATABASE "{replica_url.database}"'))
+
+    replica_engine = create_engine(replica_url)
+    SQLModel.metadata.create_all(replica_engine)
+    monkeypatch.setattr(config.database, "read_engine", replica_engine)
+
+    yield replica_engine
+
+    replica_engine.dispose()
+
+
+def test_reads_go_to_the_replica_except_for_a_caller_who_just_wrote(
+    replica_engine, create_user
+):
+    user = create_user()
+    with Session(replica_engine) as replica_session:
+        replica_session.add(User.model_validate(user.model_dump()))
+        replica_session.commit()
+
+    client = TestClient(app)
+    access_token = AuthService(UserDatabase()).create_token(user, TokenType.ACCESS)
+    client.cookies.set(ACCESS_TOKEN_COOKIE_NAME, access_token)
+
+    try:
+        response = client.get(f"/api/users/{user.id}")
+        assert READ_PRIMARY_COOKIE_NAME not in response.cookies
+
+        response = client.patch(f"/api/users/{user.id}", json={"first_name": "Renamed"})
+        assert READ_PRIMARY_COOKIE_NAME in response.cookies
+
+        # NOTE: Within the window the caller reads their own write back from the primary
+        response = client.get(f"/api/users/{user.id}")
+        assert response.json()["user"]["first_name"] == "Renamed"
+
+        # NOTE: Anyone else reads the replica, which hasn't applied the write
+        client.cookies.delete(READ_PRIMARY_COOKIE_NAME)
+        response = client.get(f"/api/users/{user.id}")
+        assert response.json()["user"]["first_name"] == "First"
+    finally:
+        with Session(replica_engine) as replica_session:
+            replica_session.delete(replica_session.get(User, user.id))
+            replica_session.commit()
@@ -0,0 +1,75 @@
+import asyncio
+from typing import AsyncIterator, List
+from sqlmodel import select
+
+from models import Result, Syllabus, UserSyllabus
+from database.result import ResultDatabase
+from services.result import ResultService
+
+
+def _import(db_session, csv_text: str, chunk_size: int = 7):
+    async def chunks() -> AsyncIterator[bytes]:
+        data = csv_text.encode()
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+    return asyncio.run(
+        ResultService(ResultDatabase()).import_results(db_session, chunks())
+    )
+
+
+def test_import_commits_valid_rows_and_reports_rejected_ones(
+    db_session, create_syllabus, create_user
+):
+    syllabus_id = create_syllabus(1, 0, 2)
+    other_syllabus_id = create_syllabus(1, 0, 1)
+    user_syllabus = UserSyllabus(user_id=create_user().id, syllabus_id=syllabus_id)
+    db_session.add(user_syllabus)
+    db_session.commit()
+    first_test, second_test = db_session.get(Syllabus, syllabus_id).tests
+    other_test = db_session.get(Syllabus, other_syllabus_id).tests[0]
+
+    lines: List[str] = [
+        "score,test_id,user_syllabus_id",
+        f"80,{first_test.id},{user_syllabus.id}",
+        f"90,{first_test.id},{user_syllabus.id}",
+        f"101,{second_test.id},{user_syllabus.id}",
+        "not,a,csv,row",
+        f"70,not-a-uuid,{user_syllabus.id}",
+        f"-1,{second_test.id},{user_syllabus.id}",
+        f"70,{other_test.id},{user_syllabus.id}",
+        "",
+        f"100,{second_test.id},{user_syllabus.id}",
+    ]
+    imported, errors = _import(db_session, "\n".join(lines))
+
+    assert imported == 2
+    assert [(error.line, error.detail) for error in errors] == [
+        (3, "Duplicates the result on line 2"),
+        (4, "Score exceeds the test's total marks of 100"),
+        (5, "Expected 3 columns, got 4"),
+        (6, "Invalid test_id"),
+        (7, "Score must not be negative"),
+        (8, "Test and user syllabus belong to different syllabuses"),
+    ]
+
+    db_session.expire_all()
+    results = db_session.exec(
+        select(Result).where(Result.user_syllabus_id == user_syllabus.id)
+    ).all()
+    assert sorted((result.test_id, result.score) for result in results) == sorted(
+        [(first_test.id, 80), (second_test.id, 100)]
+    )
+
+    # NOTE: Results committed by an earlier upload are rejected too, without aborting the rest of it
+    imported, errors = _import(db_session, "\n".join(lines[:2]))
+
+    assert imported == 0
+    assert [(error.line, error.detail) for error in errors] == [
+        (2, "Result already exists for this test and user syllabus"),
+    ]
+
+    # NOTE: The results were inserted in bulk, so deleting the enrolment cascades to them before the fixtures'
+    #       teardown deletes the student
+    db_session.delete(user_syllabus)
+    db_session.commit()
@@ -0,0 +1,82 @@
+from sqlmodel import Session, select
+
+from models import Lesson, Syllabus
+from database.syllabus import SyllabusDatabase
+from services.syllabus import SyllabusService
+from custom_types.enums import SearchResultType
+from config.database import engine, unit_of_work
+
+
+def enrol(db_session: Session, user_id, syllabus_id) -> None:
+    with unit_of_work(db_session):
+        SyllabusDatabase().create_user_syllabus(db_session, user_id, syllabus_id)
+
+
+def test_search_is_scoped_ranked_and_highlighted(
+    db_session, create_syllabus, create_user
+):
+    enrolled_id = create_syllabus(2, 1, 1)
+    other_id = create_syllabus(2, 1, 1)
+    student, stranger = create_user(), create_user()
+    enrol(db_session, student.id, enrolled_id)
+
+    with Session(engine) as write_session:
+        for syllabus_id in (enrolled_id, other_id):
+            lesson = write_session.exec(
+                select(Lesson).where(Lesson.syllabus_id == syllabus_id)
+            ).first()
+            assert lesson is not None
+            lesson.title = "Sorting & algorithms"
+            lesson.description = "Bubble sort compared with merge sort"
+            write_session.add(lesson)
+        syllabus = write_session.get(Syllabus, enrolled_id)
+        assert syllabus is not None
+        syllabus.description = "Covers searching and sorting algorithms"
+        write_session.add(syllabus)
+        write_session.commit()
+
+    syllabus_service = SyllabusService(SyllabusDatabase())
+    # NOTE: The last term matches as a prefix
+    results, next_cursor = syllabus_service.search_syllabus_content(
+        db_session, student.id, "sorting algo", 10
+    )
+
+    assert next_cursor is None
+    assert [(result.type, result.syllabus_id) for result in results] == [
+        (SearchResultType.LESSON, enrolled_id),
+        (SearchResultType.SYLLABUS, enrolled_id),
+    ]
+    assert results[0].title == "<mark>Sorting</mark> &amp; <mark>algorithms</mark>"
+    assert results[0].snippet is not None and "<mark>sort</mark>" in results[0].snippet
+
+    results, _ = syllabus_service.search_syllabus_content(
+        db_session, stranger.id, "sorting", 10
+    )
+    assert results == []
+
+
+def test_search_pages_through_every_match_once(
+    db_session, create_syllabus, create_user
+):
+    syllabus_id = create_syllabus(5, 2, 3)
+    student = create_user()
+    enrol(db_session, student.id, syllabus_id)
+    syllabus_service = SyllabusService(SyllabusDatabase())
+
+    results, next_cursor = syllabus_service.search_syllabus_content(
+        db_session, student.id, "file", 50
+    )
+    matched_ids = [result.id for result in results]
+    assert next_cursor is None and len(matched_ids) == 10
+
+    paged_ids = []
+    cursor = None
+    while True:
+        results, cursor = syllabus_service.search_syllabus_content(
+            db_session, student.id, "file", 3, cursor
+        )
+        paged_ids += [result.id for result in results]
+        if cursor is None:
+            break
+
+    assert paged_ids == matched_ids
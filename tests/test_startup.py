@@ -0,0 +1,69 @@
+import asyncio
+from sqlalchemy import text
+
+from app import app
+from benchmarks.startup import profile_imports
+from config.database import (
+    async_engine,
+    create_db_and_tables,
+    engine,
+    get_schema_migrations,
+    migrate_db_schema,
+)
+
+# NOTE: Importing the app takes about 1.1s on a developer machine, the headroom absorbs slower CI hosts. Run
+#       "python -m benchmarks.startup" to see which modules a regression comes from.
+APP_IMPORT_BUDGET_SECONDS = 2.5
+
+
+def test_app_import_fits_budget():
+    app_import = next(
+        import_time for import_time in profile_imports() if import_time.module == "app"
+    )
+
+    assert app_import.cumulative_seconds < APP_IMPORT_BUDGET_SECONDS
+
+
+def test_current_schema_is_checked_with_one_query(count_statements):
+    with count_statements() as statements:
+        create_db_and_tables()
+
+    assert len(statements) == 1
+
+
+def test_boot_leaves_existing_tables_to_the_migration(count_statements):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_lesson_syllabus_id"))
+        connection.execute(text("DELETE FROM schema_version"))
+
+    try:
+        create_db_and_tables()
+        with engine.connect() as connection:
+            fingerprints = connection.execute(text("SELECT * FROM schema_version"))
+            assert fingerprints.first() is None
+            assert get_schema_migrations(connection) == [
+                "CREATE INDEX ix_lesson_syllabus_id ON lesson (syllabus_id)"
+            ]
+    finally:
+        assert len(migrate_db_schema()) == 1
+
+    with count_statements() as statements:
+        create_db_and_tables()
+
+    assert len(statements) == 1
+
+
+def test_lifespan_warms_up_queries_and_disposes_pools_on_shutdown():
+    serving_engine = async_engine.sync_engine if async_engine is not None else engine
+    serving_engine.dispose()
+    serving_engine._compiled_cache.clear()
+
+    async def scenario():
+        async with app.router.lifespan_context(app):
+            assert serving_engine.pool.checkedin() > 0  # type: ignore[attr-defined]
+            # NOTE: The schema check compiles one statement, the rest come from the query warmup
+            assert len(serving_engine._compiled_cache) > 1
+
+    asyncio.run(scenario())
+
+    assert serving_engine.pool.checkedin() == 0  # type: ignore[attr-defined]
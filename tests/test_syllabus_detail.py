@@ -0,0 +1,55 @@
+from itertools import combinations
+from sqlmodel import Session
+
+import pytest
+
+from schemas.syllabus import SyllabusDetailGetResponse
+from database.syllabus import SyllabusDatabase
+from services.syllabus import SyllabusService
+from custom_types.enums import SyllabusInclude
+from config.database import engine
+
+INCLUDE_COMBINATIONS = [
+    set(include)
+    for size in range(len(SyllabusInclude) + 1)
+    for include in combinations(SyllabusInclude, size)
+]
+
+
+def _get_syllabus_detail(syllabus_id, include):
+    """Get and serialize a syllabus detail the way its route does, in a fresh session."""
+    with Session(engine) as db_session:
+        syllabus, lessons, tests = SyllabusService(
+            SyllabusDatabase()
+        ).get_syllabus_detail_by_id(db_session, syllabus_id, include)
+
+        return SyllabusDetailGetResponse(
+            syllabus=syllabus, lessons=lessons, tests=tests
+        ).model_dump(mode="json", exclude_none=True)
+
+
+@pytest.mark.parametrize(
+    "include",
+    INCLUDE_COMBINATIONS,
+    ids=lambda include: "+".join(sorted(include)) or "none",
+)
+def test_syllabus_detail_statement_count_is_independent_of_size(
+    include, create_syllabus, count_statements
+):
+    small_syllabus_id = create_syllabus(1, 1, 1)
+    large_syllabus_id = create_syllabus(20, 5, 10)
+
+    with count_statements() as small_statements:
+        small_detail = _get_syllabus_detail(small_syllabus_id, include)
+    with count_statements() as large_statements:
+        large_detail = _get_syllabus_detail(large_syllabus_id, include)
+
+    assert len(small_statements) == len(large_statements)
+
+    if SyllabusInclude.LESSONS in include or SyllabusInclude.FILES in include:
+        assert len(large_detail["lessons"]) == 20
+    if SyllabusInclude.FILES in include:
+        assert all(len(lesson["files"]) == 5 for lesson in large_detail["lessons"])
+    if SyllabusInclude.TESTS in include:
+        assert len(small_detail["tests"]) == 1
+        assert len(large_detail["tests"]) == 10
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from models import Syllabus, User
+from schemas.syllabus import SyllabusCreateRequest, SyllabusUpdateRequest
+from database.syllabus import SyllabusDatabase
+from services.syllabus import SyllabusService
+from custom_types.enums import SubjectCode, SyllabusLevel
+
+
+def test_create_and_update_syllabus_write_in_one_transaction_without_refreshes(
+    db_session, count_statements, create_user
+):
+    user = create_user()
+    syllabus_service = SyllabusService(SyllabusDatabase())
+    syllabus_data = SyllabusCreateRequest(
+        name="Syllabus",
+        description="Description",
+        code=SubjectCode.EDEXCEL_IGCSE_CS,
+        level=SyllabusLevel.IGCSE,
+        examination_date=date.today() + timedelta(days=365),
+    )
+
+    with count_statements() as statements:
+        syllabus = syllabus_service.create_syllabus(db_session, user.id, syllabus_data)
+
+    try:
+        # NOTE: One INSERT per table in the order the foreign key needs, hydrated by RETURNING, then the progress
+        #       summary the enrolment's listener creates
+        assert [statement.split()[:3] for statement in statements] == [
+            ["INSERT", "INTO", "syllabus"],
+            ["INSERT", "INTO", "user_syllabus"],
+            ["INSERT", "INTO", "user_syllabus_progress"],
+        ]
+        assert all("RETURNING" in statement for statement in statements[:2])
+        assert syllabus.created_at is not None and syllabus.updated_at is not None
+        assert syllabus.id in {
+            linked.id for linked in db_session.get(User, user.id).syllabuses
+        }
+
+        with count_statements() as statements:
+            updated_syllabus = syllabus_service.update_syllabus(
+                db_session, syllabus.id, SyllabusUpdateRequest(name="Renamed")
+            )
+
+        assert [statement.split()[0] for statement in statements] == [
+            "SELECT",
+            "UPDATE",
+        ]
+        assert "RETURNING" in statements[1]
+        assert updated_syllabus.name == "Renamed"
+        assert updated_syllabus.updated_at > syllabus.created_at
+    finally:
+        db_session.delete(db_session.get(Syllabus, syllabus.id))
+        db_session.commit()